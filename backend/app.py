@@ -1,22 +1,44 @@
 import os
+import json
+import click
+import functools
+import time
 import logging
-from datetime import datetime, timedelta
-from flask import Flask, request, jsonify, render_template
+from datetime import datetime, timedelta, timezone
+from flask import Flask, Response, request, jsonify, redirect, render_template, send_file, stream_with_context
 from flask_cors import CORS
-from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
 
 # Import configuration
 from config.config import config
 
 # Import models
-from models.article import Article, db as article_db
-from models.user import User, db as user_db
-from models.user_preferences import UserPreferences, db as prefs_db
+from models import (
+    db, Article, ArchivedArticle, BodyDictionary, ArticleBody, Keyword, ArticleKeyword, ScrapeJob,
+    User, UserPreferences, DigestItem, SchemaState
+)
 
 # Import services
 from services.ai_service import AIService
 from services.ranking_service import RankingService
+from services.ingest_service import IngestService
+from services.scrape_job_service import ScrapeJobService
+from services.scheduler_service import SchedulerService
+from services.response_service import FastJSONProvider, ResponseCompressor, ResponseCache
+from services.metrics_service import RequestMetrics, registry as metrics_registry
+from services.profiling_service import RequestProfiler
+from services.export_service import ExportService
+from services.keyword_service import KeywordService
+from services.facet_service import FacetService, format_facets, split_param
+from services.personalization_service import PersonalizationService
+from services.digest_service import DigestService, FREQUENCIES
+from services.related_service import RelatedService
+from services.body_service import BodyStore
+from services.fulltext_service import FullTextService
+from services.thumbnail_service import ThumbnailService
+from services.snapshot_service import SnapshotService
+from services.retention_service import RetentionService
+from services.stream_service import ArticleBroadcaster, format_event
+from services.database_service import configure_engines, ensure_schema, DatabaseRouter, DatabaseWriter
 from scrapers.rss_scraper import AI_RSS_SOURCES
 
 # Configure logging
@@ -31,66 +53,96 @@ def create_app(config_name='default'):
     
     # Load configuration
     app.config.from_object(config[config_name])
+    app.json = FastJSONProvider(app)
     
     # Initialize extensions
-    db = SQLAlchemy(app)
-    migrate = Migrate(app, db)
+    configure_engines(app)
+    db.init_app(app)
+    DatabaseRouter(app, db)
+    db_writer = DatabaseWriter(app, db)
+    if click.get_current_context(silent=True) is not None:
+        # Flask-Migrate imports alembic, which only the `flask db` commands need
+        from flask_migrate import Migrate
+        Migrate(app, db)
     CORS(app, origins=app.config['CORS_ORIGINS'])
+    # Registered before compression so its after_request hook runs last and times everything
+    RequestMetrics(app)
+    ResponseCompressor(app)
+    RequestProfiler(app)
+    response_cache = ResponseCache(app)
     
     # Initialize services
-    ai_service = AIService()
+    ai_service = AIService(app.config['OPENAI_API_KEY'])
     ranking_service = RankingService()
     
-    # Define models within app context
-    class Article(db.Model):
-        id = db.Column(db.Integer, primary_key=True)
-        title = db.Column(db.String(500), nullable=False)
-        url = db.Column(db.String(1000), unique=True, nullable=False)
-        content = db.Column(db.Text)
-        summary = db.Column(db.Text)
-        author = db.Column(db.String(200))
-        source = db.Column(db.String(200), nullable=False)
-        category = db.Column(db.String(100), default='AI')
-        published_at = db.Column(db.DateTime, nullable=False)
-        scraped_at = db.Column(db.DateTime, default=datetime.utcnow)
-        updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-        shares = db.Column(db.Integer, default=0)
-        comments = db.Column(db.Integer, default=0)
-        citations = db.Column(db.Integer, default=0)
-        views = db.Column(db.Integer, default=0)
-        likes = db.Column(db.Integer, default=0)
-        hotness_score = db.Column(db.Float, default=0.0)
-        keywords = db.Column(db.Text)
-        tags = db.Column(db.Text)
-        image_url = db.Column(db.String(1000))
-        sentiment = db.Column(db.String(20))
-        importance_score = db.Column(db.Float, default=0.0)
-
-        def to_dict(self):
-            return {
-                'id': self.id,
-                'title': self.title,
-                'url': self.url,
-                'content': self.content,
-                'summary': self.summary,
-                'author': self.author,
-                'source': self.source,
-                'category': self.category,
-                'published_at': self.published_at.isoformat() if self.published_at else None,
-                'scraped_at': self.scraped_at.isoformat() if self.scraped_at else None,
-                'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-                'shares': self.shares,
-                'comments': self.comments,
-                'citations': self.citations,
-                'views': self.views,
-                'likes': self.likes,
-                'hotness_score': self.hotness_score,
-                'keywords': self.keywords,
-                'tags': self.tags,
-                'image_url': self.image_url,
-                'sentiment': self.sentiment,
-                'importance_score': self.importance_score
-            }
+    body_store = BodyStore(app, db, Article, ArticleBody, BodyDictionary)
+    retention = RetentionService(
+        app, db, Article, ArchivedArticle, body_store, dependent_models=(ArticleKeyword, DigestItem)
+    )
+    ingest_service = IngestService(
+        db, Article, ai_service, ranking_service, writer=db_writer, body_store=body_store,
+        archive=retention
+    )
+    fulltext = FullTextService(app, db, Article, body_store, db_writer, ai_service)
+    ingest_service.add_listener(fulltext.enqueue_articles)
+    thumbnails = ThumbnailService(app)
+    ingest_service.add_listener(thumbnails.prewarm_articles)
+    keyword_service = KeywordService(db, Article, Keyword, ArticleKeyword)
+    ingest_service.add_listener(keyword_service.index_articles)
+    facet_service = FacetService(
+        db, Article, keyword_service,
+        rebuild_seconds=app.config['FACET_REBUILD_SECONDS']
+    )
+    ingest_service.add_listener(facet_service.add_articles)
+    personalization = PersonalizationService(app, db, Article, UserPreferences, keyword_service)
+    ingest_service.add_listener(personalization.add_articles)
+    related_service = RelatedService(app, db, Article, keyword_service)
+    ingest_service.add_listener(related_service.add_articles)
+    digest_service = DigestService(
+        app, db, Article, User, UserPreferences, DigestItem, keyword_service
+    )
+    if app.config['DIGEST_ENABLED']:
+        ingest_service.add_listener(digest_service.match_articles)
+    ingest_service.add_listener(response_cache.clear)
+    snapshots = SnapshotService(app, db, Article)
+    ingest_service.add_listener(snapshots.request_rebuild)
+    export_service = ExportService(db, Article, app.json, body_store)
+    broadcaster = ArticleBroadcaster(app, db, Article)
+    ingest_service.add_listener(broadcaster.publish_articles)
+    scrape_jobs = ScrapeJobService(
+        app, db, ScrapeJob, ingest_service, AI_RSS_SOURCES,
+        max_articles=app.config['MAX_ARTICLES_PER_SOURCE']
+    )
+    scheduler = SchedulerService(app, scrape_jobs, AI_RSS_SOURCES)
+    # Cached pages and the related index hold the summary a full-text fetch just replaced
+    fulltext.add_listener(related_service.update_articles)
+    fulltext.add_listener(response_cache.clear)
+    fulltext.add_listener(snapshots.request_rebuild)
+    retention.add_listener(facet_service.remove_articles)
+    retention.add_listener(personalization.remove_articles)
+    retention.add_listener(related_service.remove_articles)
+    retention.add_listener(response_cache.clear)
+    retention.add_listener(snapshots.request_rebuild)
+    if app.config['RETENTION_ENABLED']:
+        scheduler.add_task(functools.partial(db_writer.run, retention.run_if_due))
+    if app.config['DIGEST_ENABLED']:
+        scheduler.add_task(functools.partial(db_writer.run, digest_service.send_due))
+    if app.config['SNAPSHOT_ENABLED']:
+        scheduler.add_task(snapshots.rebuild_if_stale)
+    app.extensions['ingest'] = ingest_service
+    app.extensions['bodies'] = body_store
+    app.extensions['fulltext'] = fulltext
+    app.extensions['thumbnails'] = thumbnails
+    app.extensions['facets'] = facet_service
+    app.extensions['personalization'] = personalization
+    app.extensions['digests'] = digest_service
+    app.extensions['related'] = related_service
+    app.extensions['retention'] = retention
+    app.extensions['db_writer'] = db_writer
+    app.extensions['response_cache'] = response_cache
+    app.extensions['snapshots'] = snapshots
+    app.extensions['scrape_jobs'] = scrape_jobs
+    app.extensions['scheduler'] = scheduler
     
     # Routes
     @app.route('/')
@@ -98,9 +150,20 @@ def create_app(config_name='default'):
         """Serve the main page"""
         return render_template('index.html')
     
+    @app.route('/metrics')
+    def metrics():
+        """Prometheus metrics for requests, database, scrapers and AI calls"""
+        if not app.config['METRICS_ENABLED']:
+            return jsonify({'error': 'Metrics are disabled'}), 404
+        return Response(metrics_registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+    
     @app.route('/api/articles', methods=['GET'])
     def get_articles():
         """Get articles with filtering and pagination"""
+        cached = snapshots.respond() or response_cache.get()
+        if cached:
+            return cached
+        
         try:
             # Get query parameters
             page = request.args.get('page', 1, type=int)
@@ -108,6 +171,7 @@ def create_app(config_name='default'):
             source = request.args.get('source')
             category = request.args.get('category')
             keyword = request.args.get('keyword')
+            keywords = request.args.get('keywords')  # comma-separated exact keywords, all required
             min_hotness = request.args.get('min_hotness', type=float)
             sort_by = request.args.get('sort_by', 'hotness')  # hotness, date, relevance
             
@@ -122,13 +186,19 @@ def create_app(config_name='default'):
                 query = query.filter(Article.category == category)
             
             if keyword:
-                query = query.filter(
-                    db.or_(
-                        Article.title.ilike(f'%{keyword}%'),
-                        Article.content.ilike(f'%{keyword}%'),
-                        Article.keywords.ilike(f'%{keyword}%')
-                    )
-                )
+                conditions = [
+                    Article.title.ilike(f'%{keyword}%'),
+                    Article.summary.ilike(f'%{keyword}%')
+                ]
+                keyword_filter = keyword_service.mentions(keyword)
+                if keyword_filter is not None:
+                    conditions.append(keyword_filter)
+                query = query.filter(db.or_(*conditions))
+            
+            if keywords:
+                keyword_filter = keyword_service.has_keywords(keywords.split(','))
+                if keyword_filter is not None:
+                    query = query.filter(keyword_filter)
             
             if min_hotness:
                 query = query.filter(Article.hotness_score >= min_hotness)
@@ -148,7 +218,7 @@ def create_app(config_name='default'):
                 error_out=False
             )
             
-            return jsonify({
+            return response_cache.store({
                 'articles': [article.to_dict() for article in articles.items],
                 'pagination': {
                     'page': articles.page,
@@ -167,6 +237,10 @@ def create_app(config_name='default'):
     @app.route('/api/articles/trending', methods=['GET'])
     def get_trending_articles():
         """Get trending articles (highest hotness scores)"""
+        cached = snapshots.respond() or response_cache.get()
+        if cached:
+            return cached
+        
         try:
             limit = request.args.get('limit', 20, type=int)
             
@@ -174,7 +248,7 @@ def create_app(config_name='default'):
                 Article.hotness_score.desc()
             ).limit(min(limit, 50)).all()
             
-            return jsonify({
+            return response_cache.store({
                 'articles': [article.to_dict() for article in articles],
                 'count': len(articles)
             })
@@ -183,64 +257,258 @@ def create_app(config_name='default'):
             logger.error(f"Error getting trending articles: {e}")
             return jsonify({'error': 'Failed to fetch trending articles'}), 500
     
+    @app.route('/api/articles/export', methods=['GET'])
+    def export_articles():
+        """Stream articles as NDJSON (gzip when the client accepts it)"""
+        since = request.args.get('since')
+        source = request.args.get('source')
+        category = request.args.get('category')
+        
+        if since:
+            try:
+                since = datetime.fromisoformat(since.replace('Z', '+00:00'))
+            except ValueError:
+                return jsonify({'error': 'since must be an ISO 8601 datetime'}), 400
+            if since.tzinfo:
+                since = since.astimezone(timezone.utc).replace(tzinfo=None)
+        
+        statement = export_service.build_query(since=since, source=source, category=category)
+        chunks = export_service.iter_ndjson(statement)
+        
+        headers = {'Content-Disposition': 'attachment; filename=articles.ndjson'}
+        if request.accept_encodings.best_match(['gzip']):
+            chunks = export_service.iter_gzip(chunks)
+            headers['Content-Encoding'] = 'gzip'
+        
+        response = Response(
+            stream_with_context(chunks),
+            mimetype='application/x-ndjson',
+            headers=headers
+        )
+        response.vary.add('Accept-Encoding')
+        return response
+    
+    @app.route('/api/articles/stream', methods=['GET'])
+    def stream_articles():
+        """Push newly ingested articles as Server-Sent Events"""
+        subscriber = broadcaster.subscribe(
+            source=request.args.get('source'),
+            category=request.args.get('category'),
+            min_hotness=request.args.get('min_hotness', type=float)
+        )
+        
+        backlog = []
+        last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+        if last_event_id:
+            try:
+                backlog = broadcaster.replay(subscriber, int(last_event_id))
+            except ValueError:
+                pass
+            except Exception as e:
+                logger.error(f"Error replaying stream from {last_event_id}: {e}")
+        
+        heartbeat = app.config['SSE_HEARTBEAT_SECONDS']
+        max_duration = app.config['SSE_MAX_STREAM_SECONDS']
+        
+        def events():
+            last_sent = 0
+            try:
+                # Clients reconnect (with Last-Event-ID) after the stream closes
+                yield f"retry: {app.config['SSE_RETRY_MS']}\n\n"
+                
+                deadline = time.monotonic() + max_duration
+                pending = backlog
+                while True:
+                    for card in pending:
+                        if card['id'] > last_sent:
+                            last_sent = card['id']
+                            yield format_event(card, app.json)
+                    
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    
+                    if subscriber.ready.wait(min(heartbeat, remaining)):
+                        pending = subscriber.drain()
+                    else:
+                        pending = []
+                        yield ': keepalive\n\n'
+            finally:
+                broadcaster.unsubscribe(subscriber)
+        
+        return Response(events(), mimetype='text/event-stream', headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        })
+    
     @app.route('/api/articles/<int:article_id>', methods=['GET'])
     def get_article(article_id):
         """Get a specific article by ID"""
         try:
             article = Article.query.get_or_404(article_id)
             
-            # Increment view count
-            article.views += 1
-            db.session.commit()
+            # Increment view count (buffered and written in batches)
+            db_writer.increment(Article, article.id, 'views')
             
-            return jsonify(article.to_dict())
+            data = article.to_dict()
+            data['content'] = body_store.load(article.id)
+            data['views'] = (data['views'] or 0) + db_writer.pending(Article, article.id, 'views')
+            return jsonify(data)
         
         except Exception as e:
             logger.error(f"Error getting article {article_id}: {e}")
             return jsonify({'error': 'Article not found'}), 404
     
+    @app.route('/api/articles/<int:article_id>/related', methods=['GET'])
+    def get_related_articles(article_id):
+        """Get the articles most similar to one article"""
+        cached = response_cache.get()
+        if cached:
+            return cached
+        
+        article = db.session.get(Article, article_id)
+        if not article:
+            return jsonify({'error': 'Article not found'}), 404
+        
+        try:
+            limit = min(request.args.get('limit', 10, type=int), 50)
+            neighbours = related_service.related(article, limit)
+            
+            ids = [neighbour_id for _, neighbour_id in neighbours]
+            articles = {a.id: a for a in Article.query.filter(Article.id.in_(ids)).all()}
+            
+            related = []
+            for similarity, neighbour_id in neighbours:
+                if neighbour_id in articles:
+                    data = articles[neighbour_id].to_dict()
+                    data['similarity'] = round(similarity, 4)
+                    related.append(data)
+            
+            return response_cache.store({
+                'article_id': article_id,
+                'articles': related,
+                'count': len(related)
+            })
+        
+        except Exception as e:
+            logger.error(f"Error getting related articles for {article_id}: {e}")
+            return jsonify({'error': 'Failed to fetch related articles'}), 500
+    
+    @app.route('/api/articles/<int:article_id>/thumbnail', methods=['GET'])
+    def get_article_thumbnail(article_id):
+        """Serve an article's image resized to the nearest thumbnail width (?w=), from the disk cache"""
+        article = db.session.get(Article, article_id)
+        if not article or not article.image_url:
+            return jsonify({'error': 'Image not found'}), 404
+        
+        try:
+            thumbnail = thumbnails.get(article.image_url, request.args.get('w', 320, type=int))
+        except Exception as e:
+            logger.error(f"Error rendering thumbnail for article {article_id}: {e}")
+            thumbnail = None
+        if thumbnail is None:
+            # Pillow missing or the image could not be fetched: let the browser try the original
+            return redirect(article.image_url)
+        
+        path, etag = thumbnail
+        response = send_file(path, mimetype='image/jpeg', etag=etag, max_age=thumbnails.max_age)
+        response.cache_control.public = True
+        return response
+    
     @app.route('/api/scrape', methods=['POST'])
     def trigger_scrape():
-        """Manually trigger article scraping"""
+        """Queue a background scrape job and return its id immediately"""
         try:
-            scraped_count = 0
+            data = request.get_json(silent=True) or {}
+            sources = data.get('sources')
+            if isinstance(sources, str):
+                sources = [sources]
+            if sources is not None and (
+                not isinstance(sources, list) or not all(isinstance(name, str) for name in sources)
+            ):
+                return jsonify({'error': 'sources must be a source name or a list of source names'}), 400
             
-            for scraper in AI_RSS_SOURCES[:5]:  # Limit to 5 sources for demo
-                try:
-                    articles = scraper.scrape_articles(max_articles=20)
-                    
-                    # Process articles with AI
-                    processed_articles = ai_service.batch_process_articles(articles)
-                    
-                    # Save to database
-                    for article_data in processed_articles:
-                        existing = Article.query.filter_by(url=article_data['url']).first()
-                        if not existing:
-                            article = Article(**article_data)
-                            
-                            # Calculate hotness score
-                            article.hotness_score = ranking_service.calculate_hotness_score(
-                                article_data
-                            )
-                            
-                            db.session.add(article)
-                            scraped_count += 1
-                    
-                    db.session.commit()
-                    
-                except Exception as e:
-                    logger.error(f"Error scraping from {scraper.name}: {e}")
-                    continue
+            if sources:
+                unknown = [name for name in sources if name not in scrape_jobs.scrapers]
+                if unknown:
+                    return jsonify({'error': f"Unknown sources: {', '.join(unknown)}"}), 400
+            else:
+                sources = [scraper.name for scraper in AI_RSS_SOURCES[:5]]  # Limit to 5 sources for demo
+            
+            job, coalesced = scrape_jobs.submit(sources)
             
             return jsonify({
-                'message': f'Successfully scraped {scraped_count} new articles',
-                'count': scraped_count
-            })
+                'message': 'Scraping already in progress' if coalesced else 'Scraping started',
+                'job_id': job.id,
+                'status': job.status,
+                'coalesced': coalesced,
+                'status_url': f'/api/scrape/{job.id}'
+            }), 202
         
         except Exception as e:
-            logger.error(f"Error during scraping: {e}")
+            logger.error(f"Error starting scrape job: {e}")
             return jsonify({'error': 'Scraping failed'}), 500
     
+    @app.route('/api/scrape/<job_id>', methods=['GET'])
+    def get_scrape_job(job_id):
+        """Get progress and counts of a scrape job"""
+        job = scrape_jobs.get_job(job_id)
+        if not job:
+            return jsonify({'error': 'Scrape job not found'}), 404
+        
+        return jsonify(job.to_dict())
+    
+    @app.route('/api/scrape/jobs', methods=['GET'])
+    def list_scrape_jobs():
+        """Get the scrape job history"""
+        try:
+            limit = request.args.get('limit', 20, type=int)
+            jobs = scrape_jobs.list_jobs(min(limit, 100))
+            
+            return jsonify({
+                'jobs': [job.to_dict() for job in jobs],
+                'count': len(jobs)
+            })
+        
+        except Exception as e:
+            logger.error(f"Error listing scrape jobs: {e}")
+            return jsonify({'error': 'Failed to fetch scrape jobs'}), 500
+    
+    @app.route('/api/scheduler', methods=['GET'])
+    def get_schedule():
+        """Get per-source polling intervals and next run times"""
+        return jsonify({
+            'enabled': app.config['SCHEDULER_ENABLED'],
+            'sources': scheduler.get_schedule()
+        })
+    
+    @app.route('/api/facets', methods=['GET'])
+    def get_facets():
+        """Get per-source, category, sentiment and hotness counts for the current filters"""
+        cached = response_cache.get()
+        if cached:
+            return cached
+        
+        try:
+            filters = {
+                'source': split_param(request.args.get('source')),
+                'category': split_param(request.args.get('category')),
+                'sentiment': split_param(request.args.get('sentiment')),
+                'keywords': split_param(request.args.get('keywords')),
+                'min_hotness': request.args.get('min_hotness', type=float)
+            }
+            
+            counts = facet_service.counts(filters)
+            
+            return response_cache.store({
+                'facets': format_facets(counts),
+                'filters': {key: value for key, value in filters.items() if value}
+            })
+        
+        except Exception as e:
+            logger.error(f"Error getting facets: {e}")
+            return jsonify({'error': 'Failed to fetch facets'}), 500
+    
     @app.route('/api/stats', methods=['GET'])
     def get_stats():
         """Get overall statistics"""
@@ -255,7 +523,7 @@ def create_app(config_name='default'):
             stats = ranking_service.get_engagement_stats(articles_data)
             
             # Get trending keywords
-            trending_keywords = ranking_service.get_trending_keywords(articles_data)
+            trending_keywords = keyword_service.trending(week_ago)
             
             # Get source distribution
             sources = {}
@@ -280,14 +548,8 @@ def create_app(config_name='default'):
         try:
             limit = request.args.get('limit', 20, type=int)
             
-            # Get recent articles
             week_ago = datetime.utcnow() - timedelta(days=7)
-            recent_articles = Article.query.filter(
-                Article.scraped_at >= week_ago
-            ).all()
-            
-            articles_data = [article.to_dict() for article in recent_articles]
-            trending = ranking_service.get_trending_keywords(articles_data, limit)
+            trending = keyword_service.trending(week_ago, limit)
             
             return jsonify({
                 'keywords': trending,
@@ -309,12 +571,12 @@ def create_app(config_name='default'):
             if not query_text:
                 return jsonify({'error': 'Query parameter required'}), 400
             
-            # Search in title, content, and keywords
+            # Search in title, summary, and keywords
             articles = Article.query.filter(
                 db.or_(
                     Article.title.ilike(f'%{query_text}%'),
-                    Article.content.ilike(f'%{query_text}%'),
-                    Article.keywords.ilike(f'%{query_text}%')
+                    Article.summary.ilike(f'%{query_text}%'),
+                    keyword_service.mentions(query_text)
                 )
             ).order_by(Article.hotness_score.desc()).paginate(
                 page=page,
@@ -339,12 +601,277 @@ def create_app(config_name='default'):
             logger.error(f"Error searching articles: {e}")
             return jsonify({'error': 'Search failed'}), 500
     
-    # Create database tables
+    @app.route('/api/archive', methods=['GET'])
+    def search_archive():
+        """Search archived articles (kept out of every other endpoint)"""
+        try:
+            query_text = request.args.get('q', '').strip()
+            page = request.args.get('page', 1, type=int)
+            per_page = request.args.get('per_page', 20, type=int)
+            since = request.args.get('since')
+            until = request.args.get('until')
+            
+            articles = retention.search(
+                query_text=query_text,
+                source=request.args.get('source'),
+                category=request.args.get('category'),
+                since=datetime.fromisoformat(since) if since else None,
+                until=datetime.fromisoformat(until) if until else None
+            ).paginate(
+                page=page,
+                per_page=min(per_page, 100),
+                error_out=False
+            )
+            
+            return jsonify({
+                'articles': [article.to_dict() for article in articles.items],
+                'pagination': {
+                    'page': articles.page,
+                    'pages': articles.pages,
+                    'per_page': articles.per_page,
+                    'total': articles.total,
+                    'has_next': articles.has_next,
+                    'has_prev': articles.has_prev
+                },
+                'query': query_text
+            })
+        
+        except ValueError:
+            return jsonify({'error': 'since and until must be ISO 8601 dates'}), 400
+        except Exception as e:
+            logger.error(f"Error searching archive: {e}")
+            return jsonify({'error': 'Archive search failed'}), 500
+    
+    @app.route('/api/archive/<int:article_id>', methods=['GET'])
+    def get_archived_article(article_id):
+        """Get an archived article by its original ID"""
+        article = db.session.get(ArchivedArticle, article_id)
+        if not article:
+            return jsonify({'error': 'Archived article not found'}), 404
+        
+        try:
+            data = article.to_dict()
+            data['content'] = retention.content(article)
+            return jsonify(data)
+        
+        except Exception as e:
+            logger.error(f"Error getting archived article {article_id}: {e}")
+            return jsonify({'error': 'Failed to fetch archived article'}), 500
+    
+    @app.route('/api/users', methods=['POST'])
+    def create_user():
+        """Create a user"""
+        data = request.get_json(silent=True) or {}
+        username = (data.get('username') or '').strip()
+        email = (data.get('email') or '').strip()
+        
+        if not username or not email:
+            return jsonify({'error': 'username and email are required'}), 400
+        if User.query.filter(db.or_(User.username == username, User.email == email)).first():
+            return jsonify({'error': 'Username or email already registered'}), 409
+        
+        try:
+            user = User(
+                username=username,
+                email=email,
+                first_name=data.get('first_name'),
+                last_name=data.get('last_name')
+            )
+            db.session.add(user)
+            db.session.commit()
+            return jsonify(user.to_dict()), 201
+        
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error creating user: {e}")
+            return jsonify({'error': 'Failed to create user'}), 500
+    
+    @app.route('/api/users/<int:user_id>', methods=['GET'])
+    def get_user(user_id):
+        """Get a user profile"""
+        user = db.session.get(User, user_id)
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+        
+        return jsonify(user.to_dict())
+    
+    @app.route('/api/users/<int:user_id>/preferences', methods=['GET'])
+    def get_user_preferences(user_id):
+        """Get a user's feed preferences"""
+        preferences = UserPreferences.query.filter_by(user_id=user_id).first()
+        if not preferences:
+            return jsonify({'error': 'Preferences not found'}), 404
+        
+        return jsonify(preferences.to_dict())
+    
+    @app.route('/api/users/<int:user_id>/preferences', methods=['PUT'])
+    def update_user_preferences(user_id):
+        """Create or update a user's feed preferences"""
+        if not db.session.get(User, user_id):
+            return jsonify({'error': 'User not found'}), 404
+        
+        data = request.get_json(silent=True) or {}
+        list_fields = ('preferred_keywords', 'blocked_keywords', 'preferred_sources',
+                       'blocked_sources', 'preferred_categories')
+        for field in list_fields:
+            if field in data and not isinstance(data[field], list):
+                return jsonify({'error': f'{field} must be a list'}), 400
+        if 'notification_frequency' in data and data['notification_frequency'] not in FREQUENCIES:
+            return jsonify({'error': f"notification_frequency must be one of {', '.join(FREQUENCIES)}"}), 400
+        min_hotness_score = data.get('min_hotness_score', 0.0)
+        if isinstance(min_hotness_score, bool) or not isinstance(min_hotness_score, (int, float)) \
+                or not 0 <= min_hotness_score <= 1:
+            return jsonify({'error': 'min_hotness_score must be a number between 0 and 1'}), 400
+        articles_per_page = data.get('articles_per_page', 20)
+        if isinstance(articles_per_page, bool) or not isinstance(articles_per_page, int) \
+                or not 1 <= articles_per_page <= 100:
+            return jsonify({'error': 'articles_per_page must be an integer between 1 and 100'}), 400
+        for field in ('show_images', 'show_summaries'):
+            if field in data and not isinstance(data[field], bool):
+                return jsonify({'error': f'{field} must be true or false'}), 400
+        
+        try:
+            preferences = UserPreferences.query.filter_by(user_id=user_id).first()
+            if not preferences:
+                preferences = UserPreferences(user_id=user_id)
+                db.session.add(preferences)
+            
+            for field in list_fields:
+                if field in data:
+                    setattr(preferences, field, json.dumps([str(item) for item in data[field]]))
+            for field in ('notification_frequency', 'min_hotness_score', 'articles_per_page',
+                          'show_images', 'show_summaries'):
+                if field in data:
+                    setattr(preferences, field, data[field])
+            
+            db.session.commit()
+            personalization.invalidate(user_id)
+            digest_service.update_user(user_id)
+            return jsonify(preferences.to_dict())
+        
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error updating preferences for user {user_id}: {e}")
+            return jsonify({'error': 'Failed to update preferences'}), 500
+    
+    @app.route('/api/users/<int:user_id>/feed', methods=['GET'])
+    def get_user_feed(user_id):
+        """Get recent articles ranked by a user's preferences"""
+        try:
+            page = max(request.args.get('page', 1, type=int), 1)
+            per_page = min(request.args.get('per_page', 20, type=int), 100)
+            
+            min_hotness = request.args.get('min_hotness', 0.0, type=float)
+            
+            ranked = personalization.rank(
+                user_id, limit=per_page, offset=(page - 1) * per_page, min_hotness=min_hotness
+            )
+            if ranked is None:
+                return jsonify({'error': 'Preferences not found'}), 404
+            
+            ids = [article_id for article_id, _ in ranked['items']]
+            articles = {article.id: article for article in Article.query.filter(Article.id.in_(ids)).all()}
+            
+            feed = []
+            for article_id, score in ranked['items']:
+                if article_id in articles:
+                    data = articles[article_id].to_dict()
+                    data['feed_score'] = round(score, 4)
+                    feed.append(data)
+            
+            return jsonify({
+                'articles': feed,
+                'pagination': {
+                    'page': page,
+                    'per_page': per_page,
+                    'has_next': ranked['has_next'],
+                    'has_prev': page > 1
+                }
+            })
+        
+        except Exception as e:
+            logger.error(f"Error building feed for user {user_id}: {e}")
+            return jsonify({'error': 'Failed to build feed'}), 500
+    
+    @app.cli.command('backfill-keywords')
+    def backfill_keywords_command():
+        """Fill the keyword index for articles stored before it existed"""
+        count = db_writer.run(keyword_service.backfill)
+        click.echo(f'Indexed keywords for {count} articles')
+    
+    @app.cli.command('compress-bodies')
+    @click.option('--retrain', is_flag=True, help='Train a new compression dictionary first')
+    @click.option('--no-vacuum', is_flag=True, help='Skip VACUUM after moving bodies (SQLite)')
+    def compress_bodies_command(retrain, no_vacuum):
+        """Move article bodies into the compressed article_body table and report space saved"""
+        before = db_writer.run(body_store.report)
+        
+        if body_store.use_dictionary and (retrain or body_store.active_dictionary()[0] is None):
+            db_writer.run(body_store.train_dictionary)
+        moved = db_writer.run(body_store.migrate)
+        if moved and not no_vacuum:
+            db_writer.run(body_store.vacuum)
+        
+        after = db_writer.run(body_store.report)
+        click.echo(f"Moved {moved} bodies; {after['bodies']} stored with {after['codec']} "
+                   f"(dictionary {after['dictionary_id']})")
+        click.echo(f"Bodies: {after['raw_bytes']} bytes raw, {after['stored_bytes']} stored, "
+                   f"ratio {after['ratio']}")
+        if 'database_bytes' in before:
+            click.echo(f"Database: {before['database_bytes']} -> {after['database_bytes']} bytes")
+        for name in ('article', 'article_body'):
+            if name in after.get('table_bytes', {}):
+                click.echo(f"Table {name}: {before.get('table_bytes', {}).get(name, 0)} -> "
+                           f"{after['table_bytes'][name]} bytes")
+    
+    @app.cli.command('fetch-fulltext')
+    @click.option('--limit', default=500, help='Newest articles without a full-length body to fetch')
+    def fetch_fulltext_command(limit):
+        """Fetch and extract the article pages of stored articles that only have the feed text"""
+        queued = fulltext.enqueue(fulltext.missing(limit))
+        fulltext.wait()
+        outcomes = ', '.join(f'{outcome}: {count}' for outcome, count in sorted(fulltext.outcomes.items()))
+        click.echo(f"Fetched {queued} pages ({outcomes or 'nothing to do'})")
+    
+    @app.cli.command('build-snapshots')
+    def build_snapshots_command():
+        """Pre-render the home-feed snapshot now"""
+        responses, size = snapshots.build()
+        click.echo(f"Wrote {responses} responses ({size} bytes) to {snapshots.path}")
+    
+    @app.cli.command('send-digests')
+    def send_digests_command():
+        """Deliver every notification digest that is due now"""
+        sent = db_writer.run(digest_service.send_due)
+        click.echo(', '.join(f'{frequency}: {count}' for frequency, count in sent.items()))
+    
+    @app.cli.command('archive-articles')
+    @click.option('--dry-run', is_flag=True, help='Only count the articles that are due')
+    def archive_articles_command(dry_run):
+        """Move articles past the retention limits into the archive table"""
+        count = db_writer.run(retention.run, dry_run=dry_run)
+        click.echo(f"{'Would archive' if dry_run else 'Archived'} {count} articles")
+    
+    # Create database tables, unless the schema already matches the models
     with app.app_context():
-        db.create_all()
+        ensure_schema(app, db, SchemaState)
     
     return app
 
+def start_scheduler(app):
+    """Start polling sources in the background; only serving entry points call this.
+
+    CLI commands, the Celery worker and scripts build the app with create_app()
+    alone, so they never poll live feeds.
+    """
+    if not app.config['SCHEDULER_ENABLED']:
+        return False
+    scheduler = app.extensions['scheduler']
+    with app.app_context():
+        scheduler.seed(db, Article)
+    return scheduler.start()
+
 if __name__ == '__main__':
     app = create_app()
+    start_scheduler(app)
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -0,0 +1,128 @@
+"""Read latency with many reader threads, idle vs. during a continuous scrape write load.
+
+Usage (from backend/):
+    python -m benchmarks.bench_concurrency [--readers 16] [--seconds 5] [--no-wal]
+"""
+import os
+import sys
+import json
+import random
+import argparse
+import tempfile
+import threading
+import statistics
+import time
+from datetime import datetime
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--articles', type=int, default=5000)
+    parser.add_argument('--readers', type=int, default=16)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--batch', type=int, default=20, help='articles per simulated scrape write')
+    parser.add_argument('--no-wal', action='store_true', help='keep the rollback journal for comparison')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', action='store_true', help='print machine-readable results')
+    return parser.parse_args(argv)
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * pct / 100), len(ordered) - 1)]
+
+def run_phase(app, args, with_writes, id_range):
+    stop = threading.Event()
+    latencies = []
+    errors = []
+    writes = [0]
+    lock = threading.Lock()
+
+    def reader(seed):
+        rng = random.Random(seed)
+        client = app.test_client()
+        local = []
+        while not stop.is_set():
+            if rng.random() < 0.5:
+                path = f'/api/articles?page={rng.randint(1, 50)}&per_page=20'
+            else:
+                path = f'/api/articles/{rng.randint(*id_range)}'
+            start = time.perf_counter()
+            status = client.get(path).status_code
+            local.append((time.perf_counter() - start) * 1000)
+            if status >= 500:
+                errors.append(path)
+        with lock:
+            latencies.extend(local)
+
+    def writer():
+        ingest = app.extensions['ingest']
+        rng = random.Random(args.seed + 1)
+        while not stop.is_set():
+            batch = [{
+                'title': f'Synthetic scrape {rng.random()}',
+                'url': f'https://example.com/live/{rng.random()}',
+                'content': 'model ' * rng.randint(150, 900),
+                'source': 'Load Test',
+                'published_at': datetime.utcnow(),
+                'keywords': '[]',
+            } for _ in range(args.batch)]
+            ingest.writer.run(ingest.store_articles, batch)
+            writes[0] += len(batch)
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(args.readers)]
+    if with_writes:
+        threads.append(threading.Thread(target=writer))
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    return {
+        'phase': 'during writes' if with_writes else 'idle',
+        'requests': len(latencies),
+        'errors': len(errors),
+        'p50_ms': round(percentile(latencies, 50), 2),
+        'p95_ms': round(percentile(latencies, 95), 2),
+        'p99_ms': round(percentile(latencies, 99), 2),
+        'max_ms': round(max(latencies or [0]), 2),
+        'rows_written_per_s': round(writes[0] / args.seconds, 1),
+    }
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix='ai-news-bench-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ['SCHEDULER_ENABLED'] = 'false'
+    os.environ['THUMBNAIL_ENABLED'] = 'false'  # no image downloads from fixture URLs
+    os.environ['SNAPSHOT_ENABLED'] = 'false'  # time the query path, not the pre-rendered feed
+    os.environ['RESPONSE_CACHE_TTL'] = '0'
+    os.environ['SQLITE_WAL_ENABLED'] = 'false' if args.no_wal else 'true'
+
+    from app import create_app
+    from benchmarks.bench_responses import seed_articles
+
+    app = create_app()
+    seed_articles(app, args.articles, random.Random(args.seed))
+
+    results = [
+        run_phase(app, args, with_writes=False, id_range=(1, args.articles)),
+        run_phase(app, args, with_writes=True, id_range=(1, args.articles)),
+    ]
+
+    if args.json:
+        json.dump({'wal': not args.no_wal, 'readers': args.readers, 'phases': results}, sys.stdout, indent=2)
+        print()
+        return
+
+    print(f"WAL {'off' if args.no_wal else 'on'}, {args.readers} reader threads, {args.seconds}s per phase")
+    columns = list(results[0].keys())
+    print('  '.join(c.ljust(16) for c in columns))
+    for row in results:
+        print('  '.join(str(row[c]).ljust(16) for c in columns))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+"""Digest matching and delivery throughput for a large user base.
+
+Usage (from backend/):
+    python -m benchmarks.bench_digests [--users 100000] [--articles 500]
+"""
+import os
+import sys
+import json
+import random
+import argparse
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+SOURCES = ['AI News', 'VentureBeat AI', 'TechCrunch AI', 'Wired AI']
+FREQUENCIES = ['hourly', 'daily', 'daily', 'daily', 'weekly']
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=100000)
+    parser.add_argument('--articles', type=int, default=500)
+    parser.add_argument('--naive-sample', type=int, default=20, help='articles timed with the user x article loop')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', action='store_true', help='print machine-readable results')
+    return parser.parse_args(argv)
+
+def seed_users(app, count, rng, words):
+    """Insert users with a mix of keyword, source and catch-all preferences"""
+    digests = app.extensions['digests']
+    db, User, UserPreferences = digests.db, digests.User, digests.UserPreferences
+    # Users follow many niche topics the synthetic articles never mention
+    topics = list(words) + [f'topic {i}' for i in range(len(words) * 10)]
+
+    users, preferences = [], []
+    for user_id in range(1, count + 1):
+        users.append({
+            'id': user_id, 'username': f'user{user_id}', 'email': f'user{user_id}@example.com',
+            'is_active': True, 'email_notifications': rng.random() < 0.9
+        })
+        kind = rng.random()
+        preferences.append({
+            'user_id': user_id,
+            'preferred_keywords': json.dumps(rng.sample(topics, rng.randint(1, 4)) if kind < 0.7 else []),
+            'preferred_sources': json.dumps([rng.choice(SOURCES)] if 0.6 < kind < 0.95 else []),
+            'blocked_keywords': json.dumps([rng.choice(words)] if rng.random() < 0.2 else []),
+            'blocked_sources': json.dumps([]),
+            'preferred_categories': json.dumps([]),
+            'notification_frequency': rng.choice(FREQUENCIES),
+            'min_hotness_score': round(rng.uniform(0, 0.8), 2),
+            'created_at': datetime.utcnow(),
+            'updated_at': datetime.utcnow()
+        })
+
+    with app.app_context():
+        for start in range(0, count, 10000):
+            db.session.execute(User.__table__.insert(), users[start:start + 10000])
+            db.session.execute(UserPreferences.__table__.insert(), preferences[start:start + 10000])
+        db.session.commit()
+
+def naive_match(profiles, article, keyword_service):
+    """Reference: compare one article with every user"""
+    keywords = frozenset(keyword_service.parse_keywords(article.keywords, article.tags))
+    source = (article.source or '').lower()
+    hotness = article.hotness_score or 0.0
+    matched = []
+    for profile in profiles:
+        wanted = (
+            profile.is_wildcard
+            or source in profile.sources
+            or article.category in profile.categories
+            or not profile.keywords.isdisjoint(keywords)
+        )
+        if wanted and profile.accepts(hotness, source, keywords):
+            matched.append(profile.user_id)
+    return matched
+
+def main(argv=None):
+    args = parse_args(argv)
+    rng = random.Random(args.seed)
+
+    workdir = tempfile.mkdtemp(prefix='ai-news-bench-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ['SCHEDULER_ENABLED'] = 'false'
+    os.environ['THUMBNAIL_ENABLED'] = 'false'  # no image downloads from fixture URLs
+    os.environ['SNAPSHOT_ENABLED'] = 'false'  # time the query path, not the pre-rendered feed
+    os.environ['DIGEST_ENABLED'] = 'false'  # match explicitly below instead of on ingest
+    os.environ['DIGEST_OUTBOX_DIR'] = os.path.join(workdir, 'outbox')
+
+    from app import create_app
+    from benchmarks.bench_responses import seed_articles, WORDS
+
+    app = create_app()
+    digests = app.extensions['digests']
+    writer = app.extensions['db_writer']
+    seed_users(app, args.users, rng, WORDS)
+    seed_articles(app, args.articles, rng)
+    results = {'users': args.users, 'articles': args.articles}
+
+    with app.app_context():
+        articles = digests.Article.query.order_by(digests.Article.id).all()
+
+        start = time.perf_counter()
+        index = digests.index()
+        results['index_build_s'] = round(time.perf_counter() - start, 3)
+        results['indexed_users'] = len(index.profiles)
+
+        sample = articles[:args.naive_sample]
+        profiles = list(index.profiles.values())
+        start = time.perf_counter()
+        naive_pairs = sum(len(naive_match(profiles, article, digests.keyword_service)) for article in sample)
+        naive_per_article = (time.perf_counter() - start) / max(len(sample), 1)
+
+        start = time.perf_counter()
+        indexed_pairs = len(digests.match(sample))
+        indexed_per_article = (time.perf_counter() - start) / max(len(sample), 1)
+        assert indexed_pairs == naive_pairs, (indexed_pairs, naive_pairs)
+
+        start = time.perf_counter()
+        pairs = len(digests.match(articles))
+        elapsed = time.perf_counter() - start
+        results['match'] = {
+            'naive_ms_per_article': round(naive_per_article * 1000, 2),
+            'indexed_ms_per_article': round(indexed_per_article * 1000, 2),
+            'speedup': round(naive_per_article / indexed_per_article, 1) if indexed_per_article else None,
+            'articles_per_s': round(len(articles) / elapsed, 1),
+            'pairs': pairs,
+            'pairs_per_s': round(pairs / elapsed),
+        }
+
+    start = time.perf_counter()
+    queued = writer.run(digests.match_articles, articles)
+    elapsed = time.perf_counter() - start
+    results['queue'] = {'items': queued, 'items_per_s': round(queued / elapsed)}
+
+    later = datetime.utcnow() + timedelta(days=8)
+    start = time.perf_counter()
+    sent = writer.run(digests.send_due, later)
+    elapsed = time.perf_counter() - start
+    total = sum(sent.values())
+    results['send'] = {'digests': sent, 'seconds': round(elapsed, 2), 'digests_per_s': round(total / elapsed)}
+
+    if args.json:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+        return
+
+    print(f"{results['indexed_users']} of {args.users} users opted in, index built in {results['index_build_s']}s")
+    match = results['match']
+    print(f"match   {match['indexed_ms_per_article']} ms/article indexed vs {match['naive_ms_per_article']} ms "
+          f"naive ({match['speedup']}x), {match['pairs_per_s']} user-article pairs/s")
+    print(f"queue   {results['queue']['items']} items, {results['queue']['items_per_s']} items/s")
+    print(f"send    {total} digests {sent} in {results['send']['seconds']}s, "
+          f"{results['send']['digests_per_s']} digests/s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""Index build time and query latency of the related-articles endpoint.
+
+Usage (from backend/):
+    python -m benchmarks.bench_related [--articles 20000] [--queries 200]
+"""
+import os
+import sys
+import json
+import random
+import argparse
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+os.environ.setdefault('SCHEDULER_ENABLED', 'false')
+os.environ.setdefault('THUMBNAIL_ENABLED', 'false')  # no image downloads from fixture URLs
+os.environ.setdefault('SNAPSHOT_ENABLED', 'false')  # time the query path, not the pre-rendered feed
+os.environ.setdefault('RESPONSE_CACHE_TTL', '0')
+
+from app import create_app
+from benchmarks.bench_concurrency import percentile
+
+def seed_articles(app, count, rng, vocabulary=5000):
+    """Insert articles whose words follow a Zipf distribution, like real headlines"""
+    related = app.extensions['related']
+    db, Article = related.db, related.Article
+    words = [f'term{i}' for i in range(vocabulary)]
+    weights = [1 / (rank + 1) for rank in range(vocabulary)]
+    now = datetime.utcnow()
+
+    with app.app_context():
+        rows = []
+        for i in range(count):
+            rows.append({
+                'title': ' '.join(rng.choices(words, weights, k=rng.randint(6, 14))),
+                'summary': ' '.join(rng.choices(words, weights, k=rng.randint(30, 80))),
+                'url': f'https://example.com/{i}',
+                'source': 'Benchmark',
+                'published_at': now - timedelta(minutes=i),
+                'keywords': json.dumps(rng.choices(words[:500], k=5)),
+            })
+        db.session.execute(Article.__table__.insert(), rows)
+        db.session.commit()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--articles', type=int, default=20000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', action='store_true', help='print machine-readable results')
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    app = create_app()
+    seed_articles(app, args.articles, rng)
+    related = app.extensions['related']
+    client = app.test_client()
+
+    with app.app_context():
+        start = time.perf_counter()
+        related.index()
+        build_s = time.perf_counter() - start
+
+        articles = related.Article.query.filter(
+            related.Article.id.in_([rng.randint(1, args.articles) for _ in range(args.queries)])
+        ).all()
+        service_ms = []
+        found = 0
+        for article in articles:
+            start = time.perf_counter()
+            found += len(related.related(article, 10))
+            service_ms.append((time.perf_counter() - start) * 1000)
+
+    endpoint_ms = []
+    for article in articles:
+        start = time.perf_counter()
+        client.get(f'/api/articles/{article.id}/related?limit=10')
+        endpoint_ms.append((time.perf_counter() - start) * 1000)
+
+    results = {
+        'articles': args.articles,
+        'index_build_s': round(build_s, 2),
+        'avg_neighbours': round(found / max(len(articles), 1), 1),
+        'service_p50_ms': round(percentile(service_ms, 50), 2),
+        'service_p95_ms': round(percentile(service_ms, 95), 2),
+        'endpoint_p50_ms': round(percentile(endpoint_ms, 50), 2),
+        'endpoint_p95_ms': round(percentile(endpoint_ms, 95), 2),
+    }
+
+    if args.json:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+        return
+    for key, value in results.items():
+        print(f'{key:<18} {value}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+"""Serialization time and bytes on the wire for the list endpoints.
+
+Usage (from backend/):
+    python -m benchmarks.bench_responses [--articles 2000] [--iterations 50]
+"""
+import os
+import sys
+import json
+import random
+import argparse
+import statistics
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+os.environ.setdefault('SCHEDULER_ENABLED', 'false')
+os.environ.setdefault('THUMBNAIL_ENABLED', 'false')  # no image downloads from fixture URLs
+os.environ.setdefault('SNAPSHOT_ENABLED', 'false')  # time the query path, not the pre-rendered feed
+
+from app import create_app
+from services import response_service
+
+ENDPOINTS = [
+    '/api/articles?per_page=100',
+    '/api/articles?per_page=100&sort_by=date',
+    '/api/articles/trending?limit=50',
+    '/api/search?q=model&per_page=100',
+]
+
+WORDS = (
+    'model training inference openai google research benchmark dataset startup '
+    'funding regulation robotics transformer agent chip compute policy safety '
+    'release language vision open source enterprise cloud'
+).split()
+
+def seed_articles(app, count, rng):
+    """Insert synthetic articles with feed-sized bodies"""
+    ingest = app.extensions['ingest']
+    bodies = app.extensions['bodies']
+    Article, db = ingest.Article, ingest.db
+    now = datetime.utcnow()
+
+    with app.app_context():
+        for i in range(count):
+            content = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(150, 900)))
+            article = Article(
+                title=' '.join(rng.choice(WORDS) for _ in range(rng.randint(6, 14))).capitalize(),
+                url=f'https://example.com/{i}',
+                summary=content[:400],
+                author='Staff',
+                source=rng.choice(['AI News', 'VentureBeat AI', 'TechCrunch AI', 'Wired AI']),
+                published_at=now - timedelta(minutes=rng.randint(0, 60 * 24 * 14)),
+                keywords=json.dumps(rng.sample(WORDS, 5)),
+                hotness_score=rng.random(),
+                sentiment=rng.choice(['positive', 'neutral', 'negative']),
+                importance_score=rng.random()
+            )
+            db.session.add(article)
+            db.session.flush()
+            bodies.store(article.id, content)
+        db.session.commit()
+
+def time_call(fn, iterations):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+def bench_serialization(app, iterations):
+    """Compare the stdlib encoder with the fast provider on list-endpoint payloads"""
+    ingest = app.extensions['ingest']
+    Article = ingest.Article
+    results = []
+
+    with app.app_context():
+        payload = {'articles': [a.to_dict() for a in Article.query.limit(100).all()]}
+        fast = app.json
+
+        stdlib_ms = time_call(lambda: json.dumps(payload).encode('utf-8'), iterations)
+        fast_ms = time_call(lambda: fast.dumpb(payload), iterations)
+
+        results.append({
+            'payload': '100 articles',
+            'stdlib_ms': round(stdlib_ms, 3),
+            'fast_ms': round(fast_ms, 3),
+            'encoder': 'orjson' if response_service.orjson else 'stdlib',
+        })
+    return results
+
+def bench_wire(app, iterations):
+    """Measure response size per encoding plus cold and cached latency"""
+    client = app.test_client()
+    cache = app.extensions['response_cache']
+    results = []
+
+    for path in ENDPOINTS:
+        row = {'endpoint': path}
+        for encoding in ['identity', 'gzip', 'br']:
+            if encoding == 'br' and not response_service.brotli:
+                continue
+            response = client.get(path, headers={'Accept-Encoding': encoding})
+            row[f'{encoding}_bytes'] = len(response.get_data())
+
+        def cold():
+            cache.clear()
+            client.get(path, headers={'Accept-Encoding': 'gzip'})
+
+        row['cold_ms'] = round(time_call(cold, iterations), 3)
+        row['cached_ms'] = round(time_call(
+            lambda: client.get(path, headers={'Accept-Encoding': 'gzip'}), iterations
+        ), 3)
+        results.append(row)
+    return results
+
+def print_table(rows):
+    if not rows:
+        return
+    columns = list(rows[0].keys())
+    widths = {c: max(len(c), *(len(str(r.get(c, ''))) for r in rows)) for c in columns}
+    print('  '.join(c.ljust(widths[c]) for c in columns))
+    for row in rows:
+        print('  '.join(str(row.get(c, '')).ljust(widths[c]) for c in columns))
+    print()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--articles', type=int, default=2000)
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', action='store_true', help='print machine-readable results')
+    args = parser.parse_args(argv)
+
+    app = create_app()
+    seed_articles(app, args.articles, random.Random(args.seed))
+
+    results = {
+        'serialization': bench_serialization(app, args.iterations),
+        'wire': bench_wire(app, args.iterations),
+    }
+
+    if args.json:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    else:
+        print_table(results['serialization'])
+        print_table(results['wire'])
+
+if __name__ == '__main__':
+    main()
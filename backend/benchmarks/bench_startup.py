@@ -0,0 +1,127 @@
+"""Startup cost: import time, create_app on a new and on a current database, first request.
+
+Every sample runs in a fresh interpreter, like a gunicorn worker spawn or a
+test run. Also lists the heavy modules that are no longer imported at
+startup, with what they would cost, and the slowest imports that remain.
+
+Usage (from backend/):
+    python -m benchmarks.bench_startup [--runs 5] [--top 10]
+"""
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+
+from benchmarks.bench_concurrency import percentile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Imported on first use instead of at startup
+DEFERRED_MODULES = ('openai', 'textblob', 'flask_migrate', 'bs4')
+
+BOOT = '''
+import json, sys, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+application = app.create_app()
+created = time.perf_counter()
+application.test_client().get('/api/scheduler')
+served = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - started) * 1000,
+    'create_app_ms': (created - imported) * 1000,
+    'first_request_ms': (served - created) * 1000,
+    'total_ms': (served - started) * 1000,
+    'deferred_loaded': [name for name in %r if name in sys.modules],
+}))
+''' % (DEFERRED_MODULES,)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help='fresh interpreters per measurement')
+    parser.add_argument('--top', type=int, default=10, help='slowest remaining imports to list')
+    parser.add_argument('--json', action='store_true', help='print machine-readable results')
+    return parser.parse_args(argv)
+
+def run_python(code, env, *flags):
+    return subprocess.run(
+        [sys.executable, *flags, '-c', code], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    )
+
+def boot(env):
+    return json.loads(run_python(BOOT, env).stdout.strip().splitlines()[-1])
+
+def import_ms(module, env):
+    """What importing module adds once the app is loaded, i.e. its cost on first use"""
+    code = f'import app, time; t = time.perf_counter(); import {module}; print((time.perf_counter() - t) * 1000)'
+    try:
+        return float(run_python(code, env).stdout.strip())
+    except subprocess.CalledProcessError:
+        return None  # not installed
+
+def slowest_imports(env, top):
+    """Top-level modules imported by `import app`, by cumulative time"""
+    stderr = run_python('import app', env, '-X', 'importtime').stderr
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if len(name) - len(name.lstrip()) <= 3:  # imported by app itself, not a dependency's dependency
+            modules.append((int(cumulative) / 1000, name.strip()))
+    return [
+        {'module': name, 'ms': round(ms, 1)}
+        for ms, name in sorted(modules, reverse=True) if name != 'app'
+    ][:top]
+
+def summarize(samples, key):
+    values = [sample[key] for sample in samples]
+    return {'p50': round(percentile(values, 50), 1), 'min': round(min(values), 1)}
+
+def main(argv=None):
+    args = parse_args(argv)
+    workdir = tempfile.mkdtemp(prefix='ai-news-startup-')
+    env = dict(
+        os.environ, SCHEDULER_ENABLED='false', DIGEST_ENABLED='false', THUMBNAIL_ENABLED='false',
+        SNAPSHOT_ENABLED='false',
+        DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'startup.db')}"
+    )
+
+    # The first boot creates the schema; the rest find it current
+    new_database = boot(env)
+    current = [boot(env) for _ in range(args.runs)]
+    results = {
+        'runs': args.runs,
+        'new_database_ms': {key: round(new_database[key], 1) for key in ('import_ms', 'create_app_ms', 'total_ms')},
+        'import_ms': summarize(current, 'import_ms'),
+        'create_app_ms': summarize(current, 'create_app_ms'),
+        'first_request_ms': summarize(current, 'first_request_ms'),
+        'total_ms': summarize(current, 'total_ms'),
+        'deferred_loaded_at_startup': current[-1]['deferred_loaded'],
+        'deferred_import_ms': {name: import_ms(name, env) for name in DEFERRED_MODULES},
+        'slowest_imports': slowest_imports(env, args.top),
+    }
+
+    if args.json:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+        return
+    for key in ('import_ms', 'create_app_ms', 'first_request_ms', 'total_ms'):
+        print(f"{key:<18} p50 {results[key]['p50']:>7.1f}  min {results[key]['min']:>7.1f}")
+    print(f"new database       import {results['new_database_ms']['import_ms']:.1f}, "
+          f"create_app {results['new_database_ms']['create_app_ms']:.1f}")
+    deferred = ', '.join(
+        f'{name} {ms:.0f} ms' if ms is not None else f'{name} (not installed)'
+        for name, ms in results['deferred_import_ms'].items()
+    )
+    print(f'deferred imports   {deferred}')
+    if results['deferred_loaded_at_startup']:
+        print(f"  still loaded at startup: {', '.join(results['deferred_loaded_at_startup'])}")
+    print('slowest imports:')
+    for item in results['slowest_imports']:
+        print(f"  {item['ms']:>7.1f} ms  {item['module']}")
+
+if __name__ == '__main__':
+    main()
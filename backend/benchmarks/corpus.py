@@ -0,0 +1,176 @@
+"""Seeded synthetic corpus of articles and users for benchmarks.
+
+Text follows a Zipf word distribution with realistic title, summary and body
+lengths. Sources are skewed towards a few large publishers, and engagement
+is heavy-tailed: most articles get a few views and a handful go viral. The
+same seed always produces the same corpus.
+"""
+import json
+import math
+import random
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from services.ranking_service import RankingService
+
+# Head of the vocabulary: terms the AI filter and keyword features look for
+AI_TERMS = (
+    'machine learning', 'openai', 'gpt', 'llm', 'neural network', 'generative ai', 'robotics',
+    'transformer', 'computer vision', 'deep learning', 'chatgpt', 'gemini', 'ai model', 'nlp'
+)
+COMMON_WORDS = (
+    'model training inference google research benchmark dataset startup funding regulation '
+    'agent chip compute policy safety release language vision open source enterprise cloud '
+    'data privacy hardware lab paper launch partnership acquisition billion million team'
+).split()
+PUBLISHERS = [
+    'AI News', 'VentureBeat AI', 'TechCrunch AI', 'MIT Technology Review AI',
+    'The Verge AI', 'Ars Technica AI', 'IEEE Spectrum AI', 'Wired AI'
+]
+CATEGORIES = (('AI', 70), ('Research', 12), ('Business', 10), ('Policy', 5), ('Hardware', 3))
+SENTIMENTS = (('neutral', 55), ('positive', 30), ('negative', 15))
+
+class Corpus:
+    """Deterministic generator of article rows (dicts ready for Article.__table__.insert())"""
+
+    def __init__(self, seed=42, vocabulary=5000, long_tail_sources=40, window_days=120):
+        self.rng = random.Random(seed)
+        self.window = timedelta(days=window_days)
+        self.now = datetime.utcnow().replace(microsecond=0)
+        self.ranking = RankingService()
+
+        self.words = list(COMMON_WORDS) + [f'w{i}' for i in range(vocabulary - len(COMMON_WORDS))]
+        self.word_weights = self._cumulative(len(self.words))
+        self.keywords = list(AI_TERMS) + list(COMMON_WORDS) + [f'topic {i}' for i in range(500)]
+        self.keyword_weights = self._cumulative(len(self.keywords))
+        self.sources = PUBLISHERS + [f'Blog {i}' for i in range(long_tail_sources)]
+        self.source_weights = self._cumulative(len(self.sources), exponent=1.2)
+
+    @staticmethod
+    def _cumulative(size, exponent=1.0):
+        total = 0.0
+        weights = []
+        for rank in range(size):
+            total += 1 / (rank + 1) ** exponent
+            weights.append(total)
+        return weights
+
+    def text(self, words):
+        return ' '.join(self.rng.choices(self.words, cum_weights=self.word_weights, k=max(words, 1)))
+
+    def _lognormal_int(self, median, sigma, low, high):
+        return min(max(int(self.rng.lognormvariate(math.log(median), sigma)), low), high)
+
+    def _weighted(self, pairs):
+        return self.rng.choices([value for value, _ in pairs], [weight for _, weight in pairs])[0]
+
+    def article(self, index, with_body=True):
+        rng = self.rng
+        title = self.text(self._lognormal_int(10, 0.3, 4, 20)).capitalize()
+        if rng.random() < 0.9:
+            # Most feed items mention an AI term, so the scraper's filter keeps them
+            title = f'{title} {rng.choice(AI_TERMS)}'
+        summary = self.text(self._lognormal_int(50, 0.4, 15, 150))
+        published_at = self.now - timedelta(seconds=int(rng.expovariate(3 / self.window.total_seconds())))
+        published_at = max(published_at, self.now - self.window)
+
+        views = int(rng.lognormvariate(5.5, 1.6))
+        row = {
+            'title': title[:500],
+            'url': f'https://news{index % 97}.example.com/{published_at:%Y/%m}/{index}',
+            'summary': summary,
+            'author': f'Author {rng.randint(1, 2000)}',
+            'source': rng.choices(self.sources, cum_weights=self.source_weights)[0],
+            'category': self._weighted(CATEGORIES),
+            'published_at': published_at,
+            'scraped_at': min(published_at + timedelta(minutes=rng.randint(5, 600)), self.now),
+            'updated_at': self.now,
+            'views': views,
+            'likes': int(views * rng.betavariate(1, 30)),
+            'shares': int(views * rng.betavariate(1, 60)),
+            'comments': int(views * rng.betavariate(1, 120)),
+            'citations': int(rng.paretovariate(3)) - 1,
+            'keywords': json.dumps(sorted(set(rng.choices(
+                self.keywords, cum_weights=self.keyword_weights, k=rng.randint(3, 8)
+            )))),
+            'tags': json.dumps(rng.sample(COMMON_WORDS, rng.randint(0, 3))),
+            'image_url': f'https://cdn.example.com/img/{index}.jpg' if rng.random() < 0.7 else None,
+            'sentiment': self._weighted(SENTIMENTS),
+            'importance_score': round(rng.betavariate(2, 5), 4),
+        }
+        row['hotness_score'] = self.ranking.calculate_hotness_score(row)
+        if with_body:
+            row['content'] = self.text(self._lognormal_int(600, 0.6, 80, 5000))
+        return row
+
+    def articles(self, count, start=0, with_body=True):
+        for index in range(start, start + count):
+            yield self.article(index, with_body)
+
+    def users(self, count):
+        rng = self.rng
+        for user_id in range(1, count + 1):
+            keywords = rng.choices(self.keywords, cum_weights=self.keyword_weights, k=rng.randint(0, 5))
+            yield {
+                'user': {
+                    'id': user_id, 'username': f'user{user_id}', 'email': f'user{user_id}@example.com',
+                    'is_active': True, 'email_notifications': rng.random() < 0.5, 'created_at': self.now
+                },
+                'preferences': {
+                    'user_id': user_id,
+                    'preferred_keywords': json.dumps(sorted(set(keywords))),
+                    'preferred_sources': json.dumps(rng.sample(PUBLISHERS, rng.randint(0, 2))),
+                    'blocked_keywords': json.dumps([]),
+                    'blocked_sources': json.dumps([]),
+                    'preferred_categories': json.dumps([]),
+                    'notification_frequency': rng.choice(['hourly', 'daily', 'weekly']),
+                    'min_hotness_score': 0.0,
+                    'created_at': self.now,
+                    'updated_at': self.now
+                }
+            }
+
+def load_corpus(app, articles, users=0, seed=42, with_bodies=True, chunk_size=5000):
+    """Bulk-insert a corpus through Core inserts, with bodies and the keyword index.
+
+    Returns the Corpus so callers can generate more rows from the same stream.
+    """
+    ingest = app.extensions['ingest']
+    bodies = app.extensions['bodies']
+    keywords = app.extensions['personalization'].keyword_service
+    digests = app.extensions['digests']
+    db, Article = ingest.db, ingest.Article
+    corpus = Corpus(seed)
+
+    with app.app_context():
+        next_id = (db.session.query(db.func.max(Article.id)).scalar() or 0) + 1
+        remaining = articles
+        while remaining > 0:
+            rows = list(corpus.articles(min(chunk_size, remaining), start=next_id, with_body=with_bodies))
+            remaining -= len(rows)
+
+            body_rows = []
+            for row in rows:
+                row['id'] = next_id
+                next_id += 1
+                content = row.pop('content', None)
+                if content:
+                    codec, dictionary_id, data = bodies.encode(content)
+                    body_rows.append({
+                        'article_id': row['id'], 'codec': codec, 'dictionary_id': dictionary_id,
+                        'size': len(content.encode('utf-8')), 'data': data
+                    })
+
+            db.session.execute(Article.__table__.insert(), rows)
+            if body_rows:
+                db.session.execute(bodies.ArticleBody.__table__.insert(), body_rows)
+            keywords.index_articles([SimpleNamespace(**row) for row in rows])  # commits
+
+        user_rows = list(corpus.users(users))
+        for start in range(0, len(user_rows), chunk_size):
+            chunk = user_rows[start:start + chunk_size]
+            db.session.execute(digests.User.__table__.insert(), [row['user'] for row in chunk])
+            db.session.execute(digests.UserPreferences.__table__.insert(), [row['preferences'] for row in chunk])
+        db.session.commit()
+
+    return corpus
@@ -0,0 +1,320 @@
+"""Local HTTP server replaying RSS/Atom feeds, for load tests without the live sites.
+
+Feeds are either synthetic, generated from the seeded corpus, or recorded
+documents served as-is from a directory. Latency, feed size, error rate,
+publishing churn and ETag behaviour are configurable, so slow, flaky or
+cache-hostile publishers can be reproduced. With --article-pages every
+synthetic entry links to an HTML article page on this server, for the
+full-text fetcher.
+
+Usage (from backend/):
+    python -m benchmarks.feed_server [--port 8808] [--feeds 8] [--items 50] [--latency-ms 100]
+                                     [--error-rate 0.05] [--etag honor|ignore|rotate|none]
+    python -m benchmarks.feed_server --recorded feeds/          # replay recorded documents
+    python -m benchmarks.feed_server --record feeds/            # record the live AI_RSS_SOURCES
+    python -m benchmarks.feed_server --no-content --article-pages [--page-latency-ms 150]
+
+GET / lists the feeds as JSON, GET /feeds/<slug>.xml serves one,
+GET /articles/<slug>/<n>.html one article page, GET /stats returns request
+counts.
+"""
+import os
+import sys
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from email.utils import formatdate
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from benchmarks.corpus import Corpus, PUBLISHERS
+from benchmarks.fixtures import render_feed, render_page, slugify
+
+ETAG_MODES = ('honor', 'ignore', 'rotate', 'none')
+ERROR_STATUSES = (500, 502, 503)
+ROBOTS_TXT = b'User-agent: *\nDisallow: /private/\n'
+RECORDED_EXTENSIONS = ('.xml', '.rss', '.atom')
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_server_arguments(parser)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8808)
+    parser.add_argument('--record', metavar='DIR', help='download the live AI_RSS_SOURCES into DIR and exit')
+    return parser.parse_args(argv)
+
+def add_server_arguments(parser):
+    """Options shared with the load driver"""
+    parser.add_argument('--feeds', type=int, default=len(PUBLISHERS), help='synthetic feeds to serve')
+    parser.add_argument('--items', type=int, default=50, help='entries per synthetic feed')
+    parser.add_argument('--format', choices=('rss', 'atom', 'mixed'), default='rss')
+    parser.add_argument('--no-content', action='store_true', help='summaries only, no full-text bodies')
+    parser.add_argument('--recorded', metavar='DIR', help='serve the documents in DIR instead of synthetic feeds')
+    parser.add_argument('--latency-ms', type=float, default=0, help='delay before every response')
+    parser.add_argument('--jitter-ms', type=float, default=0, help='extra random delay, up to this much')
+    parser.add_argument('--slow-feed', action='append', default=[], metavar='SLUG=MS',
+                        help='latency for one feed, may be repeated')
+    parser.add_argument('--error-rate', type=float, default=0, help='fraction of requests answered 5xx')
+    parser.add_argument('--etag', choices=ETAG_MODES, default='honor',
+                        help='honor If-None-Match; send ETags but ignore them; new ETag every response; none')
+    parser.add_argument('--update-rate', type=float, default=1.0,
+                        help='fraction of requests for which a synthetic feed has published new entries')
+    parser.add_argument('--churn', type=int, default=10, help='entries published per update')
+    parser.add_argument('--article-pages', action='store_true',
+                        help='link entries to HTML article pages served here instead of example.com')
+    parser.add_argument('--page-latency-ms', type=float, default=0, help='delay before every article page')
+    parser.add_argument('--seed', type=int, default=42)
+
+def server_options(args):
+    slow = {}
+    for item in args.slow_feed:
+        slug, _, ms = item.partition('=')
+        slow[slug] = float(ms or 0) / 1000
+    return {
+        'feeds': args.feeds, 'items': args.items, 'format': args.format, 'with_content': not args.no_content,
+        'recorded': args.recorded, 'latency': args.latency_ms / 1000, 'jitter': args.jitter_ms / 1000,
+        'slow': slow, 'error_rate': args.error_rate, 'etag': args.etag, 'update_rate': args.update_rate,
+        'churn': args.churn, 'article_pages': args.article_pages, 'page_latency': args.page_latency_ms / 1000,
+        'seed': args.seed,
+    }
+
+class Feed:
+    """A synthetic feed: a window of the newest entries that moves forward as entries are published"""
+
+    def __init__(self, name, items, format, with_content, churn):
+        self.name = name
+        self.slug = slugify(name)
+        self.items = items
+        self.format = format
+        self.with_content = with_content
+        self.churn = churn
+        self.content_type = 'application/atom+xml' if format == 'atom' else 'application/rss+xml'
+        self.rows = []
+        self.version = 0
+
+    def publish(self, rows):
+        self.rows = (rows + self.rows)[:self.items]
+        self.version += 1
+        self.document = render_feed(self.name, self.rows, self.format, self.with_content).encode('utf-8')
+        self.modified = formatdate(usegmt=True)
+        self.etag = f'"{self.slug}-{self.version}"'
+
+class RecordedFeed:
+    """A recorded document, served unchanged"""
+    churn = 0
+
+    def __init__(self, path):
+        self.name = self.slug = os.path.splitext(os.path.basename(path))[0]
+        with open(path, 'rb') as handle:
+            self.document = handle.read()
+        self.content_type = 'application/atom+xml' if b'<feed' in self.document[:1000] else 'application/rss+xml'
+        self.etag = f'"{hashlib.sha1(self.document).hexdigest()[:16]}"'
+        self.modified = formatdate(os.path.getmtime(path), usegmt=True)
+
+class FeedLibrary:
+    """Every feed the server knows, synthetic or recorded, with request counters"""
+
+    def __init__(self, options):
+        self.options = options
+        self.rng = random.Random(options['seed'])
+        self.lock = threading.Lock()
+        self.feeds = {}
+        self.pages = {}  # (slug, n) -> corpus row, with --article-pages
+        self.stats = {'requests': 0, 'ok': 0, 'not_modified': 0, 'errors': 0, 'pages': 0, 'bytes': 0}
+
+        if options['recorded']:
+            for filename in sorted(os.listdir(options['recorded'])):
+                if os.path.splitext(filename)[1] in RECORDED_EXTENSIONS:
+                    feed = RecordedFeed(os.path.join(options['recorded'], filename))
+                    self.feeds[feed.slug] = feed
+            return
+
+        self.corpus = Corpus(options['seed'])
+        self.next_index = 4 * 10 ** 9  # clear of the ids benchmark corpora load
+        names = (PUBLISHERS + [f'Feed {i}' for i in range(options['feeds'])])[:options['feeds']]
+        for i, name in enumerate(names):
+            format = options['format'] if options['format'] != 'mixed' else ('rss', 'atom')[i % 2]
+            feed = Feed(name, options['items'], format, options['with_content'], options['churn'])
+            self._publish(feed, options['items'])
+            self.feeds[feed.slug] = feed
+
+    def _publish(self, feed, count):
+        # The corpus generator is not thread-safe; called at startup or under the lock
+        rows = [self.corpus.article(self.next_index + i) for i in range(count)]
+        if self.options.get('article_pages'):
+            for i, row in enumerate(rows, self.next_index):
+                # Relative links resolve against the feed URL, so they reach this server
+                row['url'] = f'/articles/{feed.slug}/{i}.html'
+                self.pages[(feed.slug, str(i))] = row
+        feed.publish(rows)
+        self.next_index += count
+
+    def index(self, base_url):
+        return [{'name': feed.name, 'url': f'{base_url}/feeds/{slug}.xml'} for slug, feed in self.feeds.items()]
+
+    def fetch(self, slug):
+        """(feed, document, etag, modified) after publishing any due entries"""
+        feed = self.feeds[slug]
+        with self.lock:
+            if feed.churn and self.rng.random() < self.options['update_rate']:
+                self._publish(feed, feed.churn)
+            return feed, feed.document, feed.etag, feed.modified
+
+    def page(self, slug, number):
+        """(document, etag) of an article page, or None"""
+        row = self.pages.get((slug, number))
+        if row is None:
+            return None
+        return render_page(row).encode('utf-8'), f'"page-{slug}-{number}"'
+
+    def count(self, key, size=0):
+        with self.lock:
+            self.stats['requests'] += 1
+            self.stats[key] += 1
+            self.stats['bytes'] += size
+
+    def roll(self, probability):
+        with self.lock:
+            return self.rng.random() < probability
+
+    def delay(self, slug):
+        options = self.options
+        latency = options['slow'].get(slug, options['latency'])
+        if options['jitter']:
+            with self.lock:
+                latency += self.rng.uniform(0, options['jitter'])
+        return latency
+
+def make_handler(library):
+    options = library.options
+
+    class FeedHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            path = self.path.split('?', 1)[0]
+            if path == '/':
+                return self._send_json(library.index(f'http://{self.headers.get("Host")}'))
+            if path == '/stats':
+                return self._send_json(dict(library.stats))
+            if path == '/robots.txt':
+                return self._send(200, ROBOTS_TXT, 'text/plain')
+            if path.startswith('/articles/'):
+                return self._send_page(path)
+            slug = path[len('/feeds/'):].rsplit('.', 1)[0] if path.startswith('/feeds/') else None
+            if slug not in library.feeds:
+                return self._send(404, b'unknown feed', 'text/plain')
+
+            delay = library.delay(slug)
+            if delay:
+                time.sleep(delay)
+            if options['error_rate'] and library.roll(options['error_rate']):
+                library.count('errors')
+                status = ERROR_STATUSES[library.stats['errors'] % len(ERROR_STATUSES)]
+                return self._send(status, b'upstream error', 'text/plain', {'Retry-After': '60'})
+
+            feed, document, etag, modified = library.fetch(slug)
+            headers = {}
+            mode = options['etag']
+            if mode == 'rotate':
+                etag = f'"{slug}-{time.time_ns()}"'
+            if mode != 'none':
+                headers = {'ETag': etag, 'Last-Modified': modified}
+            if mode == 'honor' and (
+                self.headers.get('If-None-Match') == etag
+                or (not self.headers.get('If-None-Match') and self.headers.get('If-Modified-Since') == modified)
+            ):
+                library.count('not_modified')
+                return self._send(304, b'', None, headers)
+
+            library.count('ok', len(document))
+            return self._send(200, document, f'{feed.content_type}; charset=utf-8', headers)
+
+        def _send_page(self, path):
+            slug, _, number = path[len('/articles/'):].rpartition('/')
+            page = library.page(slug, number.rsplit('.', 1)[0])
+            if page is None:
+                return self._send(404, b'unknown article', 'text/plain')
+
+            if options['page_latency']:
+                time.sleep(options['page_latency'])
+            if options['error_rate'] and library.roll(options['error_rate']):
+                library.count('errors')
+                return self._send(503, b'upstream error', 'text/plain', {'Retry-After': '60'})
+
+            document, etag = page
+            headers = {'ETag': etag} if options['etag'] != 'none' else {}
+            if options['etag'] == 'honor' and self.headers.get('If-None-Match') == etag:
+                library.count('not_modified')
+                return self._send(304, b'', None, headers)
+            library.count('pages', len(document))
+            return self._send(200, document, 'text/html; charset=utf-8', headers)
+
+        def _send_json(self, payload):
+            self._send(200, json.dumps(payload).encode('utf-8'), 'application/json')
+
+        def _send(self, status, body, content_type, headers=None):
+            self.send_response(status)
+            if content_type:
+                self.send_header('Content-Type', content_type)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            if body and self.command != 'HEAD':
+                self.wfile.write(body)
+
+    return FeedHandler
+
+def make_server(options, host='127.0.0.1', port=0):
+    library = FeedLibrary(options)
+    server = ThreadingHTTPServer((host, port), make_handler(library))
+    server.daemon_threads = True
+    server.library = library
+    return server
+
+def serve_in_process(options, ready):
+    """multiprocessing target: serve on a free port and put the base URL on the ready queue"""
+    server = make_server(options)
+    ready.put(f'http://127.0.0.1:{server.server_address[1]}')
+    server.serve_forever()
+
+def record(directory):
+    import requests
+    from scrapers.rss_scraper import AI_RSS_SOURCES
+
+    os.makedirs(directory, exist_ok=True)
+    for scraper in AI_RSS_SOURCES:
+        try:
+            response = requests.get(scraper.rss_url, timeout=30, headers={'User-Agent': 'ai-news-feed-recorder'})
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            print(f'{scraper.name}: {e}', file=sys.stderr)
+            continue
+        path = os.path.join(directory, f'{slugify(scraper.name)}.xml')
+        with open(path, 'wb') as handle:
+            handle.write(response.content)
+        print(f'{scraper.name}: {len(response.content)} bytes -> {path}', file=sys.stderr)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.record:
+        record(args.record)
+        return 0
+
+    server = make_server(server_options(args), args.host, args.port)
+    base_url = f'http://{args.host}:{server.server_address[1]}'
+    print(f'Serving {len(server.library.feeds)} feeds at {base_url}/', file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""Offline RSS feeds built from the synthetic corpus.
+
+feedparser reads local files as readily as URLs, so RSScraper instances
+pointed at these files exercise the real fetch, filter and parse path
+without network access.
+"""
+import os
+import json
+from collections import defaultdict
+from email.utils import format_datetime
+from datetime import timezone
+from xml.sax.saxutils import escape
+
+from scrapers.rss_scraper import RSScraper
+from benchmarks.corpus import PUBLISHERS
+
+FEED_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<rss version="2.0" xmlns:content="http://purl.org/rss/1.0/modules/content/" '
+    'xmlns:dc="http://purl.org/dc/elements/1.1/" xmlns:media="http://search.yahoo.com/mrss/">\n'
+    '<channel><title>{title}</title><link>https://example.com/</link><description>{title}</description>\n'
+)
+FEED_FOOTER = '</channel></rss>\n'
+ATOM_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<feed xmlns="http://www.w3.org/2005/Atom" xmlns:media="http://search.yahoo.com/mrss/">\n'
+    '<title>{title}</title><id>https://example.com/{slug}</id><updated>{updated}</updated>'
+    '<link href="https://example.com/"/>\n'
+)
+ATOM_FOOTER = '</feed>\n'
+
+def slugify(name):
+    return name.lower().replace(' ', '-')
+
+def render_item(row, with_content=True):
+    categories = ''.join(f'<category>{escape(tag)}</category>' for tag in json.loads(row['keywords']))
+    image = f'<media:content url="{escape(row["image_url"])}" type="image/jpeg"/>' if row.get('image_url') else ''
+    content = (
+        f'<content:encoded><![CDATA[<p>{row.get("content", row["summary"])}</p>]]></content:encoded>'
+        if with_content else ''
+    )
+    return (
+        f'<item><title>{escape(row["title"])}</title><link>{escape(row["url"])}</link>'
+        f'<guid>{escape(row["url"])}</guid>'
+        f'<pubDate>{format_datetime(row["published_at"].replace(tzinfo=timezone.utc), usegmt=True)}</pubDate>'
+        f'<dc:creator>{escape(row["author"])}</dc:creator>{categories}'
+        f'<description>{escape(row["summary"])}</description>{content}{image}</item>\n'
+    )
+
+def render_entry(row, with_content=True):
+    categories = ''.join(f'<category term="{escape(tag)}"/>' for tag in json.loads(row['keywords']))
+    image = f'<media:content url="{escape(row["image_url"])}" type="image/jpeg"/>' if row.get('image_url') else ''
+    content = (
+        f'<content type="html">{escape("<p>" + row.get("content", row["summary"]) + "</p>")}</content>'
+        if with_content else ''
+    )
+    return (
+        f'<entry><title>{escape(row["title"])}</title><link href="{escape(row["url"])}"/>'
+        f'<id>{escape(row["url"])}</id><published>{row["published_at"]:%Y-%m-%dT%H:%M:%SZ}</published>'
+        f'<updated>{row["published_at"]:%Y-%m-%dT%H:%M:%SZ}</updated>'
+        f'<author><name>{escape(row["author"])}</name></author>{categories}'
+        f'<summary>{escape(row["summary"])}</summary>{content}{image}</entry>\n'
+    )
+
+PAGE_TEMPLATE = (
+    '<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>{title}</title>'
+    '<script>window.analytics = {{"page": "article"}};</script><style>body {{ margin: 0 }}</style></head>\n'
+    '<body><header class="site-header"><nav class="menu">{nav}</nav></header>\n'
+    '<div class="layout"><main><article class="post">'
+    '<h1>{title}</h1><p class="byline">By {author}</p>\n{paragraphs}</article>\n'
+    '<section class="share-links">{share}</section>'
+    '<section id="comments"><p>{comment}</p></section></main>\n'
+    '<aside class="sidebar related"><ul>{related}</ul></aside></div>\n'
+    '<footer class="site-footer"><p>Copyright, all rights reserved, example publisher network</p></footer>'
+    '</body></html>\n'
+)
+
+def render_page(row, paragraph_words=60):
+    """An HTML article page for a corpus row: the body in paragraphs amid navigation, comments and sidebars"""
+    words = row.get('content', row['summary']).split()
+    paragraphs = ''.join(
+        f'<p>{escape(" ".join(words[start:start + paragraph_words]))}.</p>\n'
+        for start in range(0, len(words), paragraph_words)
+    )
+    links = ''.join(f'<a href="/section/{i}">Section {i}</a>' for i in range(12))
+    return PAGE_TEMPLATE.format(
+        title=escape(row['title']),
+        author=escape(row['author']),
+        paragraphs=paragraphs,
+        nav=links,
+        share='<a href="/share/x">Share</a><a href="/share/y">Post</a>',
+        comment='Great article, thanks for sharing, I learned a lot from it and will come back for more',
+        related=''.join(f'<li><a href="/related/{i}">Related story number {i} you may like</a></li>' for i in range(8))
+    )
+
+def render_feed(name, rows, format='rss', with_content=True):
+    """An RSS 2.0 or Atom document with rows as items, newest first"""
+    rows = sorted(rows, key=lambda row: row['published_at'], reverse=True)
+    if format == 'atom':
+        updated = f"{rows[0]['published_at']:%Y-%m-%dT%H:%M:%SZ}" if rows else '1970-01-01T00:00:00Z'
+        parts = [ATOM_HEADER.format(title=escape(name), slug=slugify(name), updated=updated)]
+        parts.extend(render_entry(row, with_content) for row in rows)
+        parts.append(ATOM_FOOTER)
+    else:
+        parts = [FEED_HEADER.format(title=escape(name))]
+        parts.extend(render_item(row, with_content) for row in rows)
+        parts.append(FEED_FOOTER)
+    return ''.join(parts)
+
+def write_feeds(directory, corpus, per_feed=50, sources=PUBLISHERS, start=0):
+    """Write one RSS file per source with per_feed items; returns RSScrapers reading them"""
+    os.makedirs(directory, exist_ok=True)
+    items = defaultdict(list)
+    index = start
+    while any(len(items[name]) < per_feed for name in sources):
+        row = corpus.article(index)
+        index += 1
+        name = sources[index % len(sources)]
+        if len(items[name]) < per_feed:
+            items[name].append(row)
+
+    scrapers = []
+    for name in sources:
+        path = os.path.join(directory, f'{slugify(name)}.xml')
+        with open(path, 'w', encoding='utf-8') as handle:
+            handle.write(render_feed(name, items[name]))
+        scrapers.append(RSScraper(name, path, rate_limit=0))
+    return scrapers
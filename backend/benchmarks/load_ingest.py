@@ -0,0 +1,249 @@
+"""Load test of the ingest pipeline (fetch -> parse -> enrich -> store) against the replay server.
+
+Starts benchmarks.feed_server in a separate process (or uses --url), points
+RSScrapers at its feeds and runs IngestService.ingest_source for every feed,
+--workers at a time, for --rounds rounds. Reports articles per second, the
+time spent in each stage from the service metrics, and peak memory. With
+--fulltext the server also serves article pages and the full-text stage
+fetches them in the background; ingest is timed without waiting for it, then
+the time to drain the page queue is reported separately.
+
+Usage (from backend/):
+    python -m benchmarks.load_ingest [--feeds 20] [--items 50] [--rounds 5] [--workers 4]
+                                     [--latency-ms 200] [--error-rate 0.05] [--etag honor]
+                                     [--update-rate 0.5] [--llm-latency-ms 300] [--tracemalloc]
+    python -m benchmarks.load_ingest --no-content --fulltext [--page-latency-ms 150] [--per-domain 4]
+"""
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import resource
+import tempfile
+import tracemalloc
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from benchmarks.feed_server import add_server_arguments, server_options, serve_in_process
+
+STAGES = (
+    ('fetch', 'scrape_fetch_seconds', 'download and feed parsing'),
+    ('parse', 'scrape_parse_seconds', 'entries to articles'),
+    ('enrich', 'nlp_enrichment_seconds', 'summary, keywords, sentiment'),
+    ('store', 'ingest_store_seconds', 'dedup and insert on the writer thread'),
+)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_server_arguments(parser)
+    parser.add_argument('--url', help='use a feed server that is already running at this base URL')
+    parser.add_argument('--rounds', type=int, default=3, help='times every feed is scraped')
+    parser.add_argument('--workers', type=int, default=1, help='feeds ingested concurrently')
+    parser.add_argument('--max-articles', type=int, default=50, help='entries taken from each feed per scrape')
+    parser.add_argument('--llm-latency-ms', type=float, default=0, help='simulated latency of the stubbed LLM')
+    parser.add_argument('--fulltext', action='store_true', help='fetch the linked article pages after ingest')
+    parser.add_argument('--fulltext-workers', type=int, default=8, help='full-text fetch threads')
+    parser.add_argument('--per-domain', type=int, default=2,
+                        help='concurrent page requests per domain (every page is on the one replay server)')
+    parser.add_argument('--tracemalloc', action='store_true',
+                        help='also trace the Python heap peak (slows the run down)')
+    parser.add_argument('--json', action='store_true', help='print machine-readable results')
+    return parser.parse_args(argv)
+
+def start_server(args):
+    """Run the feed server in its own process so it does not compete for the GIL"""
+    ready = multiprocessing.Queue()
+    process = multiprocessing.Process(target=serve_in_process, args=(server_options(args), ready), daemon=True)
+    process.start()
+    return process, ready.get(timeout=120)
+
+def metric_totals(registry):
+    """Histogram sums and counts, and counter values, added up over labels"""
+    totals = {}
+    for (name, labels), value in registry.snapshot().items():
+        if name == 'nlp_enrichment_seconds' and labels != ('total',):
+            continue
+        seconds, count = (value[-2], value[-1]) if isinstance(value, list) else (value, value)
+        current = totals.get(name, (0, 0))
+        totals[name] = (current[0] + seconds, current[1] + count)
+    return totals
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def run(app, scrapers, args):
+    ingest = app.extensions['ingest']
+    results = {'fetched': 0, 'new': 0, 'duplicates': 0, 'failed_sources': 0}
+    latencies = []
+
+    def ingest_one(scraper):
+        with app.app_context():
+            started = time.perf_counter()
+            try:
+                result = ingest.ingest_source(scraper, max_articles=args.max_articles)
+            except Exception as e:
+                logging.getLogger(__name__).error(f'Ingest of {scraper.name} failed: {e}')
+                result = None
+            finally:
+                ingest.db.session.remove()
+            return result, time.perf_counter() - started
+
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        for _ in range(args.rounds):
+            for result, elapsed in executor.map(ingest_one, scrapers):
+                latencies.append(elapsed)
+                if result is None:
+                    results['failed_sources'] += 1
+                    continue
+                for key in ('fetched', 'new', 'duplicates'):
+                    results[key] += result[key]
+    return results, latencies
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.fulltext:
+        args.article_pages = True
+
+    workdir = tempfile.mkdtemp(prefix='ai-news-load-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'load.db')}"
+    os.environ['SCHEDULER_ENABLED'] = 'false'
+    os.environ['DIGEST_ENABLED'] = 'false'
+    os.environ['RETENTION_ENABLED'] = 'false'
+    os.environ['THUMBNAIL_ENABLED'] = 'false'  # no image downloads from fixture URLs
+    os.environ['SNAPSHOT_ENABLED'] = 'false'  # time the query path, not the pre-rendered feed
+    os.environ['SLOW_REQUEST_SECONDS'] = '60'
+    os.environ['FULLTEXT_ENABLED'] = 'true' if args.fulltext else 'false'
+    os.environ['FULLTEXT_WORKERS'] = str(args.fulltext_workers)
+    os.environ['FULLTEXT_PER_DOMAIN'] = str(args.per_domain)
+
+    process = None
+    if args.url:
+        base_url = args.url.rstrip('/')
+    else:
+        process, base_url = start_server(args)
+
+    from app import create_app
+    from scrapers.rss_scraper import RSScraper
+    from services.metrics_service import registry
+    from benchmarks.suite import StubLLM, textblob_corpora_available
+
+    app = create_app()
+    logging.getLogger().setLevel(logging.WARNING)
+    if not textblob_corpora_available():
+        logging.getLogger('services.ai_service').setLevel(logging.CRITICAL)
+    # Failed fetches are expected with --error-rate; they are counted below
+    logging.getLogger('scrapers.rss_scraper').setLevel(logging.CRITICAL)
+    app.extensions['ingest'].ai_service.client = StubLLM(args.llm_latency_ms / 1000)
+
+    feeds = requests.get(f'{base_url}/', timeout=30).json()
+    scrapers = [RSScraper(feed['name'], feed['url'], rate_limit=0) for feed in feeds]
+
+    before = metric_totals(registry)
+    rss_before = peak_rss_mb()
+    if args.tracemalloc:
+        tracemalloc.start()
+    started = time.perf_counter()
+    totals, latencies = run(app, scrapers, args)
+    wall = time.perf_counter() - started
+    fulltext = app.extensions['fulltext']
+    backlog = fulltext.pending()
+    fulltext.wait()
+    drain = time.perf_counter() - started - wall
+    heap_peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024) if args.tracemalloc else None
+    after = metric_totals(registry)
+
+    def delta(name):
+        seconds, count = after.get(name, (0, 0))
+        previous = before.get(name, (0, 0))
+        return seconds - previous[0], count - previous[1]
+
+    stages = {}
+    for stage, metric, description in STAGES:
+        seconds, count = delta(metric)
+        stages[stage] = {
+            'seconds': round(seconds, 3),
+            'calls': count,
+            'ms_per_article': round(seconds * 1000 / totals['fetched'], 3) if totals['fetched'] else None,
+            'description': description,
+        }
+    latencies.sort()
+    server_stats = requests.get(f'{base_url}/stats', timeout=30).json()
+
+    output = {
+        'config': {
+            'feeds': len(scrapers), 'rounds': args.rounds, 'workers': args.workers,
+            'max_articles': args.max_articles, 'llm_latency_ms': args.llm_latency_ms,
+            'server': server_options(args) if process else base_url,
+        },
+        'articles': totals,
+        'scrapes': len(latencies),
+        'fetch_errors': int(delta('scrape_errors_total')[0]),
+        'not_modified': int(delta('scrape_not_modified_total')[0]),
+        'wall_s': round(wall, 3),
+        'articles_per_s': round(totals['fetched'] / wall, 1) if wall else None,
+        'new_articles_per_s': round(totals['new'] / wall, 1) if wall else None,
+        'source_ms': {
+            'p50': round(latencies[len(latencies) // 2] * 1000, 1),
+            'p95': round(latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)] * 1000, 1),
+            'max': round(latencies[-1] * 1000, 1),
+        } if latencies else {},
+        'stages': stages,
+        'fulltext': {
+            'pages': sum(fulltext.outcomes.values()),
+            'outcomes': dict(fulltext.outcomes),
+            'queued_after_ingest': backlog,
+            'drain_s': round(drain, 3),
+            'pages_per_s': round(sum(fulltext.outcomes.values()) / (wall + drain), 1) if wall + drain else None,
+            'fetch_s': round(delta('fulltext_fetch_seconds')[0], 3),
+        } if args.fulltext else None,
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+        'peak_rss_growth_mb': round(peak_rss_mb() - rss_before, 1),
+        'peak_heap_mb': round(heap_peak, 1) if heap_peak is not None else None,
+        'server': server_stats,
+    }
+    if process is not None:
+        process.terminate()
+
+    if args.json:
+        print(json.dumps(output, indent=2))
+        return 0
+
+    articles = output['articles']
+    print(f"{output['config']['feeds']} feeds x {args.rounds} rounds, {args.workers} workers: "
+          f"{output['scrapes']} scrapes in {output['wall_s']:.2f}s")
+    print(f"  articles: {articles['fetched']} fetched, {articles['new']} new, {articles['duplicates']} duplicates; "
+          f"{output['fetch_errors']} fetch errors, {output['not_modified']} not modified, "
+          f"{articles['failed_sources']} failed ingests")
+    print(f"  throughput: {output['articles_per_s']} articles/s ({output['new_articles_per_s']} new/s)")
+    if output['source_ms']:
+        source_ms = output['source_ms']
+        print(f"  per source: p50 {source_ms['p50']} ms, p95 {source_ms['p95']} ms, max {source_ms['max']} ms")
+    busy = sum(stage['seconds'] for stage in stages.values()) or 1
+    print('  stages (summed over workers):')
+    for stage, values in stages.items():
+        per_article = f"{values['ms_per_article']:.2f} ms/article" if values['ms_per_article'] is not None else '-'
+        print(f"    {stage:<7} {values['seconds']:>8.3f}s  {values['seconds'] / busy:>4.0%}  {per_article:<18} "
+              f"{values['description']}")
+    if output['fulltext']:
+        pages = output['fulltext']
+        outcomes = ', '.join(f'{count} {outcome}' for outcome, count in sorted(pages['outcomes'].items()))
+        print(f"  full text: {pages['pages']} pages ({outcomes or 'none'}), {pages['pages_per_s']} pages/s "
+              f"with {args.per_domain} per domain; {pages['queued_after_ingest']} still queued when ingest "
+              f"finished, drained {pages['drain_s']:.2f}s later")
+    memory = f"  memory: peak RSS {output['peak_rss_mb']} MB (+{output['peak_rss_growth_mb']} MB during the run)"
+    if heap_peak is not None:
+        memory += f", Python heap peak {output['peak_heap_mb']} MB"
+    print(memory)
+    print(f"  server: {server_stats['requests']} requests, {server_stats['ok']} ok, {server_stats['pages']} pages, "
+          f"{server_stats['not_modified']} not modified, {server_stats['errors']} errors, "
+          f"{server_stats['bytes'] / 1024 / 1024:.1f} MB served")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
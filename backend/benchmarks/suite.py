@@ -0,0 +1,368 @@
+"""Benchmark suite over a seeded synthetic corpus, compared against a stored baseline.
+
+Micro benchmarks time ranking, AI enrichment (with a stubbed LLM), body
+compression and feed parsing. Macro benchmarks time a full scrape through
+POST /api/scrape over offline feeds, and every /api/* endpoint through the
+Flask test client.
+
+Usage (from backend/):
+    python -m benchmarks.suite [--articles 10000] [--users 1000] [--filter api.]
+                               [--output results.json] [--save-baseline]
+
+Results are compared with benchmarks/baseline.json (or --baseline). The run exits
+with status 1 when a median is more than --threshold slower than the baseline, and
+refuses to compare (status 2) when the baseline was recorded with other corpus
+parameters.
+"""
+import os
+import re
+import sys
+import json
+import time
+import random
+import logging
+import platform
+import argparse
+import tempfile
+import subprocess
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+# Run parameters that change what is measured; a baseline only compares with runs that share them
+COMPARABLE_META = ('articles', 'users', 'seed', 'bodies', 'iterations', 'llm_latency_ms', 'textblob_corpora')
+SKIPPED_ROUTES = {'/api/articles/stream'}  # long-lived SSE connection, see bench_concurrency
+ROUTE_PARAM_RE = re.compile(r'<(?:\w+:)?(\w+)>')
+QUERY_PARAMS = {
+    '/api/articles': {'per_page': 50},
+    '/api/search': {'q': 'model', 'per_page': 50},
+    '/api/archive': {'q': 'model', 'per_page': 50},
+    '/api/facets': {'source': 'AI News'},
+}
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--articles', type=int, default=10000, help='synthetic articles to load (10k to 1M)')
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--iterations', type=int, default=20, help='samples per benchmark')
+    parser.add_argument('--no-bodies', action='store_true', help='skip article bodies (faster to load large corpora)')
+    parser.add_argument('--llm-latency-ms', type=float, default=0, help='simulated latency of the stubbed LLM')
+    parser.add_argument('--filter', default='', help='only run benchmarks whose name contains this')
+    parser.add_argument('--output', help='write JSON results to this file')
+    parser.add_argument('--json', action='store_true', help='print JSON results instead of a table')
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true', help='store these results as the new baseline')
+    parser.add_argument('--threshold', type=float, default=0.25, help='allowed slowdown of the median (0.25 = 25%%)')
+    parser.add_argument('--min-delta-ms', type=float, default=0.5, help='ignore slowdowns smaller than this')
+    return parser.parse_args(argv)
+
+class StubLLM:
+    """Stands in for the OpenAI client: echoes part of the prompt and reports token usage"""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.chat = SimpleNamespace(completions=self)
+
+    def create(self, model, messages, **kwargs):
+        if self.latency:
+            time.sleep(self.latency)
+        words = messages[-1]['content'].split()
+        message = SimpleNamespace(content=' '.join(words[-60:]))
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=message)],
+            usage=SimpleNamespace(prompt_tokens=len(words), completion_tokens=60)
+        )
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * pct / 100), len(ordered) - 1)]
+
+def measure(fn, iterations, setup=None, warmup=1):
+    """Median, p95 and min of fn's wall time in ms"""
+    samples = []
+    for i in range(warmup + iterations):
+        argument = setup(i) if setup else None
+        start = time.perf_counter()
+        fn(argument) if setup else fn()
+        if i >= warmup:
+            samples.append((time.perf_counter() - start) * 1000)
+    return {
+        'unit': 'ms',
+        'median': round(percentile(samples, 50), 4),
+        'p95': round(percentile(samples, 95), 4),
+        'min': round(min(samples), 4),
+        'iterations': len(samples),
+    }
+
+def textblob_corpora_available():
+    try:
+        from textblob import TextBlob
+        TextBlob('language models').noun_phrases
+        return True
+    except Exception:
+        return False
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+# Micro benchmarks
+
+def micro_benchmarks(app, corpus, args):
+    from services.ai_service import AIService
+    from benchmarks.fixtures import write_feeds
+
+    ranking = app.extensions['ingest'].ranking_service
+    bodies = app.extensions['bodies']
+    related = app.extensions['related']
+    rows = [corpus.article(10 ** 9 + i) for i in range(1000)]
+
+    yield 'micro.ranking.hotness_score x1000', lambda: [ranking.calculate_hotness_score(row) for row in rows]
+    yield 'micro.ranking.rank_articles x1000', lambda: ranking.rank_articles([dict(row) for row in rows])
+
+    ai = AIService()
+    ai.client = StubLLM(args.llm_latency_ms / 1000)
+    enrich_rows = rows[:100]
+    yield 'micro.ai.batch_process_articles x100', lambda: ai.batch_process_articles([
+        {'title': row['title'], 'content': row['content']} for row in enrich_rows
+    ])
+
+    contents = [row['content'] for row in rows[:100]]
+    encoded = [bodies.encode(content) for content in contents]
+    yield 'micro.bodies.encode x100', lambda: [bodies.encode(content) for content in contents]
+    yield 'micro.bodies.decode x100', lambda: [bodies.decode(*item) for item in encoded]
+
+    yield 'micro.related.vectorize x1000', lambda: [
+        related.vectorize(row['title'], row['summary'], row['keywords'], row['tags']) for row in rows
+    ]
+
+    scraper = write_feeds(tempfile.mkdtemp(prefix='ai-news-feeds-'), corpus, per_feed=50, sources=['AI News'],
+                          start=2 * 10 ** 9)[0]
+    yield 'micro.scraper.scrape_articles 50 items', lambda: scraper.scrape_articles(max_articles=50)
+
+# Macro benchmarks
+
+def scrape_benchmarks(app, corpus, args):
+    from benchmarks.fixtures import write_feeds
+
+    client = app.test_client()
+    scrape_jobs = app.extensions['scrape_jobs']
+    app.extensions['ingest'].ai_service.client = StubLLM(args.llm_latency_ms / 1000)
+    feed_dir = tempfile.mkdtemp(prefix='ai-news-feeds-')
+    sources = list(scrape_jobs.scrapers)[:5]
+
+    def new_feeds(i):
+        # Fresh URLs for every run, so each scrape stores 5 x 50 new articles
+        scrapers = write_feeds(os.path.join(feed_dir, str(i)), corpus, per_feed=50,
+                               sources=sources, start=3 * 10 ** 9 + i * 1000)
+        scrape_jobs.scrapers = {scraper.name: scraper for scraper in scrapers}
+
+    def trigger(_=None):
+        response = client.post('/api/scrape', json={'sources': sources})
+        status_url = response.get_json()['status_url']
+        while True:
+            job = client.get(status_url).get_json()
+            if job['status'] not in ('queued', 'running'):
+                return job
+            time.sleep(0.002)
+
+    iterations = max(args.iterations // 4, 3)
+    yield 'macro.trigger_scrape 5 feeds new', lambda: measure(trigger, iterations, setup=new_feeds)
+    yield 'macro.trigger_scrape 5 feeds duplicates', lambda: measure(trigger, iterations)
+
+def api_benchmarks(app, args):
+    client = app.test_client()
+    ingest = app.extensions['ingest']
+    article_ids = [row[0] for row in ingest.db.session.query(ingest.Article.id).order_by(
+        ingest.Article.id.desc()
+    ).limit(200).all()]
+    archived = app.extensions['retention'].search().first()
+    jobs = app.extensions['scrape_jobs'].list_jobs(limit=1)
+
+    rng = random.Random(args.seed)
+    query_params = dict(QUERY_PARAMS)
+    # An incremental export, as a sync client would request it
+    query_params['/api/articles/export'] = {'since': (datetime.utcnow() - timedelta(days=7)).isoformat()}
+    counter = iter(range(10 ** 9))
+    values = {
+        'article_id': lambda: rng.choice(article_ids),
+        'user_id': lambda: rng.randint(1, max(args.users, 1)),
+        'job_id': lambda: jobs[0].id if jobs else 'missing',
+    }
+    bodies = {
+        ('POST', '/api/users'): lambda: {'username': f'bench{next(counter)}', 'email': f'bench{next(counter)}@example.com'},
+        ('PUT', '/api/users/<int:user_id>/preferences'): lambda: {
+            'preferred_keywords': ['gpt', 'openai'], 'preferred_sources': ['AI News']
+        },
+    }
+
+    for rule in sorted(app.url_map.iter_rules(), key=lambda rule: rule.rule):
+        if not rule.rule.startswith('/api/') or rule.rule in SKIPPED_ROUTES:
+            continue
+        if rule.rule.startswith('/api/archive/') and archived is None:
+            continue
+        for method in sorted(rule.methods & {'GET', 'POST', 'PUT', 'DELETE'}):
+            if method != 'GET' and (method, rule.rule) not in bodies:
+                continue  # e.g. POST /api/scrape, timed by the scrape benchmarks
+            names = ROUTE_PARAM_RE.findall(rule.rule)
+            if any(name not in values for name in names):
+                continue
+
+            def call(rule=rule, method=method):
+                path = ROUTE_PARAM_RE.sub(lambda m: str(
+                    archived.id if rule.rule.startswith('/api/archive/') else values[m.group(1)]()
+                ), rule.rule)
+                body = bodies.get((method, rule.rule))
+                response = client.open(
+                    path, method=method, query_string=query_params.get(rule.rule),
+                    json=body() if body else None, headers={'Accept-Encoding': 'gzip'}
+                )
+                response.get_data()  # drain streamed responses such as the export
+                return response.status_code
+
+            yield f'api.{method} {rule.rule}', call
+
+# Comparison
+
+def compare(results, baseline, threshold, min_delta_ms):
+    """Rows of (name, baseline median, current median, ratio, verdict)"""
+    rows = []
+    for name, current in results.items():
+        base = baseline.get('results', {}).get(name) if baseline else None
+        if 'median' not in current:
+            rows.append((name, None, None, None, current.get('error', 'error')))
+            continue
+        if not base or 'median' not in base:
+            rows.append((name, None, current['median'], None, 'new'))
+            continue
+        ratio = current['median'] / base['median'] if base['median'] else None
+        slower = current['median'] - base['median']
+        if ratio is not None and ratio > 1 + threshold and slower > min_delta_ms:
+            verdict = 'REGRESSION'
+        elif ratio is not None and ratio < 1 / (1 + threshold) and -slower > min_delta_ms:
+            verdict = 'faster'
+        else:
+            verdict = 'ok'
+        rows.append((name, base['median'], current['median'], ratio, verdict))
+    return rows
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix='ai-news-bench-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ['SCHEDULER_ENABLED'] = 'false'
+    os.environ['DIGEST_ENABLED'] = 'false'
+    os.environ['RETENTION_ENABLED'] = 'false'
+    os.environ['THUMBNAIL_ENABLED'] = 'false'  # no image downloads from fixture URLs
+    os.environ['SNAPSHOT_ENABLED'] = 'false'  # time the query path, not the pre-rendered feed
+    os.environ['RESPONSE_CACHE_TTL'] = '0'  # time the work, not the cache
+    os.environ['SLOW_REQUEST_SECONDS'] = '60'
+    os.environ['DIGEST_OUTBOX_DIR'] = os.path.join(workdir, 'outbox')
+
+    from app import create_app
+    from benchmarks.corpus import load_corpus
+    import sqlalchemy
+
+    app = create_app()
+    logging.getLogger().setLevel(logging.WARNING)
+    corpora = textblob_corpora_available()
+    if not corpora:
+        # Keyword extraction fails (and logs) for every article without the NLTK data
+        logging.getLogger('services.ai_service').setLevel(logging.CRITICAL)
+
+    start = time.perf_counter()
+    corpus = load_corpus(app, args.articles, users=args.users, seed=args.seed, with_bodies=not args.no_bodies)
+    load_s = time.perf_counter() - start
+    # Archive the oldest quarter so the archive endpoints have something to read
+    retention = app.extensions['retention']
+    retention.max_age = timedelta(days=90)
+    app.extensions['db_writer'].run(retention.run)
+
+    meta = {
+        'created_at': datetime.utcnow().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'sqlalchemy': sqlalchemy.__version__,
+        'textblob_corpora': corpora,
+        'articles': args.articles,
+        'users': args.users,
+        'seed': args.seed,
+        'bodies': not args.no_bodies,
+        'iterations': args.iterations,
+        'llm_latency_ms': args.llm_latency_ms,
+        'corpus_load_s': round(load_s, 2),
+    }
+
+    baseline = None
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as handle:
+            baseline = json.load(handle)
+        different = [
+            f'{key}={baseline["meta"].get(key)} (this run {meta[key]})'
+            for key in COMPARABLE_META if baseline['meta'].get(key) != meta[key]
+        ]
+        if different:
+            print(f'error: {args.baseline} was recorded with ' + ', '.join(different) + '; rerun with '
+                  'those parameters, pass another --baseline, or record one with --save-baseline', file=sys.stderr)
+            sys.exit(2)
+
+    results = {}
+    with app.app_context():
+        benchmarks = [
+            *micro_benchmarks(app, corpus, args),
+            *scrape_benchmarks(app, corpus, args),
+        ]
+        for name, fn in benchmarks:
+            if args.filter in name:
+                print(f'{name} ...', file=sys.stderr)
+                results[name] = fn() if name.startswith('macro.') else measure(fn, args.iterations)
+
+        for name, fn in api_benchmarks(app, args):
+            if args.filter not in name:
+                continue
+            print(f'{name} ...', file=sys.stderr)
+            status = fn()
+            if status >= 400:
+                results[name] = {'error': f'HTTP {status}'}
+                continue
+            results[name] = measure(fn, args.iterations)
+            results[name]['status'] = status
+
+    output = {'meta': meta, 'results': results}
+    if args.output:
+        with open(args.output, 'w') as handle:
+            json.dump(output, handle, indent=2)
+
+    rows = compare(results, baseline, args.threshold, args.min_delta_ms)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as handle:
+            json.dump(output, handle, indent=2)
+            handle.write('\n')
+        print(f'Saved baseline to {args.baseline}', file=sys.stderr)
+
+    if args.json:
+        output['comparison'] = [
+            {'name': name, 'baseline_ms': base, 'median_ms': current, 'ratio': ratio and round(ratio, 3), 'verdict': verdict}
+            for name, base, current, ratio, verdict in rows
+        ]
+        json.dump(output, sys.stdout, indent=2)
+        print()
+    else:
+        print(f"{'benchmark':<58} {'baseline':>10} {'median':>10} {'ratio':>7}  verdict")
+        for name, base, current, ratio, verdict in rows:
+            print(f"{name:<58} {base if base is not None else '-':>10} {current if current is not None else '-':>10} "
+                  f"{f'{ratio:.2f}' if ratio else '-':>7}  {verdict}")
+
+    if any(verdict == 'REGRESSION' for *_, verdict in rows):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
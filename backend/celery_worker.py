@@ -0,0 +1,9 @@
+"""Celery entry point for scrape jobs.
+
+Run with SCRAPE_JOB_BACKEND=celery:
+    celery -A celery_worker.celery worker
+"""
+from app import create_app
+
+app = create_app()
+celery = app.extensions['scrape_jobs'].celery
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from datetime import timedelta
 
 class Config:
@@ -6,6 +7,17 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///../../database/ai_news.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Engines: reads use a read-only pool (or READ_DATABASE_URL), writes a single writer connection
+    SQLALCHEMY_READ_DATABASE_URI = os.environ.get('READ_DATABASE_URL')
+    DB_READ_POOL_SIZE = int(os.environ.get('DB_READ_POOL_SIZE') or 8)
+    SQLITE_WAL_ENABLED = (os.environ.get('SQLITE_WAL_ENABLED') or 'true').lower() == 'true'
+    SQLITE_BUSY_TIMEOUT_MS = 5000
+    SQLITE_MMAP_SIZE = 256 * 1024 * 1024
+    SQLITE_CACHE_SIZE = -20000  # KiB
+    COUNTER_FLUSH_SECONDS = 5
+    # 'auto' runs create_all only when the models changed since the last run; 'never' leaves it to migrations
+    SCHEMA_CREATE = (os.environ.get('SCHEMA_CREATE') or 'auto').lower()
+    
     # OpenAI Configuration
     OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY')
     
@@ -17,9 +29,25 @@ class Config:
     CELERY_BROKER_URL = REDIS_URL
     CELERY_RESULT_BACKEND = REDIS_URL
     
+    # Scrape jobs: 'thread' runs them in-process, 'celery' hands them to the broker above
+    SCRAPE_JOB_BACKEND = os.environ.get('SCRAPE_JOB_BACKEND') or 'thread'
+    SCRAPE_JOB_WORKERS = int(os.environ.get('SCRAPE_JOB_WORKERS') or 1)
+    SCRAPE_JOB_TIMEOUT_MINUTES = 30
+    
     # Scraping Configuration
-    SCRAPE_INTERVAL_HOURS = 6
-    MAX_ARTICLES_PER_SOURCE = 50
+    SCRAPE_INTERVAL_HOURS = float(os.environ.get('SCRAPE_INTERVAL_HOURS') or 6)
+    MAX_ARTICLES_PER_SOURCE = int(os.environ.get('MAX_ARTICLES_PER_SOURCE') or 50)
+    
+    # Adaptive per-source polling (SCRAPE_INTERVAL_HOURS is the starting interval)
+    SCHEDULER_ENABLED = (os.environ.get('SCHEDULER_ENABLED') or 'true').lower() == 'true'
+    SCHEDULER_LOCK_FILE = os.environ.get('SCHEDULER_LOCK_FILE') or os.path.join(
+        tempfile.gettempdir(), 'ai_news_scheduler.lock'
+    )
+    SCHEDULER_MIN_INTERVAL_MINUTES = 15
+    SCHEDULER_MAX_INTERVAL_HOURS = 24
+    SCHEDULER_TARGET_ARTICLES_PER_POLL = 5
+    SCHEDULER_QUIET_BACKOFF = 1.5
+    SCHEDULER_JITTER = 0.1
     
     # Ranking Configuration
     HOTNESS_DECAY_FACTOR = 0.1
@@ -31,14 +59,123 @@ class Config:
         'recency': 0.1
     }
     
+    # Server-Sent Events stream of new articles
+    SSE_CLIENT_BUFFER = 100
+    SSE_HISTORY_SIZE = 1000
+    SSE_BACKFILL_LIMIT = 200
+    SSE_POLL_SECONDS = 5
+    SSE_HEARTBEAT_SECONDS = 15
+    SSE_MAX_STREAM_SECONDS = 300
+    SSE_RETRY_MS = 3000
+    
     # Pagination
     ARTICLES_PER_PAGE = 20
     
+    # API responses: gzip/brotli above COMPRESSION_MIN_SIZE bytes, list endpoints cached for RESPONSE_CACHE_TTL seconds
+    COMPRESSION_ENABLED = (os.environ.get('COMPRESSION_ENABLED') or 'true').lower() == 'true'
+    COMPRESSION_MIN_SIZE = 1024
+    COMPRESSION_LEVEL = 6
+    RESPONSE_CACHE_TTL = int(os.environ.get('RESPONSE_CACHE_TTL') or 30)
+    RESPONSE_CACHE_MAX_ENTRIES = 512
+    FACET_REBUILD_SECONDS = 60
+
+    # Personalized feed: candidates are articles published in the last FEED_CANDIDATE_WINDOW_DAYS
+    FEED_CANDIDATE_WINDOW_DAYS = 7
+    FEED_MAX_CANDIDATES = 20000
+    FEED_BASELINE_SIZE = 200  # globally hottest articles mixed into every feed
+    FEED_INDEX_REBUILD_SECONDS = 300
+    FEED_MATCHER_CACHE_SIZE = 10000
+    FEED_KEYWORD_BOOST = 0.2  # per matching preferred keyword
+    FEED_SOURCE_BOOST = 0.15
+    FEED_CATEGORY_BOOST = 0.1
+
+    # Article bodies live compressed in article_body (zstd when installed, else zlib)
+    BODY_CODEC = os.environ.get('BODY_CODEC') or 'auto'  # auto, zstd, zlib
+    BODY_COMPRESSION_LEVEL = 6
+    BODY_DICTIONARY_ENABLED = (os.environ.get('BODY_DICTIONARY_ENABLED') or 'true').lower() == 'true'
+
+    # Related articles: hashed TF-IDF over title, summary and keywords of the newest RELATED_MAX_ARTICLES
+    RELATED_MAX_ARTICLES = 20000
+    RELATED_MAX_FEATURES = 32  # strongest terms kept per article
+    RELATED_REBUILD_SECONDS = 3600
+
+    # Notification digests: matched on ingest, written to DIGEST_OUTBOX_DIR as .eml files (times are UTC)
+    DIGEST_ENABLED = (os.environ.get('DIGEST_ENABLED') or 'true').lower() == 'true'
+    DIGEST_OUTBOX_DIR = os.environ.get('DIGEST_OUTBOX_DIR') or os.path.join(
+        tempfile.gettempdir(), 'ai_news_outbox'
+    )
+    DIGEST_FROM = os.environ.get('DIGEST_FROM') or 'digest@ainewshub.local'
+    DIGEST_DEFAULT_TIME = '08:00'  # when notification_time is not set
+    DIGEST_WEEKLY_DAY = 0  # Monday
+    DIGEST_MAX_ARTICLES = 10
+    DIGEST_BATCH_USERS = 500
+    DIGEST_INDEX_REBUILD_SECONDS = 300
+
+    # Retention: articles past these limits move to archived_article (0 disables a limit)
+    RETENTION_ENABLED = (os.environ.get('RETENTION_ENABLED') or 'true').lower() == 'true'
+    RETENTION_DAYS = int(os.environ.get('RETENTION_DAYS', 90))
+    RETENTION_GRACE_DAYS = 7  # cold articles are kept at least this long
+    RETENTION_HOTNESS_FLOOR = 0.05
+    RETENTION_MAX_ARTICLES = 100000
+    RETENTION_INTERVAL_HOURS = 24
+    RETENTION_BATCH_SIZE = 500
+
+    # Full text: after ingest, fetch each article page and keep the extracted text as its body
+    FULLTEXT_ENABLED = (os.environ.get('FULLTEXT_ENABLED') or 'false').lower() == 'true'
+    FULLTEXT_WORKERS = int(os.environ.get('FULLTEXT_WORKERS') or 8)
+    FULLTEXT_PER_DOMAIN = int(os.environ.get('FULLTEXT_PER_DOMAIN') or 2)  # concurrent requests per site
+    FULLTEXT_TIMEOUT = 10
+    FULLTEXT_MAX_BYTES = 2 * 1024 * 1024
+    FULLTEXT_MIN_CHARS = 500  # shorter extractions keep the feed text
+    FULLTEXT_SUMMARIZE = True  # re-summarize from the full text
+    FULLTEXT_ROBOTS_TTL_HOURS = 24
+    FULLTEXT_CACHE_SIZE = 10000  # pages whose ETag / Last-Modified are remembered
+    FULLTEXT_USER_AGENT = os.environ.get('FULLTEXT_USER_AGENT') or 'AINewsHubBot/1.0'
+
+    # Thumbnails: article images fetched once, resized to fixed widths and kept in a size-capped disk cache
+    THUMBNAIL_ENABLED = (os.environ.get('THUMBNAIL_ENABLED') or 'true').lower() == 'true'
+    THUMBNAIL_DIR = os.environ.get('THUMBNAIL_DIR') or os.path.join(tempfile.gettempdir(), 'ai_news_thumbnails')
+    THUMBNAIL_WIDTHS = (160, 320, 640)
+    THUMBNAIL_QUALITY = 80
+    THUMBNAIL_CACHE_MAX_MB = int(os.environ.get('THUMBNAIL_CACHE_MAX_MB') or 512)
+    THUMBNAIL_MAX_SOURCE_BYTES = 10 * 1024 * 1024
+    THUMBNAIL_TIMEOUT = 10
+    THUMBNAIL_MAX_AGE = 30 * 24 * 3600  # Cache-Control max-age of served thumbnails
+    THUMBNAIL_FAILURE_TTL = 3600  # images that failed are not refetched for this long
+    THUMBNAIL_PREWARM_HOTNESS = float(os.environ.get('THUMBNAIL_PREWARM_HOTNESS') or 0.3)
+    THUMBNAIL_WORKERS = 4
+
+    # Home-feed snapshots: the default list pages pre-rendered after each ingest into one file all workers mmap
+    SNAPSHOT_ENABLED = (os.environ.get('SNAPSHOT_ENABLED') or 'true').lower() == 'true'
+    SNAPSHOT_DIR = os.environ.get('SNAPSHOT_DIR') or os.path.join(tempfile.gettempdir(), 'ai_news_snapshots')
+    SNAPSHOT_PAGES = 3  # pages of /api/articles per filter
+    SNAPSHOT_PER_PAGE = 20
+    SNAPSHOT_MAX_SOURCES = 50  # sources with the most articles get their own pages
+    SNAPSHOT_TRENDING_LIMITS = (20, 50)
+    SNAPSHOT_DEBOUNCE_SECONDS = 2  # ingests within this window share one rebuild
+    SNAPSHOT_REFRESH_SECONDS = 300  # rebuilt at least this often by the scheduler (view counts change)
+    SNAPSHOT_MAX_AGE_SECONDS = 900  # older snapshots are ignored
+    SNAPSHOT_COMPRESSION_LEVEL = 9
+
+    # Metrics: Prometheus text format at /metrics; gunicorn workers share totals through METRICS_DIR
+    METRICS_ENABLED = (os.environ.get('METRICS_ENABLED') or 'true').lower() == 'true'
+    METRICS_DIR = os.environ.get('METRICS_DIR')
+    METRICS_FLUSH_SECONDS = 10
+
+    # Profiling: log likely N+1 queries and slow requests; profile one request with X-Profile: 1 (or text)
+    QUERY_TRACKING_ENABLED = (os.environ.get('QUERY_TRACKING_ENABLED') or 'true').lower() == 'true'
+    SLOW_REQUEST_SECONDS = float(os.environ.get('SLOW_REQUEST_SECONDS') or 1.0)
+    N_PLUS_ONE_THRESHOLD = 10  # same statement shape this many times in one request
+    PROFILING_ENABLED = (os.environ.get('PROFILING_ENABLED') or 'false').lower() == 'true'
+    PROFILING_TOKEN = os.environ.get('PROFILING_TOKEN')
+    PROFILE_DIR = os.environ.get('PROFILE_DIR') or os.path.join(tempfile.gettempdir(), 'ai_news_profiles')
+
     # CORS
     CORS_ORIGINS = ["http://localhost:3000", "http://127.0.0.1:3000"]
 
 class DevelopmentConfig(Config):
     DEBUG = True
+    PROFILING_ENABLED = (os.environ.get('PROFILING_ENABLED') or 'true').lower() == 'true'
 
 class ProductionConfig(Config):
     DEBUG = False
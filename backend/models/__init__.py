@@ -1,5 +1,11 @@
-from .article import Article
-from .user import User
+from .base import db
+from .article import Article, ArchivedArticle
+from .article_body import BodyDictionary, ArticleBody
+from .keyword import Keyword, ArticleKeyword
+from .scrape_job import ScrapeJob
+from .user import User, DigestItem
 from .user_preferences import UserPreferences
+from .schema_state import SchemaState
 
-__all__ = ['Article', 'User', 'UserPreferences']
\ No newline at end of file
+__all__ = ['db', 'Article', 'ArchivedArticle', 'BodyDictionary', 'ArticleBody', 'Keyword', 'ArticleKeyword',
+           'ScrapeJob', 'User', 'DigestItem', 'UserPreferences', 'SchemaState']
@@ -1,13 +1,13 @@
 from datetime import datetime
-from flask_sqlalchemy import SQLAlchemy
-
-db = SQLAlchemy()
+from models.base import db
 
 class Article(db.Model):
+    # AUTOINCREMENT: ids of deleted (archived) rows are never handed out again
+    __table_args__ = {'sqlite_autoincrement': True}
+
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(500), nullable=False)
     url = db.Column(db.String(1000), unique=True, nullable=False)
-    content = db.Column(db.Text)
     summary = db.Column(db.Text)
     author = db.Column(db.String(200))
     source = db.Column(db.String(200), nullable=False)
@@ -39,6 +39,8 @@ class Article(db.Model):
     sentiment = db.Column(db.String(20))  # positive, negative, neutral
     importance_score = db.Column(db.Float, default=0.0)
     
+    # The full text lives compressed in article_body (see BodyStore)
+    
     def __repr__(self):
         return f'<Article {self.title[:50]}...>'
     
@@ -47,7 +49,6 @@ class Article(db.Model):
             'id': self.id,
             'title': self.title,
             'url': self.url,
-            'content': self.content,
             'summary': self.summary,
             'author': self.author,
             'source': self.source,
@@ -66,4 +67,37 @@ class Article(db.Model):
             'image_url': self.image_url,
             'sentiment': self.sentiment,
             'importance_score': self.importance_score
-        }
\ No newline at end of file
+        }
+
+class ArchivedArticle(db.Model):
+    # Same columns as article (ids are kept), plus the compressed body
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    title = db.Column(db.String(500), nullable=False)
+    url = db.Column(db.String(1000), unique=True, nullable=False)
+    summary = db.Column(db.Text)
+    author = db.Column(db.String(200))
+    source = db.Column(db.String(200), nullable=False)
+    category = db.Column(db.String(100))
+    published_at = db.Column(db.DateTime, nullable=False, index=True)
+    scraped_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime)
+    shares = db.Column(db.Integer)
+    comments = db.Column(db.Integer)
+    citations = db.Column(db.Integer)
+    views = db.Column(db.Integer)
+    likes = db.Column(db.Integer)
+    hotness_score = db.Column(db.Float)
+    keywords = db.Column(db.Text)
+    tags = db.Column(db.Text)
+    image_url = db.Column(db.String(1000))
+    sentiment = db.Column(db.String(20))
+    importance_score = db.Column(db.Float)
+    body_codec = db.Column(db.String(16))
+    body_dictionary_id = db.Column(db.Integer, db.ForeignKey('body_dictionary.id'))
+    body = db.Column(db.LargeBinary)
+    archived_at = db.Column(db.DateTime, nullable=False)
+    
+    def to_dict(self):
+        data = Article.to_dict(self)
+        data['archived_at'] = self.archived_at.isoformat() if self.archived_at else None
+        return data
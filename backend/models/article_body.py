@@ -0,0 +1,16 @@
+from datetime import datetime
+from models.base import db
+
+class BodyDictionary(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    codec = db.Column(db.String(16), nullable=False)
+    data = db.Column(db.LargeBinary, nullable=False)
+    samples = db.Column(db.Integer)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class ArticleBody(db.Model):
+    article_id = db.Column(db.Integer, db.ForeignKey('article.id', ondelete='CASCADE'), primary_key=True)
+    codec = db.Column(db.String(16), nullable=False)  # zlib, zstd
+    dictionary_id = db.Column(db.Integer, db.ForeignKey('body_dictionary.id'))
+    size = db.Column(db.Integer)  # uncompressed bytes
+    data = db.Column(db.LargeBinary, nullable=False)
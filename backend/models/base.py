@@ -0,0 +1,5 @@
+from flask_sqlalchemy import SQLAlchemy
+from services.database_service import RoutingSession
+
+# The one model registry; create_app binds it to each app with db.init_app(app)
+db = SQLAlchemy(session_options={'class_': RoutingSession})
@@ -0,0 +1,15 @@
+from models.base import db
+
+class Keyword(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), unique=True, nullable=False)
+
+class ArticleKeyword(db.Model):
+    article_id = db.Column(db.Integer, db.ForeignKey('article.id', ondelete='CASCADE'), primary_key=True)
+    keyword_id = db.Column(db.Integer, db.ForeignKey('keyword.id'), primary_key=True)
+    published_at = db.Column(db.DateTime, nullable=False)  # copied from the article for recency scans
+    in_keywords = db.Column(db.Boolean, nullable=False, default=True)  # False when the name is only a tag
+    
+    __table_args__ = (
+        db.Index('ix_article_keyword_keyword_published', 'keyword_id', 'published_at'),
+    )
@@ -0,0 +1,8 @@
+from datetime import datetime
+from models.base import db
+
+class SchemaState(db.Model):
+    # Fingerprint of the models the schema was last created from (see ensure_schema)
+    id = db.Column(db.Integer, primary_key=True)
+    fingerprint = db.Column(db.String(64), nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
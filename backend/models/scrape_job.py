@@ -0,0 +1,41 @@
+import json
+from datetime import datetime
+from models.base import db
+
+class ScrapeJob(db.Model):
+    id = db.Column(db.String(32), primary_key=True)
+    status = db.Column(db.String(20), default='queued', index=True)  # queued, running, completed, failed
+    sources = db.Column(db.Text)  # JSON array of source names
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    sources_done = db.Column(db.Integer, default=0)
+    articles_fetched = db.Column(db.Integer, default=0)
+    articles_new = db.Column(db.Integer, default=0)
+    articles_duplicate = db.Column(db.Integer, default=0)
+    results = db.Column(db.Text)  # JSON object of per-source counts
+    errors = db.Column(db.Text)   # JSON array of per-source errors
+    
+    def source_list(self):
+        return json.loads(self.sources or '[]')
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'status': self.status,
+            'sources': self.source_list(),
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'progress': {
+                'sources_done': self.sources_done,
+                'sources_total': len(self.source_list())
+            },
+            'counts': {
+                'fetched': self.articles_fetched,
+                'new': self.articles_new,
+                'duplicates': self.articles_duplicate
+            },
+            'results': json.loads(self.results or '{}'),
+            'errors': json.loads(self.errors or '[]')
+        }
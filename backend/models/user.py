@@ -1,7 +1,5 @@
 from datetime import datetime
-from flask_sqlalchemy import SQLAlchemy
-
-db = SQLAlchemy()
+from models.base import db
 
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -40,4 +38,9 @@ class User(db.Model):
             'is_active': self.is_active,
             'email_notifications': self.email_notifications,
             'push_notifications': self.push_notifications
-        }
\ No newline at end of file
+        }
+
+class DigestItem(db.Model):
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), primary_key=True)
+    article_id = db.Column(db.Integer, db.ForeignKey('article.id', ondelete='CASCADE'), primary_key=True)
+    matched_at = db.Column(db.DateTime, nullable=False, index=True)
@@ -1,11 +1,10 @@
+import json
 from datetime import datetime
-from flask_sqlalchemy import SQLAlchemy
-
-db = SQLAlchemy()
+from models.base import db
 
 class UserPreferences(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, unique=True)
     
     # Keyword preferences (JSON string)
     preferred_keywords = db.Column(db.Text)  # JSON array of keywords
@@ -39,11 +38,11 @@ class UserPreferences(db.Model):
         return {
             'id': self.id,
             'user_id': self.user_id,
-            'preferred_keywords': self.preferred_keywords,
-            'blocked_keywords': self.blocked_keywords,
-            'preferred_sources': self.preferred_sources,
-            'blocked_sources': self.blocked_sources,
-            'preferred_categories': self.preferred_categories,
+            'preferred_keywords': json.loads(self.preferred_keywords or '[]'),
+            'blocked_keywords': json.loads(self.blocked_keywords or '[]'),
+            'preferred_sources': json.loads(self.preferred_sources or '[]'),
+            'blocked_sources': json.loads(self.blocked_sources or '[]'),
+            'preferred_categories': json.loads(self.preferred_categories or '[]'),
             'notification_frequency': self.notification_frequency,
             'notification_time': self.notification_time.strftime('%H:%M') if self.notification_time else None,
             'min_hotness_score': self.min_hotness_score,
@@ -52,4 +51,4 @@ class UserPreferences(db.Model):
             'show_summaries': self.show_summaries,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
\ No newline at end of file
+        }
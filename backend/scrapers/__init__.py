@@ -1,6 +1,4 @@
 from .base_scraper import BaseScraper
-from .ai_news_scraper import AINewsScraper
-from .rss_scraper import RSScraper
-from .reddit_scraper import RedditScraper
+from .rss_scraper import RSScraper, AI_RSS_SOURCES
 
-__all__ = ['BaseScraper', 'AINewsScraper', 'RSScraper', 'RedditScraper']
\ No newline at end of file
+__all__ = ['BaseScraper', 'RSScraper', 'AI_RSS_SOURCES']
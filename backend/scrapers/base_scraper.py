@@ -2,7 +2,6 @@ import requests
 import time
 from abc import ABC, abstractmethod
 from datetime import datetime, timedelta
-from bs4 import BeautifulSoup
 from fake_useragent import UserAgent
 import logging
 
@@ -94,7 +93,7 @@ class BaseScraper(ABC):
     
     @abstractmethod
     def scrape_articles(self, max_articles=50):
-        """Scrape articles from the source"""
+        """Scrape articles from the source; raise when it cannot be fetched, so callers can tell it from an empty feed"""
         pass
     
     @abstractmethod
@@ -1,7 +1,11 @@
 import feedparser
 import json
+import time
 from datetime import datetime
 from .base_scraper import BaseScraper
+from services.metrics_service import (
+    SCRAPE_FETCH_SECONDS, SCRAPE_PARSE_SECONDS, SCRAPE_ENTRIES, SCRAPE_ERRORS, SCRAPE_NOT_MODIFIED
+)
 import logging
 
 logger = logging.getLogger(__name__)
@@ -10,25 +14,53 @@ class RSScraper(BaseScraper):
     def __init__(self, name, rss_url, rate_limit=1):
         super().__init__(name, rss_url, rate_limit)
         self.rss_url = rss_url
+        # Validators of the last full response, sent back so unchanged feeds answer 304
+        self.etag = None
+        self.modified = None
     
     def scrape_articles(self, max_articles=50):
-        """Scrape articles from RSS feed"""
+        """Scrape articles from RSS feed; raises when the feed cannot be fetched or read"""
         try:
-            feed = feedparser.parse(self.rss_url)
-            articles = []
-            
-            for entry in feed.entries[:max_articles]:
-                if self.is_ai_related(entry.get('title', ''), entry.get('summary', '')):
-                    article = self.parse_article(entry)
-                    if article:
-                        articles.append(article)
-            
-            logger.info(f"Scraped {len(articles)} AI-related articles from {self.name}")
-            return articles
-        
+            with SCRAPE_FETCH_SECONDS.time(self.name):
+                feed = feedparser.parse(self.rss_url, etag=self.etag, modified=self.modified)
         except Exception as e:
+            # Raised so the job records an error and the scheduler backs off, instead of a quiet feed
             logger.error(f"Error scraping RSS feed {self.name}: {e}")
+            SCRAPE_ERRORS.inc(self.name)
+            raise
+        
+        status = feed.get('status')
+        if status == 304:
+            SCRAPE_NOT_MODIFIED.inc(self.name)
+            logger.info(f"Feed {self.name} not modified")
             return []
+        if status is not None and status >= 400:
+            error = f"HTTP {status}"
+        elif feed.get('bozo') and not feed.entries:
+            error = feed.get('bozo_exception') or 'unreadable feed'
+        else:
+            error = None
+        if error is not None:
+            logger.error(f"Error scraping RSS feed {self.name}: {error}")
+            SCRAPE_ERRORS.inc(self.name)
+            raise ValueError(error)
+        self.etag = feed.get('etag')
+        self.modified = feed.get('modified')
+        
+        articles = []
+        
+        started = time.perf_counter()
+        entries = feed.entries[:max_articles]
+        for entry in entries:
+            if self.is_ai_related(entry.get('title', ''), entry.get('summary', '')):
+                article = self.parse_article(entry)
+                if article:
+                    articles.append(article)
+        SCRAPE_PARSE_SECONDS.observe(time.perf_counter() - started, self.name)
+        SCRAPE_ENTRIES.inc(self.name, amount=len(entries))
+        
+        logger.info(f"Scraped {len(articles)} AI-related articles from {self.name}")
+        return articles
     
     def parse_article(self, entry):
         """Parse RSS entry into article format"""
@@ -1,6 +1,28 @@
-from .ai_service import AIService
-from .ranking_service import RankingService
-from .scraper_service import ScraperService
-from .notification_service import NotificationService
+"""Service classes, imported on first access so `import services.x` stays cheap"""
+import importlib
 
-__all__ = ['AIService', 'RankingService', 'ScraperService', 'NotificationService']
\ No newline at end of file
+_EXPORTS = {
+    'AIService': 'ai_service',
+    'RankingService': 'ranking_service',
+    'IngestService': 'ingest_service',
+    'ScrapeJobService': 'scrape_job_service',
+    'SchedulerService': 'scheduler_service',
+    'KeywordService': 'keyword_service',
+    'FacetService': 'facet_service',
+    'PersonalizationService': 'personalization_service',
+    'DigestService': 'digest_service',
+    'RelatedService': 'related_service',
+    'ExportService': 'export_service',
+    'BodyStore': 'body_service',
+    'FullTextService': 'fulltext_service',
+    'ThumbnailService': 'thumbnail_service',
+    'SnapshotService': 'snapshot_service',
+    'RetentionService': 'retention_service',
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(f'.{_EXPORTS[name]}', __name__), name)
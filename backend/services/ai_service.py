@@ -1,30 +1,48 @@
-import openai
 import json
+import time
 import logging
-from textblob import TextBlob
-from flask import current_app
+from flask import current_app, has_app_context
+from services.metrics_service import AI_REQUEST_SECONDS, AI_REQUESTS, AI_TOKENS, NLP_ENRICHMENT_SECONDS
 
 logger = logging.getLogger(__name__)
 
 class AIService:
-    def __init__(self):
-        self.client = None
-        self._initialize_client()
+    def __init__(self, api_key=None):
+        self.api_key = api_key
+        self._client = None
+        self._client_loaded = False
+    
+    @property
+    def client(self):
+        """OpenAI client, created (and openai imported) on first use"""
+        if not self._client_loaded:
+            self._client_loaded = True
+            self._client = self._initialize_client()
+        return self._client
+    
+    @client.setter
+    def client(self, client):
+        self._client = client
+        self._client_loaded = True
     
     def _initialize_client(self):
         """Initialize OpenAI client"""
         try:
-            api_key = current_app.config.get('OPENAI_API_KEY')
+            api_key = self.api_key
+            if api_key is None and has_app_context():
+                api_key = current_app.config.get('OPENAI_API_KEY')
             if api_key:
-                self.client = openai.OpenAI(api_key=api_key)
-            else:
-                logger.warning("OpenAI API key not configured")
+                import openai
+                return openai.OpenAI(api_key=api_key)
+            logger.warning("OpenAI API key not configured")
         except Exception as e:
             logger.error(f"Failed to initialize OpenAI client: {e}")
+        return None
     
     def summarize_article(self, title, content, max_words=100):
         """Generate a summary of the article using AI"""
         if not self.client or not content:
+            AI_REQUESTS.inc('summarize', 'fallback')
             return self._fallback_summary(content, max_words)
         
         try:
@@ -38,6 +56,7 @@ class AIService:
             Summary:
             """
             
+            started = time.perf_counter()
             response = self.client.chat.completions.create(
                 model="gpt-3.5-turbo",
                 messages=[
@@ -47,12 +66,18 @@ class AIService:
                 max_tokens=150,
                 temperature=0.3
             )
+            AI_REQUEST_SECONDS.observe(time.perf_counter() - started, 'summarize')
+            AI_REQUESTS.inc('summarize', 'ok')
+            if response.usage:
+                AI_TOKENS.inc('summarize', 'prompt', amount=response.usage.prompt_tokens)
+                AI_TOKENS.inc('summarize', 'completion', amount=response.usage.completion_tokens)
             
             summary = response.choices[0].message.content.strip()
             return summary
         
         except Exception as e:
             logger.error(f"Error generating AI summary: {e}")
+            AI_REQUESTS.inc('summarize', 'error')
             return self._fallback_summary(content, max_words)
     
     def _fallback_summary(self, content, max_words=100):
@@ -72,6 +97,7 @@ class AIService:
     def extract_keywords(self, text, max_keywords=10):
         """Extract keywords from text using NLP"""
         try:
+            from textblob import TextBlob  # pulls in nltk, so imported on first use
             blob = TextBlob(text)
             
             # Extract noun phrases as potential keywords
@@ -91,6 +117,7 @@ class AIService:
     def analyze_sentiment(self, text):
         """Analyze sentiment of the text"""
         try:
+            from textblob import TextBlob
             blob = TextBlob(text)
             polarity = blob.sentiment.polarity
             
@@ -149,18 +176,23 @@ class AIService:
         
         for article in articles:
             try:
+                started = time.perf_counter()
+                
                 # Generate summary
-                summary = self.summarize_article(
-                    article.get('title', ''),
-                    article.get('content', '')
-                )
+                with NLP_ENRICHMENT_SECONDS.time('summary'):
+                    summary = self.summarize_article(
+                        article.get('title', ''),
+                        article.get('content', '')
+                    )
                 
                 # Extract keywords
                 text = f"{article.get('title', '')} {article.get('content', '')}"
-                keywords = self.extract_keywords(text)
+                with NLP_ENRICHMENT_SECONDS.time('keywords'):
+                    keywords = self.extract_keywords(text)
                 
                 # Analyze sentiment
-                sentiment = self.analyze_sentiment(text)
+                with NLP_ENRICHMENT_SECONDS.time('sentiment'):
+                    sentiment = self.analyze_sentiment(text)
                 
                 # Calculate importance score
                 importance_score = self.calculate_importance_score(
@@ -168,6 +200,7 @@ class AIService:
                     article.get('content', ''),
                     keywords
                 )
+                NLP_ENRICHMENT_SECONDS.observe(time.perf_counter() - started, 'total')
                 
                 # Update article data
                 article.update({
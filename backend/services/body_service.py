@@ -0,0 +1,279 @@
+import zlib
+import logging
+import threading
+from collections import Counter
+from sqlalchemy import inspect, text
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+ZLIB_MAX_DICTIONARY = 32 * 1024
+
+def train_zlib_dictionary(samples, size=ZLIB_MAX_DICTIONARY):
+    """Preset dictionary of the most common words and word pairs in samples.
+
+    zlib finds matches closer to the end of the dictionary with shorter
+    codes, so the most frequent strings go last.
+    """
+    counts = Counter()
+    for sample in samples:
+        words = sample.decode('utf-8', 'ignore').split()
+        counts.update(word for word in words if len(word) > 3)
+        counts.update(f'{a} {b}' for a, b in zip(words, words[1:]))
+
+    pieces = []
+    total = 0
+    for phrase, count in counts.most_common():
+        if count < 2:
+            break
+        piece = phrase.encode('utf-8') + b' '
+        if total + len(piece) > size:
+            break
+        pieces.append(piece)
+        total += len(piece)
+    return b''.join(reversed(pieces))
+
+class BodyStore:
+    """Article bodies kept compressed in article_body, away from the listing columns.
+
+    Bodies are compressed with zstd when the zstandard package is installed
+    and zlib otherwise, optionally with a dictionary trained on stored bodies.
+    Each row records its codec and dictionary, so retraining or switching codec
+    never breaks old rows.
+    """
+
+    def __init__(self, app, db, article_model, body_model, dictionary_model):
+        config = app.config
+        self.db = db
+        self.Article = article_model
+        self.ArticleBody = body_model
+        self.BodyDictionary = dictionary_model
+        codec = config.get('BODY_CODEC', 'auto')
+        if codec == 'auto':
+            codec = 'zstd' if zstandard is not None else 'zlib'
+        if codec == 'zstd' and zstandard is None:
+            logger.warning("BODY_CODEC is zstd but zstandard is not installed, using zlib")
+            codec = 'zlib'
+        self.codec = codec
+        self.level = config.get('BODY_COMPRESSION_LEVEL', 6)
+        self.use_dictionary = config.get('BODY_DICTIONARY_ENABLED', True)
+
+        self._dictionaries = {}
+        self._active_dictionary = False  # False = not looked up yet
+        self._lock = threading.Lock()
+        self._zstd_dictionaries = {}  # dictionary id -> ZstdCompressionDict, shared by all threads
+        self._zstd = threading.local()  # per-thread (de)compressors; zstandard's are not thread-safe
+
+    # Codecs
+
+    def _dictionary(self, dictionary_id):
+        with self._lock:
+            if dictionary_id in self._dictionaries:
+                return self._dictionaries[dictionary_id]
+        row = self.db.session.get(self.BodyDictionary, dictionary_id)
+        with self._lock:
+            self._dictionaries[dictionary_id] = row.data if row else None
+        return row.data if row else None
+
+    def active_dictionary(self):
+        """(id, bytes) of the newest dictionary for the current codec, or (None, None)"""
+        if not self.use_dictionary:
+            return None, None
+        with self._lock:
+            active = self._active_dictionary
+        if active is False:
+            row = self.BodyDictionary.query.filter_by(codec=self.codec).order_by(
+                self.BodyDictionary.id.desc()
+            ).first()
+            active = (row.id, row.data) if row else (None, None)
+            with self._lock:
+                self._active_dictionary = active
+        return active
+
+    def _zstd_dictionary(self, dictionary_id, dictionary):
+        with self._lock:
+            zstd_dictionary = self._zstd_dictionaries.get(dictionary_id)
+            if zstd_dictionary is None:
+                zstd_dictionary = self._zstd_dictionaries[dictionary_id] = zstandard.ZstdCompressionDict(dictionary)
+            return zstd_dictionary
+
+    def _zstd_codec(self, kind, dictionary_id, dictionary):
+        """This thread's compressor or decompressor for a dictionary version, built once"""
+        codecs = self._zstd.__dict__.setdefault(kind, {})
+        codec = codecs.get(dictionary_id)
+        if codec is None:
+            params = {}
+            if dictionary is not None:
+                params['dict_data'] = self._zstd_dictionary(dictionary_id, dictionary)
+            if kind == 'compressors':
+                codec = zstandard.ZstdCompressor(level=self.level, **params)
+            else:
+                codec = zstandard.ZstdDecompressor(**params)
+            codecs[dictionary_id] = codec
+        return codec
+
+    def encode(self, content):
+        """Compress a body; returns (codec, dictionary_id, data)"""
+        raw = content.encode('utf-8')
+        dictionary_id, dictionary = self.active_dictionary()
+
+        if self.codec == 'zstd':
+            return 'zstd', dictionary_id, self._zstd_codec('compressors', dictionary_id, dictionary).compress(raw)
+
+        if dictionary is not None:
+            compressor = zlib.compressobj(self.level, zdict=dictionary)
+        else:
+            compressor = zlib.compressobj(self.level)
+        return 'zlib', dictionary_id, compressor.compress(raw) + compressor.flush()
+
+    def decode(self, codec, dictionary_id, data):
+        dictionary = self._dictionary(dictionary_id) if dictionary_id else None
+
+        if codec == 'zstd':
+            if zstandard is None:
+                raise RuntimeError('zstandard is required to read zstd-compressed bodies')
+            decompressor = self._zstd_codec('decompressors', dictionary_id, dictionary)
+            return decompressor.decompress(data).decode('utf-8')
+
+        decompressor = zlib.decompressobj(zdict=dictionary) if dictionary is not None else zlib.decompressobj()
+        return (decompressor.decompress(data) + decompressor.flush()).decode('utf-8')
+
+    # Reading and writing
+
+    def store(self, article_id, content, replace=False):
+        """Add an article's body to the current session (caller commits)"""
+        if not content:
+            return
+        codec, dictionary_id, data = self.encode(content)
+        body = self.ArticleBody(
+            article_id=article_id,
+            codec=codec,
+            dictionary_id=dictionary_id,
+            size=len(content.encode('utf-8')),
+            data=data
+        )
+        if replace:
+            self.db.session.merge(body)
+        else:
+            self.db.session.add(body)
+
+    def load(self, article_id):
+        """An article's body, or None when it has none"""
+        body = self.db.session.get(self.ArticleBody, article_id)
+        if body is None:
+            return None
+        return self.decode(body.codec, body.dictionary_id, body.data)
+
+    # Dictionary training
+
+    def train_dictionary(self, samples=2000, size=64 * 1024):
+        """Train a dictionary on recent bodies; new bodies use it from now on"""
+        bodies = self.ArticleBody.query.order_by(self.ArticleBody.article_id.desc()).limit(samples).all()
+        texts = [self.decode(body.codec, body.dictionary_id, body.data).encode('utf-8') for body in bodies]
+        legacy = self._legacy_content_samples(samples - len(texts))
+        texts.extend(content.encode('utf-8') for content in legacy)
+        if len(texts) < 10:
+            return None
+
+        if self.codec == 'zstd':
+            data = zstandard.train_dictionary(size, texts, level=self.level).as_bytes()
+        else:
+            data = train_zlib_dictionary(texts)
+
+        dictionary = self.BodyDictionary(codec=self.codec, data=data, samples=len(texts))
+        self.db.session.add(dictionary)
+        self.db.session.commit()
+        with self._lock:
+            self._dictionaries[dictionary.id] = data
+            self._active_dictionary = (dictionary.id, data)
+        logger.info(f"Trained {self.codec} body dictionary {dictionary.id} ({len(data)} bytes) on {len(texts)} bodies")
+        return dictionary
+
+    # Migration of the old article.content column
+
+    def has_legacy_column(self):
+        columns = inspect(self.db.engine).get_columns(self.Article.__tablename__)
+        return any(column['name'] == 'content' for column in columns)
+
+    def _legacy_content_samples(self, limit):
+        if limit <= 0 or not self.has_legacy_column():
+            return []
+        rows = self.db.session.execute(text(
+            f'SELECT content FROM {self.Article.__tablename__} WHERE content IS NOT NULL ORDER BY id DESC LIMIT :limit'
+        ), {'limit': limit}).all()
+        return [content for content, in rows if content]
+
+    def migrate(self, batch_size=500):
+        """Move bodies out of article.content into article_body; returns how many moved"""
+        if not self.has_legacy_column():
+            return 0
+
+        table = self.Article.__tablename__
+        moved = 0
+        last_id = 0
+        while True:
+            rows = self.db.session.execute(text(
+                f'SELECT id, content FROM {table} WHERE content IS NOT NULL AND id > :last_id '
+                f'ORDER BY id LIMIT :limit'
+            ), {'last_id': last_id, 'limit': batch_size}).all()
+            if not rows:
+                break
+
+            last_id = rows[-1][0]
+            for article_id, content in rows:
+                self.store(article_id, content)
+            self.db.session.execute(text(
+                f'UPDATE {table} SET content = NULL WHERE id IN ({",".join(str(row[0]) for row in rows)})'
+            ))
+            self.db.session.commit()
+            moved += len(rows)
+            logger.info(f"Moved {moved} article bodies to article_body")
+
+        return moved
+
+    def vacuum(self):
+        """Give the space freed by the migration back to the filesystem (SQLite only)"""
+        if self.db.engine.dialect.name != 'sqlite':
+            return False
+        self.db.session.close()
+        with self.db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+            connection.exec_driver_sql('VACUUM')
+        return True
+
+    def report(self):
+        """Body counts and bytes before and after compression, plus table sizes when available"""
+        ArticleBody = self.ArticleBody
+        count, raw, stored = self.db.session.query(
+            self.db.func.count(ArticleBody.article_id),
+            self.db.func.coalesce(self.db.func.sum(ArticleBody.size), 0),
+            self.db.func.coalesce(self.db.func.sum(self.db.func.length(ArticleBody.data)), 0)
+        ).one()
+
+        report = {
+            'bodies': count,
+            'codec': self.codec,
+            'dictionary_id': self.active_dictionary()[0],
+            'raw_bytes': int(raw),
+            'stored_bytes': int(stored),
+            'saved_bytes': int(raw) - int(stored),
+            'ratio': round(raw / stored, 2) if stored else None,
+        }
+
+        if self.db.engine.dialect.name == 'sqlite':
+            try:
+                rows = self.db.session.execute(text(
+                    'SELECT name, SUM(pgsize) FROM dbstat GROUP BY name'
+                )).all()
+                report['table_bytes'] = {name: int(size) for name, size in rows}
+            except Exception:
+                # dbstat is an optional SQLite compile-time feature
+                pass
+            page_size = self.db.session.execute(text('PRAGMA page_size')).scalar()
+            page_count = self.db.session.execute(text('PRAGMA page_count')).scalar()
+            report['database_bytes'] = page_size * page_count
+
+        return report
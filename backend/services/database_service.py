@@ -0,0 +1,289 @@
+import time
+import queue
+import hashlib
+import atexit
+import logging
+import threading
+from collections import defaultdict
+from contextlib import nullcontext
+from concurrent.futures import Future
+from flask import current_app
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.sql.dml import UpdateBase
+from sqlalchemy.sql.elements import TextClause
+
+logger = logging.getLogger(__name__)
+
+def _is_sqlite(url):
+    return str(url).startswith('sqlite')
+
+def _is_sqlite_memory(url):
+    url = str(url)
+    return url in ('sqlite://', 'sqlite:///:memory:') or 'mode=memory' in url
+
+def configure_engines(app):
+    """Set writer pool options before the SQLAlchemy extension is created.
+
+    On a SQLite file the write pool holds a single connection, so every process
+    has exactly one connection that can take the database write lock.
+    """
+    uri = app.config['SQLALCHEMY_DATABASE_URI']
+    if not _is_sqlite(uri) or _is_sqlite_memory(uri):
+        return
+
+    options = app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', {})
+    options.setdefault('pool_size', 1)
+    options.setdefault('max_overflow', 0)
+    options.setdefault('pool_timeout', 30)
+    connect_args = options.setdefault('connect_args', {})
+    connect_args.setdefault('timeout', app.config.get('SQLITE_BUSY_TIMEOUT_MS', 5000) / 1000)
+    connect_args.setdefault('check_same_thread', False)
+
+def schema_fingerprint(metadata):
+    """Hash of every table's columns, keys and indexes; it changes whenever a model does"""
+    digest = hashlib.sha1()
+    for name, table in sorted(metadata.tables.items()):
+        digest.update(f'table {name}\n'.encode())
+        for column in table.columns:
+            foreign_keys = sorted(key.target_fullname for key in column.foreign_keys)
+            digest.update((
+                f'{column.name} {column.type!r} {column.nullable} {column.primary_key} '
+                f'{column.unique} {column.index} {foreign_keys}\n'
+            ).encode())
+        for index in sorted(table.indexes, key=lambda index: index.name or ''):
+            digest.update(f'index {index.name} {[c.name for c in index.columns]} {index.unique}\n'.encode())
+    return digest.hexdigest()
+
+def ensure_schema(app, db, state_model):
+    """Create missing tables, unless the database was already built from these models.
+
+    SCHEMA_CREATE is 'auto', 'always' or 'never' (the schema is managed with
+    ``flask db upgrade``). In auto mode one query compares the fingerprint
+    stored at the last create_all with the current models, and create_all,
+    which inspects every table, only runs when they differ. Returns whether
+    it ran.
+    """
+    mode = app.config.get('SCHEMA_CREATE', 'auto')
+    if mode == 'never':
+        return False
+
+    fingerprint = schema_fingerprint(db.metadata)
+    if mode == 'auto':
+        try:
+            state = db.session.get(state_model, 1)
+            if state is not None and state.fingerprint == fingerprint:
+                return False
+        except SQLAlchemyError:
+            db.session.rollback()  # no schema_state table yet
+
+    db.create_all()
+    try:
+        state = db.session.get(state_model, 1) or state_model(id=1)
+        state.fingerprint = fingerprint
+        db.session.add(state)
+        db.session.commit()
+    except SQLAlchemyError as e:
+        # Another worker booting at the same time stored it first
+        db.session.rollback()
+        logger.debug(f"Schema fingerprint not stored: {e}")
+    logger.info(f"Database schema created or updated ({fingerprint[:12]})")
+    return True
+
+class RoutingSession(Session):
+    """Session that sends plain reads to the read-only pool.
+
+    Flushes, DML statements and anything after the first write in a transaction
+    go to the writer, so a transaction always reads its own writes.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is not None:
+            return bind
+
+        router = current_app.extensions.get('database')
+        if (
+            router is None
+            or router.reader is None
+            or self._flushing
+            or self.info.get('writing')
+            or isinstance(clause, (UpdateBase, TextClause))
+        ):
+            return super().get_bind(mapper, clause, **kwargs)
+
+        return router.reader
+
+@event.listens_for(RoutingSession, 'after_begin')
+def _mark_writer_transaction(session, transaction, connection):
+    router = current_app.extensions.get('database')
+    if router is not None and connection.engine is not router.reader:
+        session.info['writing'] = True
+
+@event.listens_for(RoutingSession, 'after_transaction_end')
+def _clear_writer_transaction(session, transaction):
+    if transaction.parent is None:
+        session.info.pop('writing', None)
+
+class DatabaseRouter:
+    """Owns the read-only engine and applies SQLite connection pragmas"""
+
+    def __init__(self, app, db):
+        self.app = app
+        self.db = db
+        self.reader = None
+        config = app.config
+
+        with app.app_context():
+            writer = db.engine
+
+        if _is_sqlite(writer.url):
+            event.listen(writer, 'connect', self._writer_pragmas)
+
+        read_uri = config.get('SQLALCHEMY_READ_DATABASE_URI')
+        if read_uri:
+            self.reader = create_engine(read_uri, pool_size=config.get('DB_READ_POOL_SIZE', 8))
+        elif _is_sqlite(writer.url) and not _is_sqlite_memory(writer.url):
+            self.reader = create_engine(
+                writer.url,
+                pool_size=config.get('DB_READ_POOL_SIZE', 8),
+                max_overflow=config.get('DB_READ_POOL_SIZE', 8),
+                connect_args={
+                    'timeout': config.get('SQLITE_BUSY_TIMEOUT_MS', 5000) / 1000,
+                    'check_same_thread': False
+                }
+            )
+            event.listen(self.reader, 'connect', self._reader_pragmas)
+
+        app.extensions['database'] = self
+
+    def _common_pragmas(self, cursor):
+        config = self.app.config
+        cursor.execute(f"PRAGMA busy_timeout = {int(config.get('SQLITE_BUSY_TIMEOUT_MS', 5000))}")
+        cursor.execute(f"PRAGMA mmap_size = {int(config.get('SQLITE_MMAP_SIZE', 0))}")
+        cursor.execute(f"PRAGMA cache_size = {int(config.get('SQLITE_CACHE_SIZE', -2000))}")
+        cursor.execute('PRAGMA temp_store = MEMORY')
+
+    def _writer_pragmas(self, dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        if self.app.config.get('SQLITE_WAL_ENABLED', True):
+            cursor.execute('PRAGMA journal_mode = WAL')
+            cursor.execute('PRAGMA synchronous = NORMAL')
+        self._common_pragmas(cursor)
+        cursor.close()
+
+    def _reader_pragmas(self, dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        self._common_pragmas(cursor)
+        cursor.execute('PRAGMA query_only = ON')
+        cursor.close()
+
+class DatabaseWriter:
+    """Single thread that performs the scrape and counter writes of this process.
+
+    Counter increments are buffered in memory and applied in one transaction
+    every COUNTER_FLUSH_SECONDS instead of one commit per request.
+    """
+
+    def __init__(self, app, db):
+        self.app = app
+        self.db = db
+        self.flush_interval = app.config.get('COUNTER_FLUSH_SECONDS', 5)
+        self._queue = queue.Queue()
+        self._counters = defaultdict(int)
+        self._counter_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._thread = None
+
+    def run(self, fn, *args, **kwargs):
+        """Run fn inside an app context on the writer thread and return its result"""
+        if threading.current_thread() is self._thread:
+            return fn(*args, **kwargs)
+        return self.submit(fn, *args, **kwargs).result()
+
+    def submit(self, fn, *args, **kwargs):
+        """Queue fn for the writer thread and return a Future"""
+        self._ensure_started()
+        future = Future()
+        self._queue.put((future, fn, args, kwargs))
+        return future
+
+    def increment(self, model, row_id, column, amount=1):
+        """Buffer ``column += amount`` for one row"""
+        self._ensure_started()
+        with self._counter_lock:
+            self._counters[(model, column, row_id)] += amount
+
+    def pending(self, model, row_id, column):
+        """Increments buffered for a row that are not written yet"""
+        with self._counter_lock:
+            return self._counters.get((model, column, row_id), 0)
+
+    def flush(self):
+        """Write buffered counters now and wait for it"""
+        self.run(self._flush_counters)
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name='db-writer', daemon=True)
+                self._thread.start()
+                atexit.register(self._flush_at_exit)
+
+    def _loop(self):
+        next_flush = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                item = self._queue.get(timeout=max(next_flush - time.monotonic(), 0))
+            except queue.Empty:
+                item = None
+
+            if item is not None:
+                future, fn, args, kwargs = item
+                if future.set_running_or_notify_cancel():
+                    with self.app.app_context(), self._track(fn):
+                        try:
+                            future.set_result(fn(*args, **kwargs))
+                        except BaseException as e:
+                            self.db.session.rollback()
+                            future.set_exception(e)
+
+            if time.monotonic() >= next_flush:
+                self._flush_counters()
+                next_flush = time.monotonic() + self.flush_interval
+
+    def _track(self, fn):
+        """Query tracking for one task, when the request profiler is installed"""
+        profiler = self.app.extensions.get('profiler')
+        if profiler is None:
+            return nullcontext()
+        fn = getattr(fn, 'func', fn)  # functools.partial
+        return profiler.track(f"task {getattr(fn, '__qualname__', fn)}")
+
+    def _flush_counters(self):
+        with self._counter_lock:
+            counters, self._counters = self._counters, defaultdict(int)
+        if not counters:
+            return
+
+        try:
+            with self.app.app_context():
+                for (model, column, row_id), amount in counters.items():
+                    self.db.session.query(model).filter(model.id == row_id).update(
+                        {column: getattr(model, column) + amount},
+                        synchronize_session=False
+                    )
+                self.db.session.commit()
+        except Exception as e:
+            logger.error(f"Error flushing {len(counters)} counters: {e}")
+            with self._counter_lock:
+                for key, amount in counters.items():
+                    self._counters[key] += amount
+
+    def _flush_at_exit(self):
+        try:
+            self._flush_counters()
+        except Exception as e:
+            logger.error(f"Error flushing counters at exit: {e}")
@@ -0,0 +1,375 @@
+import os
+import json
+import time
+import bisect
+import logging
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta
+from email.charset import Charset, QP
+from email.mime.text import MIMEText
+from email.utils import format_datetime
+
+logger = logging.getLogger(__name__)
+
+FREQUENCIES = ('hourly', 'daily', 'weekly')
+EMPTY = frozenset()
+
+# compat32 MIMEText renders several times faster than EmailMessage
+UTF8 = Charset('utf-8')
+UTF8.body_encoding = QP
+
+def _json_set(value, transform):
+    try:
+        items = json.loads(value) if value else []
+    except (TypeError, ValueError):
+        return EMPTY
+    if not isinstance(items, list):
+        return EMPTY
+    return frozenset(transform(item) for item in items if item)
+
+class DigestProfile:
+    """What one user wants in their digest"""
+    __slots__ = ('user_id', 'frequency', 'min_hotness', 'keywords', 'sources', 'categories',
+                 'blocked_keywords', 'blocked_sources')
+
+    def __init__(self, user_id, frequency, min_hotness, keywords, sources, categories,
+                 blocked_keywords, blocked_sources):
+        self.user_id = user_id
+        self.frequency = frequency if frequency in FREQUENCIES else 'daily'
+        self.min_hotness = min_hotness or 0.0
+        self.keywords = keywords
+        self.sources = sources
+        self.categories = categories
+        self.blocked_keywords = blocked_keywords
+        self.blocked_sources = blocked_sources
+
+    @property
+    def is_wildcard(self):
+        """No positive preferences: every article above min_hotness matches"""
+        return not (self.keywords or self.sources or self.categories)
+
+    def accepts(self, hotness, source, keywords):
+        if hotness < self.min_hotness:
+            return False
+        if self.blocked_sources and source in self.blocked_sources:
+            return False
+        if self.blocked_keywords and not self.blocked_keywords.isdisjoint(keywords):
+            return False
+        return True
+
+class PreferenceIndex:
+    """Inverted index from keyword, source and category to the users who want them"""
+
+    def __init__(self):
+        self.profiles = {}
+        self.by_keyword = defaultdict(set)
+        self.by_source = defaultdict(set)
+        self.by_category = defaultdict(set)
+        self.wildcard = set()
+        self._wildcard_order = None
+
+    def add(self, profile):
+        self.remove(profile.user_id)
+        self.profiles[profile.user_id] = profile
+        if profile.is_wildcard:
+            self.wildcard.add(profile.user_id)
+            self._wildcard_order = None
+            return
+        for keyword in profile.keywords:
+            self.by_keyword[keyword].add(profile.user_id)
+        for source in profile.sources:
+            self.by_source[source].add(profile.user_id)
+        for category in profile.categories:
+            self.by_category[category].add(profile.user_id)
+
+    def remove(self, user_id):
+        profile = self.profiles.pop(user_id, None)
+        if profile is None:
+            return
+        if user_id in self.wildcard:
+            self.wildcard.discard(user_id)
+            self._wildcard_order = None
+        for postings, keys in ((self.by_keyword, profile.keywords),
+                               (self.by_source, profile.sources),
+                               (self.by_category, profile.categories)):
+            for key in keys:
+                postings[key].discard(user_id)
+                if not postings[key]:
+                    del postings[key]
+
+    def match(self, hotness, source, category, keywords):
+        """User ids whose preferences accept an article"""
+        candidates = set(self.by_source.get(source, EMPTY))
+        candidates.update(self.by_category.get(category, EMPTY))
+        for keyword in keywords:
+            candidates.update(self.by_keyword.get(keyword, EMPTY))
+
+        profiles = self.profiles
+        matched = [
+            user_id for user_id in candidates
+            if profiles[user_id].accepts(hotness, source, keywords)
+        ]
+
+        # Wildcard users sorted by threshold: everyone up to bisect() qualifies on hotness
+        thresholds, user_ids = self._wildcard_by_threshold()
+        for user_id in user_ids[:bisect.bisect_right(thresholds, hotness)]:
+            if profiles[user_id].accepts(hotness, source, keywords):
+                matched.append(user_id)
+        return matched
+
+    def _wildcard_by_threshold(self):
+        if self._wildcard_order is None:
+            ordered = sorted((self.profiles[user_id].min_hotness, user_id) for user_id in self.wildcard)
+            self._wildcard_order = ([threshold for threshold, _ in ordered], [user_id for _, user_id in ordered])
+        return self._wildcard_order
+
+class FileOutbox:
+    """Local stand-in for an SMTP relay: one .eml file per digest"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def deliver(self, message, name):
+        path = os.path.join(self.directory, f'{name}.eml')
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(message.as_bytes())
+        os.replace(tmp_path, path)
+        return path
+
+class DigestService:
+    """Match new articles against every user's preferences and send periodic digests.
+
+    Matching runs as an ingest listener. Each article is looked up in an
+    inverted index over preference keywords, sources and categories instead of
+    being compared with every user. Matches wait in the digest_item table until
+    the user's next hourly, daily or weekly slot, when send_due() renders them
+    into a message for the outbox.
+    """
+
+    def __init__(self, app, db, article_model, user_model, preferences_model, digest_item_model,
+                 keyword_service, outbox=None):
+        config = app.config
+        self.db = db
+        self.Article = article_model
+        self.User = user_model
+        self.UserPreferences = preferences_model
+        self.DigestItem = digest_item_model
+        self.keyword_service = keyword_service
+        self.outbox = outbox or FileOutbox(config['DIGEST_OUTBOX_DIR'])
+        self.sender = config.get('DIGEST_FROM', 'digest@localhost')
+        self.max_articles = config.get('DIGEST_MAX_ARTICLES', 10)
+        self.batch_users = config.get('DIGEST_BATCH_USERS', 500)
+        self.weekly_day = config.get('DIGEST_WEEKLY_DAY', 0)
+        self.rebuild_seconds = config.get('DIGEST_INDEX_REBUILD_SECONDS', 300)
+        hour, minute = (int(part) for part in config.get('DIGEST_DEFAULT_TIME', '08:00').split(':'))
+        self.default_time = (hour, minute)
+
+        self._index = None
+        self._built_at = 0
+        self._lock = threading.Lock()
+
+    # Preference index
+
+    def profile_from_row(self, user_id, frequency, min_hotness, preferred_keywords, preferred_sources,
+                         preferred_categories, blocked_keywords, blocked_sources):
+        normalize = self.keyword_service.normalize
+        return DigestProfile(
+            user_id, frequency, min_hotness,
+            _json_set(preferred_keywords, normalize),
+            _json_set(preferred_sources, lambda source: str(source).lower()),
+            _json_set(preferred_categories, str),
+            _json_set(blocked_keywords, normalize),
+            _json_set(blocked_sources, lambda source: str(source).lower())
+        )
+
+    def _profile_query(self):
+        User, UserPreferences = self.User, self.UserPreferences
+        return self.db.session.query(
+            UserPreferences.user_id,
+            UserPreferences.notification_frequency,
+            UserPreferences.min_hotness_score,
+            UserPreferences.preferred_keywords,
+            UserPreferences.preferred_sources,
+            UserPreferences.preferred_categories,
+            UserPreferences.blocked_keywords,
+            UserPreferences.blocked_sources
+        ).join(User, User.id == UserPreferences.user_id).filter(
+            User.is_active.is_(True),
+            User.email_notifications.is_(True)
+        )
+
+    def build_index(self):
+        index = PreferenceIndex()
+        for row in self._profile_query().yield_per(5000):
+            index.add(self.profile_from_row(*row))
+        return index
+
+    def index(self):
+        with self._lock:
+            if self._index is not None and time.monotonic() - self._built_at < self.rebuild_seconds:
+                return self._index
+
+        index = self.build_index()
+        with self._lock:
+            self._index = index
+            self._built_at = time.monotonic()
+        return index
+
+    def update_user(self, user_id):
+        """Re-read one user's preferences into the index after they change"""
+        with self._lock:
+            index = self._index
+        if index is None:
+            return
+
+        row = self._profile_query().filter(self.UserPreferences.user_id == user_id).first()
+        with self._lock:
+            if row is None:
+                index.remove(user_id)
+            else:
+                index.add(self.profile_from_row(*row))
+
+    # Matching
+
+    def match(self, articles):
+        """(user_id, article_id) pairs for a batch of articles"""
+        index = self.index()
+        pairs = []
+        with self._lock:
+            for article in articles:
+                keywords = frozenset(self.keyword_service.parse_keywords(article.keywords, article.tags))
+                user_ids = index.match(
+                    article.hotness_score or 0.0,
+                    (article.source or '').lower(),
+                    article.category,
+                    keywords
+                )
+                pairs.extend((user_id, article.id) for user_id in user_ids)
+        return pairs
+
+    def match_articles(self, articles):
+        """Ingest listener: queue newly stored articles for matching users' digests"""
+        pairs = self.match(articles)
+        if not pairs:
+            return 0
+
+        now = datetime.utcnow()
+        table = self.DigestItem.__table__
+        for start in range(0, len(pairs), 10000):
+            self.db.session.execute(table.insert(), [
+                {'user_id': user_id, 'article_id': article_id, 'matched_at': now}
+                for user_id, article_id in pairs[start:start + 10000]
+            ])
+        self.db.session.commit()
+        logger.info(f"Queued {len(pairs)} digest items for {len(articles)} articles")
+        return len(pairs)
+
+    # Sending
+
+    def latest_slot(self, frequency, notification_time, now):
+        """Most recent scheduled send time at or before now"""
+        if frequency == 'hourly':
+            return now.replace(minute=0, second=0, microsecond=0)
+
+        hour, minute = (notification_time.hour, notification_time.minute) if notification_time else self.default_time
+        slot = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if frequency == 'weekly':
+            slot -= timedelta(days=(slot.weekday() - self.weekly_day) % 7)
+            if slot > now:
+                slot -= timedelta(days=7)
+        elif slot > now:
+            slot -= timedelta(days=1)
+        return slot
+
+    def due_users(self, now):
+        """Users with pending items whose slot has passed, grouped by frequency"""
+        DigestItem, UserPreferences = self.DigestItem, self.UserPreferences
+        rows = self.db.session.query(
+            DigestItem.user_id,
+            self.db.func.min(DigestItem.matched_at),
+            UserPreferences.notification_frequency,
+            UserPreferences.notification_time
+        ).join(
+            UserPreferences, UserPreferences.user_id == DigestItem.user_id
+        ).filter(
+            DigestItem.matched_at <= now
+        ).group_by(
+            DigestItem.user_id, UserPreferences.notification_frequency, UserPreferences.notification_time
+        ).all()
+
+        buckets = {frequency: [] for frequency in FREQUENCIES}
+        for user_id, first_matched, frequency, notification_time in rows:
+            frequency = frequency if frequency in FREQUENCIES else 'daily'
+            # Only items matched before the slot are due; later ones wait for the next one
+            if self.latest_slot(frequency, notification_time, now) > first_matched:
+                buckets[frequency].append(user_id)
+        return buckets
+
+    def send_due(self, now=None):
+        """Render and deliver every due digest; returns counts per frequency"""
+        now = now or datetime.utcnow()
+        sent = {}
+        for frequency, user_ids in self.due_users(now).items():
+            sent[frequency] = 0
+            for start in range(0, len(user_ids), self.batch_users):
+                sent[frequency] += self._send_batch(frequency, user_ids[start:start + self.batch_users], now)
+        if any(sent.values()):
+            logger.info(f"Sent digests: {sent}")
+        return sent
+
+    def _send_batch(self, frequency, user_ids, now):
+        Article, User, DigestItem = self.Article, self.User, self.DigestItem
+        rows = self.db.session.query(
+            DigestItem.user_id, Article.title, Article.url, Article.source, Article.hotness_score
+        ).join(
+            Article, Article.id == DigestItem.article_id
+        ).filter(
+            DigestItem.user_id.in_(user_ids),
+            DigestItem.matched_at <= now
+        ).all()
+
+        items = defaultdict(list)
+        for user_id, title, url, source, hotness in rows:
+            items[user_id].append((hotness or 0.0, title, url, source))
+
+        recipients = self.db.session.query(User.id, User.username, User.email).filter(
+            User.id.in_(user_ids),
+            User.is_active.is_(True),
+            User.email_notifications.is_(True)
+        ).all()
+
+        sent = 0
+        for user_id, username, email in recipients:
+            articles = sorted(items.get(user_id, ()), reverse=True)
+            if not articles:
+                continue
+            message = self.render(frequency, username, email, articles, now)
+            self.outbox.deliver(message, f'{now:%Y%m%dT%H%M%S}-{frequency}-user{user_id}')
+            sent += 1
+
+        # Delivered (or no longer wanted) either way
+        self.db.session.query(DigestItem).filter(
+            DigestItem.user_id.in_(user_ids),
+            DigestItem.matched_at <= now
+        ).delete(synchronize_session=False)
+        self.db.session.commit()
+        return sent
+
+    def render(self, frequency, username, email, articles, now):
+        total = len(articles)
+        lines = [f'Hi {username},', '', 'Top stories matching your preferences:', '']
+        for _, title, url, source in articles[:self.max_articles]:
+            lines.append(f'- {title} ({source})')
+            lines.append(f'  {url}')
+        if total > self.max_articles:
+            lines.extend(['', f'...and {total - self.max_articles} more.'])
+
+        message = MIMEText('\n'.join(lines) + '\n', 'plain', UTF8)
+        message['From'] = self.sender
+        message['To'] = email
+        message['Date'] = format_datetime(now)
+        message['Subject'] = f"Your {frequency} AI news digest: {total} new article{'s' if total != 1 else ''}"
+        return message
@@ -0,0 +1,57 @@
+import zlib
+import logging
+from sqlalchemy import select
+
+logger = logging.getLogger(__name__)
+
+class ExportService:
+    """Stream articles as NDJSON without loading the result set into memory"""
+
+    def __init__(self, db, article_model, json_provider, body_store, chunk_size=1000):
+        self.db = db
+        self.Article = article_model
+        self.json = json_provider
+        self.body_store = body_store
+        self.chunk_size = chunk_size
+
+    def build_query(self, since=None, source=None, category=None):
+        """Select plain column rows (no ORM identity map) in id order"""
+        Article = self.Article
+        ArticleBody = self.body_store.ArticleBody
+        statement = select(
+            *Article.__table__.columns,
+            ArticleBody.codec, ArticleBody.dictionary_id, ArticleBody.data
+        ).outerjoin(ArticleBody, ArticleBody.article_id == Article.id).order_by(Article.id)
+
+        if since:
+            statement = statement.where(Article.scraped_at >= since)
+        if source:
+            statement = statement.where(Article.source.ilike(f'%{source}%'))
+        if category:
+            statement = statement.where(Article.category == category)
+
+        return statement.execution_options(stream_results=True, yield_per=self.chunk_size)
+
+    def iter_ndjson(self, statement):
+        """Yield one bytes chunk per fetched batch of rows"""
+        result = self.db.session.execute(statement)
+        try:
+            for rows in result.partitions():
+                yield b''.join(self.json.dumpb(self._record(row)) + b'\n' for row in rows)
+        finally:
+            result.close()
+
+    def _record(self, row):
+        record = dict(row._mapping)
+        codec, dictionary_id, data = record.pop('codec'), record.pop('dictionary_id'), record.pop('data')
+        record['content'] = self.body_store.decode(codec, dictionary_id, data) if data is not None else None
+        return record
+
+    def iter_gzip(self, chunks, level=6):
+        """Gzip a stream of chunks incrementally"""
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+        for chunk in chunks:
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+        yield compressor.flush()
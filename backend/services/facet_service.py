@@ -0,0 +1,140 @@
+import time
+import logging
+import threading
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+# Same bands as the frontend hotness labels
+HOTNESS_BUCKETS = [
+    ('very_hot', 0.8),
+    ('hot', 0.6),
+    ('warm', 0.4),
+    ('cool', 0.2),
+    ('new', 0.0),
+]
+
+DIMENSIONS = ('source', 'category', 'sentiment', 'hotness')
+
+def hotness_bucket(score):
+    for name, floor in HOTNESS_BUCKETS:
+        if (score or 0) >= floor:
+            return name
+    return 'new'
+
+class FacetService:
+    """Counts per source, category, sentiment and hotness band for the sidebar.
+
+    Unfiltered counts live in memory, are adjusted as articles are ingested and
+    reconciled against a SQL GROUP BY every FACET_REBUILD_SECONDS (which also
+    picks up rows written by other processes). Filtered counts always come from
+    GROUP BY queries.
+    """
+
+    def __init__(self, db, article_model, keyword_service, rebuild_seconds=60):
+        self.db = db
+        self.Article = article_model
+        self.keyword_service = keyword_service
+        self.rebuild_seconds = rebuild_seconds
+        self._counts = None
+        self._built_at = 0
+        self._lock = threading.Lock()
+
+    def add_articles(self, articles):
+        """Ingest listener: count newly stored articles"""
+        self._adjust(articles, 1)
+
+    def remove_articles(self, articles):
+        """Uncount articles that left the table"""
+        self._adjust(articles, -1)
+
+    def counts(self, filters=None):
+        """Facet counts for a filter set; each dimension ignores its own filter"""
+        filters = {key: value for key, value in (filters or {}).items() if value}
+        if not filters:
+            return self._unfiltered_counts()
+        return {
+            dimension: self._group_counts(dimension, filters)
+            for dimension in DIMENSIONS
+        }
+
+    def _adjust(self, articles, sign):
+        with self._lock:
+            if self._counts is None:
+                return
+            for article in articles:
+                for dimension in DIMENSIONS:
+                    value = self._value(article, dimension)
+                    self._counts[dimension][value] += sign
+                    if self._counts[dimension][value] <= 0:
+                        del self._counts[dimension][value]
+
+    def _value(self, article, dimension):
+        if dimension == 'hotness':
+            return hotness_bucket(article.hotness_score)
+        return getattr(article, dimension)
+
+    def _unfiltered_counts(self):
+        with self._lock:
+            fresh = self._counts is not None and time.monotonic() - self._built_at < self.rebuild_seconds
+            if fresh:
+                return {dimension: dict(counter) for dimension, counter in self._counts.items()}
+
+        counts = {
+            dimension: Counter(self._group_counts(dimension, {}))
+            for dimension in DIMENSIONS
+        }
+        with self._lock:
+            self._counts = counts
+            self._built_at = time.monotonic()
+            return {dimension: dict(counter) for dimension, counter in counts.items()}
+
+    def _column(self, dimension):
+        Article = self.Article
+        if dimension == 'hotness':
+            return self.db.case(
+                *[(Article.hotness_score >= floor, name) for name, floor in HOTNESS_BUCKETS[:-1]],
+                else_='new'
+            )
+        return getattr(Article, dimension)
+
+    def _group_counts(self, dimension, filters):
+        Article = self.Article
+        column = self._column(dimension).label('value')
+        query = self.db.session.query(column, self.db.func.count(Article.id))
+
+        if dimension != 'source' and filters.get('source'):
+            # Partial, case-insensitive match like /api/articles, so the counts agree with the list
+            query = query.filter(self.db.or_(*[Article.source.ilike(f'%{source}%') for source in filters['source']]))
+        if dimension != 'category' and filters.get('category'):
+            query = query.filter(Article.category.in_(filters['category']))
+        if dimension != 'sentiment' and filters.get('sentiment'):
+            query = query.filter(Article.sentiment.in_(filters['sentiment']))
+        if dimension != 'hotness' and filters.get('min_hotness'):
+            query = query.filter(Article.hotness_score >= filters['min_hotness'])
+        if filters.get('keywords'):
+            keyword_filter = self.keyword_service.has_keywords(filters['keywords'])
+            if keyword_filter is not None:
+                query = query.filter(keyword_filter)
+
+        return {value: count for value, count in query.group_by('value').all()}
+
+def split_param(value):
+    """Comma-separated query parameter to a list"""
+    return [item.strip() for item in value.split(',') if item.strip()] if value else []
+
+def format_facets(counts):
+    """Turn raw counts into sorted lists for the API"""
+    facets = {}
+    for dimension, values in counts.items():
+        if dimension == 'hotness':
+            facets[dimension] = [
+                {'value': name, 'min': floor, 'count': values.get(name, 0)}
+                for name, floor in HOTNESS_BUCKETS
+            ]
+        else:
+            facets[dimension] = sorted(
+                ({'value': value, 'count': count} for value, count in values.items()),
+                key=lambda item: (-item['count'], str(item['value']))
+            )
+    return facets
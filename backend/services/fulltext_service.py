@@ -0,0 +1,363 @@
+import re
+import time
+import logging
+import threading
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+
+import requests
+from requests.adapters import HTTPAdapter
+from services.metrics_service import FULLTEXT_FETCH_SECONDS, FULLTEXT_PAGES
+
+logger = logging.getLogger(__name__)
+
+# Boilerplate dropped before scoring: never part of an article's text
+BOILERPLATE_TAGS = (
+    'script', 'style', 'noscript', 'iframe', 'form', 'nav', 'header', 'footer', 'aside', 'svg', 'button', 'select'
+)
+POSITIVE_RE = re.compile(r'article|content|entry|post|story|body|text|main', re.I)
+NEGATIVE_RE = re.compile(
+    r'comment|footer|sidebar|nav|menu|share|social|related|promo|advert|sponsor|cookie|newsletter|subscribe|widget',
+    re.I
+)
+TEXT_TAGS = ('p', 'h2', 'h3', 'pre', 'blockquote')
+WHITESPACE_RE = re.compile(r'\s+')
+CHARSET_RE = re.compile(rb'charset=["\']?([\w.:-]+)', re.I)
+XML_DECLARATION_RE = re.compile(r'^\s*<\?xml[^>]*>')
+
+def _class_weight(node):
+    weight = 25 if node.tag in ('article', 'main') else 0
+    for name in (node.get('class'), node.get('id')):
+        if name:
+            if NEGATIVE_RE.search(name):
+                weight -= 25
+            if POSITIVE_RE.search(name):
+                weight += 25
+    return weight
+
+def _link_density(node, text_length):
+    link_length = sum(len(link.text_content()) for link in node.iter('a'))
+    return link_length / text_length if text_length else 1.0
+
+def decode_html(data, encoding=None):
+    """Page bytes as text: the charset from the headers, else from a meta tag, else UTF-8"""
+    if not encoding:
+        match = CHARSET_RE.search(data[:4096])
+        encoding = match.group(1).decode('ascii') if match else 'utf-8'
+    try:
+        text = data.decode(encoding, errors='replace')
+    except LookupError:
+        text = data.decode('utf-8', errors='replace')
+    # lxml refuses str input that still declares an encoding
+    return XML_DECLARATION_RE.sub('', text, count=1)
+
+def extract_article_text(html):
+    """Main text of an HTML page, readability-style, as paragraphs separated by blank lines.
+
+    Paragraphs vote for their parent (and, at half weight, their grandparent)
+    by length and comma count; the container with the best score after class
+    hints and link density wins.
+    """
+    from lxml import etree, html as lxml_html
+
+    if isinstance(html, bytes):
+        html = decode_html(html)
+    try:
+        document = lxml_html.document_fromstring(html)
+    except (etree.ParserError, ValueError):
+        return ''
+    etree.strip_elements(document, *BOILERPLATE_TAGS, with_tail=False)
+
+    scores = {}
+    for paragraph in document.iter('p'):
+        text = paragraph.text_content().strip()
+        if len(text) < 25:
+            continue
+        points = 1 + text.count(',') + min(len(text) // 100, 3)
+        parent = paragraph.getparent()
+        for node, share in ((parent, 1.0), (parent.getparent() if parent is not None else None, 0.5)):
+            if node is None:
+                continue
+            if node not in scores:
+                scores[node] = _class_weight(node)
+            scores[node] += points * share
+    if not scores:
+        return ''
+
+    def final_score(node):
+        return scores[node] * (1 - _link_density(node, len(node.text_content())))
+
+    best = max(scores, key=final_score)
+    paragraphs = []
+    for element in best.iter(*TEXT_TAGS):
+        text = WHITESPACE_RE.sub(' ', element.text_content()).strip()
+        if text:
+            paragraphs.append(text)
+    return '\n\n'.join(paragraphs)
+
+class FullTextService:
+    """Fetch linked article pages after ingest and keep their text as the article body.
+
+    Feeds often carry only a snippet. New articles are queued per domain and
+    fetched by FULLTEXT_WORKERS threads over pooled keep-alive sessions, at
+    most FULLTEXT_PER_DOMAIN at a time per site and honouring robots.txt
+    (cached, including Crawl-delay). Pages are capped at FULLTEXT_MAX_BYTES,
+    and ETag / Last-Modified are remembered so refetches can answer 304. The
+    text replaces the stored body when it is longer, and the summary is
+    regenerated from it. Ingest never waits for any of this.
+    """
+
+    def __init__(self, app, db, article_model, body_store, writer, ai_service=None):
+        config = app.config
+        self.db = db
+        self.Article = article_model
+        self.body_store = body_store
+        self.writer = writer
+        self.ai_service = ai_service if config.get('FULLTEXT_SUMMARIZE', True) else None
+        self.enabled = config.get('FULLTEXT_ENABLED', False)
+        self.workers = config.get('FULLTEXT_WORKERS', 8)
+        self.per_domain = config.get('FULLTEXT_PER_DOMAIN', 2)
+        self.timeout = config.get('FULLTEXT_TIMEOUT', 10)
+        self.max_bytes = config.get('FULLTEXT_MAX_BYTES', 2 * 1024 * 1024)
+        self.min_chars = config.get('FULLTEXT_MIN_CHARS', 500)
+        self.robots_ttl = config.get('FULLTEXT_ROBOTS_TTL_HOURS', 24) * 3600
+        self.cache_size = config.get('FULLTEXT_CACHE_SIZE', 10000)
+        self.user_agent = config.get('FULLTEXT_USER_AGENT', 'AINewsHubBot/1.0')
+
+        self.session = requests.Session()
+        # One keep-alive pool per host, sized for the per-domain limit
+        adapter = HTTPAdapter(pool_connections=max(self.workers, 10), pool_maxsize=self.per_domain)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({
+            'User-Agent': self.user_agent,
+            'Accept': 'text/html,application/xhtml+xml;q=0.9,*/*;q=0.5',
+            'Accept-Encoding': 'gzip, deflate',
+        })
+
+        self._executor = None
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._queues = defaultdict(deque)  # domain -> (article_id, url, title) waiting
+        self._active = defaultdict(int)  # domain -> requests in flight
+        self._last_request = {}  # domain -> monotonic time, for Crawl-delay
+        self._robots = {}  # domain -> (RobotFileParser, fetched_at)
+        self._validators = OrderedDict()  # url -> (etag, last_modified), LRU
+        self.outcomes = defaultdict(int)
+        self.listeners = []
+
+    def add_listener(self, callback):
+        """Register a callback invoked with the Article rows whose body and summary were just replaced"""
+        self.listeners.append(callback)
+
+    # Queueing
+
+    def enqueue_articles(self, articles):
+        """Ingest listener: queue new articles for a full-text fetch and return at once"""
+        if not self.enabled:
+            return 0
+        return self.enqueue([(article.id, article.url, article.title) for article in articles])
+
+    def enqueue(self, items):
+        """Queue (article_id, url, title) tuples; returns how many were queued"""
+        count = 0
+        with self._lock:
+            for item in items:
+                domain = urlsplit(item[1]).netloc.lower()
+                if not domain:
+                    continue
+                self._queues[domain].append(item)
+                count += 1
+            self._dispatch()
+        return count
+
+    def pending(self):
+        with self._lock:
+            return sum(len(queue) for queue in self._queues.values()) + sum(self._active.values())
+
+    def wait(self, timeout=None):
+        """Block until every queued page is fetched and stored; False on timeout"""
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        with self._idle:
+            while self._queues or self._active:
+                remaining = deadline - time.monotonic() if deadline is not None else None
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+        # The writer runs tasks in order, so this returns after the last store
+        self.writer.run(lambda: None)
+        return True
+
+    def _dispatch(self):
+        # Called with the lock held: start queued pages on domains below their limit
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='fulltext')
+        for domain in list(self._queues):
+            queue = self._queues[domain]
+            while queue and self._active[domain] < self.per_domain:
+                self._active[domain] += 1
+                self._executor.submit(self._run, domain, queue.popleft())
+            if not queue:
+                del self._queues[domain]
+
+    def _run(self, domain, item):
+        try:
+            self.process(domain, *item)
+        except Exception as e:
+            logger.error(f"Full-text fetch of {item[1]} failed: {e}")
+        finally:
+            with self._lock:
+                self._active[domain] -= 1
+                if not self._active[domain]:
+                    del self._active[domain]
+                self._dispatch()
+                self._idle.notify_all()
+
+    # Fetching
+
+    def process(self, domain, article_id, url, title):
+        """Fetch, extract and store one page; returns the outcome"""
+        started = time.perf_counter()
+        outcome, text = self.fetch(domain, url)
+        if outcome == 'ok':
+            if len(text) < self.min_chars:
+                outcome = 'too_short'
+            else:
+                summary = self.ai_service.summarize_article(title, text) if self.ai_service else None
+                # Store on the writer thread without waiting for it
+                future = self.writer.submit(self.store, article_id, text, summary)
+                future.add_done_callback(self._log_store_error)
+                outcome = 'extracted'
+        FULLTEXT_FETCH_SECONDS.observe(time.perf_counter() - started, outcome)
+        FULLTEXT_PAGES.inc(outcome)
+        with self._lock:
+            self.outcomes[outcome] += 1
+        return outcome
+
+    def fetch(self, domain, url):
+        """(outcome, text) for one page"""
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https'):
+            return 'error', None
+        if not self._allowed(parts, url):
+            return 'robots', None
+
+        headers = {}
+        with self._lock:
+            etag, modified = self._validators.get(url, (None, None))
+        if etag:
+            headers['If-None-Match'] = etag
+        if modified:
+            headers['If-Modified-Since'] = modified
+
+        self._respect_crawl_delay(domain)
+        try:
+            with self.session.get(url, headers=headers, timeout=self.timeout, stream=True) as response:
+                if response.status_code == 304:
+                    return 'not_modified', None
+                if response.status_code >= 400:
+                    return 'error', None
+                if 'html' not in response.headers.get('Content-Type', 'text/html'):
+                    return 'not_html', None
+                if int(response.headers.get('Content-Length') or 0) > self.max_bytes:
+                    return 'too_large', None
+
+                chunks = []
+                size = 0
+                for chunk in response.iter_content(64 * 1024):
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        return 'too_large', None
+                    chunks.append(chunk)
+                self._remember(url, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+                # Only a charset the server stated; requests otherwise assumes ISO-8859-1 for text/*
+                response_encoding = response.encoding if 'charset' in response.headers.get('Content-Type', '') else None
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"Full-text request for {url} failed: {e}")
+            return 'error', None
+
+        return 'ok', extract_article_text(decode_html(b''.join(chunks), response_encoding))
+
+    def _remember(self, url, etag, modified):
+        if not etag and not modified:
+            return
+        with self._lock:
+            self._validators[url] = (etag, modified)
+            self._validators.move_to_end(url)
+            while len(self._validators) > self.cache_size:
+                self._validators.popitem(last=False)
+
+    def _allowed(self, parts, url):
+        domain = parts.netloc.lower()
+        with self._lock:
+            cached = self._robots.get(domain)
+        if cached is None or time.monotonic() - cached[1] > self.robots_ttl:
+            robots = RobotFileParser()
+            try:
+                response = self.session.get(f'{parts.scheme}://{parts.netloc}/robots.txt', timeout=self.timeout)
+                if response.status_code in (401, 403):
+                    robots.disallow_all = True
+                elif response.status_code >= 400:
+                    robots.allow_all = True
+                else:
+                    robots.parse(response.text.splitlines())
+            except requests.exceptions.RequestException:
+                robots.allow_all = True  # unreachable robots.txt; the page request will tell
+            cached = (robots, time.monotonic())
+            with self._lock:
+                self._robots[domain] = cached
+        return cached[0].can_fetch(self.user_agent, url)
+
+    def _respect_crawl_delay(self, domain):
+        with self._lock:
+            robots = self._robots.get(domain, (None,))[0]
+        delay = robots.crawl_delay(self.user_agent) if robots is not None else None
+        if not delay:
+            return
+        while True:
+            with self._lock:
+                wait = self._last_request.get(domain, 0) + float(delay) - time.monotonic()
+                if wait <= 0:
+                    self._last_request[domain] = time.monotonic()
+                    return
+            time.sleep(wait)
+
+    # Storing
+
+    def store(self, article_id, content, summary=None):
+        """Replace an article's body (and summary) when the fetched text is longer; on the writer thread"""
+        if self.db.session.get(self.Article, article_id) is None:
+            return False  # archived or deleted meanwhile
+        body = self.db.session.get(self.body_store.ArticleBody, article_id)
+        if body is not None and (body.size or 0) >= len(content.encode('utf-8')):
+            return False
+
+        self.body_store.store(article_id, content, replace=True)
+        if summary:
+            self.Article.query.filter_by(id=article_id).update({'summary': summary}, synchronize_session=False)
+        self.db.session.commit()
+
+        article = self.db.session.get(self.Article, article_id)
+        for callback in self.listeners:
+            try:
+                callback([article])
+            except Exception as e:
+                self.db.session.rollback()
+                logger.error(f"Full-text listener {getattr(callback, '__name__', callback)} failed: {e}")
+        return True
+
+    def _log_store_error(self, future):
+        if future.exception() is not None:
+            logger.error(f"Error storing full text: {future.exception()}")
+
+    def missing(self, limit=500):
+        """(id, url, title) of the newest articles without a full-length body"""
+        Article, ArticleBody = self.Article, self.body_store.ArticleBody
+        rows = self.db.session.query(Article.id, Article.url, Article.title).outerjoin(
+            ArticleBody, ArticleBody.article_id == Article.id
+        ).filter(
+            self.db.or_(ArticleBody.article_id.is_(None), ArticleBody.size < self.min_chars)
+        ).order_by(Article.published_at.desc()).limit(limit)
+        return [tuple(row) for row in rows]
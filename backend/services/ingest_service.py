@@ -0,0 +1,113 @@
+import logging
+from services.metrics_service import SCRAPE_ARTICLES, INGEST_STORE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+class IngestService:
+    """Fetch, enrich and store articles from a scraper"""
+
+    def __init__(self, db, article_model, ai_service, ranking_service, writer=None, body_store=None, archive=None):
+        self.db = db
+        self.Article = article_model
+        self.ai_service = ai_service
+        self.ranking_service = ranking_service
+        self.writer = writer
+        self.body_store = body_store
+        self.archive = archive
+        self.listeners = []
+
+    def add_listener(self, callback):
+        """Register a callback invoked with the new Article rows after each commit"""
+        self.listeners.append(callback)
+
+    def ingest_source(self, scraper, max_articles=20):
+        """Scrape one source and save the articles that are not stored yet"""
+        result = {'fetched': 0, 'new': 0, 'duplicates': 0}
+
+        articles = scraper.scrape_articles(max_articles=max_articles)
+        result['fetched'] = len(articles)
+
+        # Process articles with AI
+        processed_articles = self.ai_service.batch_process_articles(articles)
+
+        # Save to database on the writer thread
+        with INGEST_STORE_SECONDS.time(scraper.name):
+            if self.writer is not None:
+                new_count = self.writer.run(self.store_articles, processed_articles)
+            else:
+                new_count = self.store_articles(processed_articles)
+
+        result['new'] = new_count
+        result['duplicates'] = len(processed_articles) - new_count
+        SCRAPE_ARTICLES.inc(scraper.name, 'fetched', amount=result['fetched'])
+        SCRAPE_ARTICLES.inc(scraper.name, 'new', amount=result['new'])
+        SCRAPE_ARTICLES.inc(scraper.name, 'duplicate', amount=result['duplicates'])
+        return result
+
+    def store_articles(self, processed_articles):
+        """Insert articles whose URL is not stored yet and notify listeners"""
+        session = self.db.session()
+        new_articles = []
+        bodies = []
+
+        # One lookup per batch of URLs instead of one per article
+        seen_urls = self.known_urls([article_data['url'] for article_data in processed_articles])
+
+        for article_data in processed_articles:
+            if article_data['url'] in seen_urls:
+                continue
+            seen_urls.add(article_data['url'])
+
+            fields = dict(article_data)
+            content = fields.pop('content', None)
+            article = self.Article(**fields)
+
+            # Calculate hotness score
+            article.hotness_score = self.ranking_service.calculate_hotness_score(
+                article_data
+            )
+
+            session.add(article)
+            new_articles.append(article)
+            bodies.append((article, content))
+
+        # Bodies live compressed in their own table, keyed by the new ids
+        if self.body_store is not None and bodies:
+            session.flush()
+            for article, content in bodies:
+                self.body_store.store(article.id, content)
+
+        # Listeners read the new rows right after commit and may commit themselves;
+        # keep the rows loaded until they are done instead of reloading each one
+        expire_on_commit = session.expire_on_commit
+        session.expire_on_commit = False
+        try:
+            session.commit()
+            if new_articles:
+                self._notify(new_articles)
+        finally:
+            session.expire_on_commit = expire_on_commit
+
+        return len(new_articles)
+
+    def known_urls(self, urls, chunk_size=500):
+        """The subset of urls already stored or archived"""
+        urls = list(set(urls))
+        known = set()
+        for start in range(0, len(urls), chunk_size):
+            chunk = urls[start:start + chunk_size]
+            known.update(url for url, in self.db.session.query(self.Article.url).filter(self.Article.url.in_(chunk)))
+            # Archived articles stay duplicates so they are not scraped again
+            if self.archive is not None:
+                known.update(self.archive.known_urls(chunk))
+        return known
+
+    def _notify(self, articles):
+        """Hand freshly committed articles to the registered listeners"""
+        for callback in self.listeners:
+            try:
+                callback(articles)
+            except Exception as e:
+                # A failed flush leaves the shared session unusable for the listeners after it
+                self.db.session.rollback()
+                logger.error(f"Ingest listener {getattr(callback, '__name__', callback)} failed: {e}")
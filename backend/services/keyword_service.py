@@ -0,0 +1,162 @@
+import json
+import logging
+from sqlalchemy import select, func
+from sqlalchemy.exc import IntegrityError
+
+logger = logging.getLogger(__name__)
+
+MAX_KEYWORD_LENGTH = 100
+
+class KeywordService:
+    """Maintain the normalized keyword/article_keyword tables and query them"""
+
+    def __init__(self, db, article_model, keyword_model, article_keyword_model):
+        self.db = db
+        self.Article = article_model
+        self.Keyword = keyword_model
+        self.ArticleKeyword = article_keyword_model
+
+    @staticmethod
+    def normalize(name):
+        return ' '.join(str(name).lower().split())[:MAX_KEYWORD_LENGTH]
+
+    @classmethod
+    def parse_keywords(cls, *json_values):
+        """Collect normalized, de-duplicated keywords from JSON array columns"""
+        keywords = []
+        seen = set()
+        for value in json_values:
+            try:
+                items = json.loads(value) if value else []
+            except (TypeError, ValueError):
+                continue
+            if not isinstance(items, list):
+                continue
+            for item in items:
+                name = cls.normalize(item) if item else ''
+                if name and name not in seen:
+                    seen.add(name)
+                    keywords.append(name)
+        return keywords
+
+    def keyword_ids(self, names, create=False):
+        """Map keyword names to ids, inserting missing ones when create is set"""
+        if not names:
+            return {}
+
+        Keyword = self.Keyword
+        rows = self.db.session.query(Keyword.name, Keyword.id).filter(Keyword.name.in_(names)).all()
+        ids = dict(rows)
+
+        missing = [name for name in names if name not in ids]
+        if missing and create:
+            try:
+                with self.db.session.begin_nested():
+                    self.db.session.add_all([Keyword(name=name) for name in missing])
+            except IntegrityError:
+                # Another process inserted some of them first, and the savepoint rolled back
+                # ours too; insert the rest one at a time
+                for name in missing:
+                    try:
+                        with self.db.session.begin_nested():
+                            self.db.session.add(Keyword(name=name))
+                    except IntegrityError:
+                        pass
+            rows = self.db.session.query(Keyword.name, Keyword.id).filter(Keyword.name.in_(missing)).all()
+            ids.update(rows)
+
+        return ids
+
+    def index_articles(self, articles):
+        """Ingest listener: write keyword rows for newly stored articles"""
+        links = []
+        per_article = []
+        names = set()
+
+        for article in articles:
+            keywords = self.parse_keywords(article.keywords)
+            tags = [name for name in self.parse_keywords(article.tags) if name not in keywords]
+            per_article.append((article, keywords, tags))
+            names.update(keywords, tags)
+
+        ids = self.keyword_ids(sorted(names), create=True)
+        for article, keywords, tags in per_article:
+            for group, in_keywords in ((keywords, True), (tags, False)):
+                for name in group:
+                    links.append({
+                        'article_id': article.id,
+                        'keyword_id': ids[name],
+                        'published_at': article.published_at,
+                        'in_keywords': in_keywords
+                    })
+
+        if links:
+            self.db.session.execute(self.ArticleKeyword.__table__.insert(), links)
+        self.db.session.commit()
+        return len(links)
+
+    def has_keywords(self, names, match_all=True):
+        """SQL condition on Article.id answered from the keyword index"""
+        ArticleKeyword, Keyword = self.ArticleKeyword, self.Keyword
+        conditions = []
+
+        for name in {self.normalize(name) for name in names if name and name.strip()}:
+            conditions.append(self.Article.id.in_(
+                select(ArticleKeyword.article_id)
+                .join(Keyword, Keyword.id == ArticleKeyword.keyword_id)
+                .where(Keyword.name == name)
+            ))
+
+        if not conditions:
+            return None
+        return self.db.and_(*conditions) if match_all else self.db.or_(*conditions)
+
+    def mentions(self, text):
+        """SQL condition on Article.id: one of the article's keywords (not tags) contains text"""
+        text = self.normalize(text)
+        if not text:
+            return None
+        return self.Article.id.in_(
+            select(self.ArticleKeyword.article_id)
+            .join(self.Keyword, self.Keyword.id == self.ArticleKeyword.keyword_id)
+            .where(self.Keyword.name.contains(text, autoescape=True), self.ArticleKeyword.in_keywords)
+        )
+
+    def trending(self, since, limit=20, top_articles=50):
+        """Most frequent keywords (not tags) among the hottest articles scraped since a date"""
+        Article, ArticleKeyword, Keyword = self.Article, self.ArticleKeyword, self.Keyword
+
+        top = select(Article.id).where(
+            Article.scraped_at >= since
+        ).order_by(Article.hotness_score.desc()).limit(top_articles)
+
+        count = func.count(ArticleKeyword.article_id).label('count')
+        rows = self.db.session.query(Keyword.name, count).join(
+            ArticleKeyword, ArticleKeyword.keyword_id == Keyword.id
+        ).filter(
+            ArticleKeyword.article_id.in_(top),
+            ArticleKeyword.in_keywords
+        ).group_by(Keyword.name).order_by(count.desc(), Keyword.name).limit(limit).all()
+
+        return [{'keyword': name, 'count': count} for name, count in rows]
+
+    def backfill(self, batch_size=500):
+        """Index articles that have no keyword rows yet; returns how many were indexed"""
+        Article, ArticleKeyword = self.Article, self.ArticleKeyword
+        indexed = 0
+        last_id = 0
+
+        while True:
+            articles = Article.query.filter(
+                Article.id > last_id,
+                ~Article.id.in_(select(ArticleKeyword.article_id))
+            ).order_by(Article.id).limit(batch_size).all()
+            if not articles:
+                break
+
+            last_id = articles[-1].id
+            self.index_articles(articles)
+            indexed += len(articles)
+            logger.info(f"Indexed keywords for {indexed} articles")
+
+        return indexed
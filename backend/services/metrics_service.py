@@ -0,0 +1,348 @@
+import os
+import json
+import time
+import atexit
+import bisect
+import logging
+import tempfile
+import threading
+import weakref
+from flask import g, request, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+class Registry:
+    """Counters and histograms in Prometheus text format, cheap enough for hot paths.
+
+    Each thread writes to its own dict, so recording takes no lock; shards are
+    summed when /metrics is scraped. With METRICS_DIR set, every process also
+    writes its totals to a file there and /metrics adds up all the files, so
+    gunicorn workers report as one.
+    """
+
+    def __init__(self):
+        self.families = {}
+        self.directory = None
+        self.flush_seconds = 10
+
+        self._shards = []
+        self._retired = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._flusher_pid = None
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._reset)
+
+    def configure(self, app):
+        directory = app.config.get('METRICS_DIR')
+        self.flush_seconds = app.config.get('METRICS_FLUSH_SECONDS', 10)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self.directory = directory
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(self, name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._register(Histogram(self, name, documentation, labelnames, buckets))
+
+    def _register(self, family):
+        self.families[family.name] = family
+        return family
+
+    # Per-thread shards
+
+    def _shard(self):
+        try:
+            return self._local.values
+        except AttributeError:
+            pass
+        values = {}
+        with self._lock:
+            self._shards.append((weakref.ref(threading.current_thread()), values))
+            if self.directory and self._flusher_pid != os.getpid():
+                self._start_flusher()
+        self._local.values = values
+        return values
+
+    def _reset(self):
+        # A forked worker starts from zero; the parent reports its own values
+        self._shards = []
+        self._retired = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._flusher_pid = None
+
+    def snapshot(self):
+        """This process's values as {(name, labels): value}"""
+        with self._lock:
+            live = []
+            for thread_ref, values in self._shards:
+                thread = thread_ref()
+                if thread is None or not thread.is_alive():
+                    # Dead threads no longer write, so their values can be folded in safely
+                    self._merge(self._retired, values)
+                else:
+                    live.append((thread_ref, values))
+            self._shards = live
+            total = {}
+            self._merge(total, self._retired)
+            for _, values in live:
+                self._merge(total, dict(values))
+        return total
+
+    def _merge(self, total, values):
+        for key, value in values.items():
+            current = total.get(key)
+            if current is None:
+                total[key] = list(value) if isinstance(value, list) else value
+            elif isinstance(value, list):
+                for i, item in enumerate(value):
+                    current[i] += item
+            else:
+                total[key] = current + value
+
+    # Sharing between processes
+
+    def _path(self, pid):
+        return os.path.join(self.directory, f'metrics-{pid}.json')
+
+    def _start_flusher(self):
+        self._flusher_pid = os.getpid()
+        threading.Thread(target=self._flush_loop, name='metrics-flush', daemon=True).start()
+        atexit.register(self.flush)
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_seconds)
+            self.flush()
+
+    def flush(self):
+        """Write this process's totals to METRICS_DIR"""
+        if not self.directory:
+            return
+        rows = [[name, list(labels), value] for (name, labels), value in self.snapshot().items()]
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'w') as handle:
+                json.dump(rows, handle)
+            os.replace(tmp_path, self._path(os.getpid()))
+        except OSError as e:
+            logger.error(f"Error writing metrics to {self.directory}: {e}")
+
+    def collect(self):
+        """Values of every process: this one live, the others from their last flush"""
+        total = self.snapshot()
+        if not self.directory:
+            return total
+
+        own = os.path.basename(self._path(os.getpid()))
+        for filename in os.listdir(self.directory):
+            if not filename.startswith('metrics-') or not filename.endswith('.json') or filename == own:
+                continue
+            try:
+                with open(os.path.join(self.directory, filename)) as handle:
+                    rows = json.load(handle)
+            except (OSError, ValueError):
+                continue
+            self._merge(total, {(name, tuple(labels)): value for name, labels, value in rows})
+        return total
+
+    def render(self):
+        """Prometheus text exposition format"""
+        values = self.collect()
+        by_family = {}
+        for (name, labels), value in values.items():
+            by_family.setdefault(name, []).append((labels, value))
+
+        lines = []
+        for name, family in self.families.items():
+            lines.append(f'# HELP {name} {family.documentation}')
+            lines.append(f'# TYPE {name} {family.kind}')
+            for labels, value in sorted(by_family.get(name, ())):
+                lines.extend(family.samples(labels, value))
+        return '\n'.join(lines) + '\n'
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, registry, name, documentation, labelnames):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def inc(self, *labelvalues, amount=1):
+        shard = self.registry._shard()
+        key = (self.name, labelvalues)
+        shard[key] = shard.get(key, 0) + amount
+
+    def samples(self, labels, value):
+        return [f'{self.name}{_labels(self.labelnames, labels)} {_number(value)}']
+
+class Histogram:
+    """Stored per label set as [count per bucket..., sum, count]"""
+    kind = 'histogram'
+
+    def __init__(self, registry, name, documentation, labelnames, buckets):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *labelvalues):
+        shard = self.registry._shard()
+        key = (self.name, labelvalues)
+        slots = shard.get(key)
+        if slots is None:
+            slots = shard[key] = [0] * (len(self.buckets) + 2)
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            slots[index] += 1
+        slots[-2] += value
+        slots[-1] += 1
+
+    def time(self, *labelvalues):
+        return _Timer(self, labelvalues)
+
+    def samples(self, labels, value):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float('inf'),), value[:-2] + [None]):
+            cumulative = value[-1] if count is None else cumulative + count
+            le = f'le="{_number(float(bound))}"'
+            lines.append(f'{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}')
+        lines.append(f'{self.name}_sum{_labels(self.labelnames, labels)} {_number(float(value[-2]))}')
+        lines.append(f'{self.name}_count{_labels(self.labelnames, labels)} {value[-1]}')
+        return lines
+
+class _Timer:
+    __slots__ = ('histogram', 'labelvalues', 'start')
+
+    def __init__(self, histogram, labelvalues):
+        self.histogram = histogram
+        self.labelvalues = labelvalues
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, *self.labelvalues)
+
+registry = Registry()
+
+HTTP_REQUEST_SECONDS = registry.histogram(
+    'http_request_duration_seconds', 'Time to build an API response', ('method', 'route', 'status')
+)
+HTTP_REQUEST_DB_QUERIES = registry.histogram(
+    'http_request_db_queries', 'Database queries issued while handling one request', ('route',), COUNT_BUCKETS
+)
+HTTP_REQUEST_DB_SECONDS = registry.histogram(
+    'http_request_db_seconds', 'Time spent in database queries while handling one request', ('route',)
+)
+DB_QUERIES = registry.counter('db_queries_total', 'Database queries executed, requests and background work')
+DB_QUERY_SECONDS = registry.counter('db_query_seconds_total', 'Time spent executing database queries')
+SCRAPE_FETCH_SECONDS = registry.histogram(
+    'scrape_fetch_seconds', 'Time to download and parse a source feed', ('source',)
+)
+SCRAPE_PARSE_SECONDS = registry.histogram(
+    'scrape_parse_seconds', 'Time to turn feed entries into articles', ('source',)
+)
+SCRAPE_ENTRIES = registry.counter('scrape_entries_total', 'Feed entries seen per source', ('source',))
+SCRAPE_ARTICLES = registry.counter(
+    'scrape_articles_total', 'Articles per source by outcome (fetched, new, duplicate)', ('source', 'outcome')
+)
+SCRAPE_ERRORS = registry.counter('scrape_errors_total', 'Failed feed fetches per source', ('source',))
+SCRAPE_NOT_MODIFIED = registry.counter(
+    'scrape_not_modified_total', 'Feed fetches answered 304 Not Modified per source', ('source',)
+)
+INGEST_STORE_SECONDS = registry.histogram(
+    'ingest_store_seconds', 'Time to store a batch of scraped articles, including the wait for the writer',
+    ('source',)
+)
+FULLTEXT_FETCH_SECONDS = registry.histogram(
+    'fulltext_fetch_seconds', 'Time to download and extract an article page', ('outcome',)
+)
+FULLTEXT_PAGES = registry.counter(
+    'fulltext_pages_total', 'Article pages by outcome (extracted, too_short, not_modified, robots, too_large, error, ...)',
+    ('outcome',)
+)
+THUMBNAIL_FETCH_SECONDS = registry.histogram(
+    'thumbnail_fetch_seconds', 'Time to download an article image and render its thumbnails', ('outcome',)
+)
+THUMBNAIL_EVICTIONS = registry.counter('thumbnail_evictions_total', 'Thumbnail files removed to stay under the cache size')
+SNAPSHOT_BUILD_SECONDS = registry.histogram('snapshot_build_seconds', 'Time to pre-render the home-feed snapshot')
+AI_REQUEST_SECONDS = registry.histogram('ai_request_seconds', 'Latency of AI API calls', ('operation',))
+AI_REQUESTS = registry.counter(
+    'ai_requests_total', 'AI operations by outcome (ok, error, fallback)', ('operation', 'outcome')
+)
+AI_TOKENS = registry.counter('ai_tokens_total', 'Tokens used by AI API calls', ('operation', 'kind'))
+NLP_ENRICHMENT_SECONDS = registry.histogram(
+    'nlp_enrichment_seconds', 'Enrichment time per article by step', ('step',)
+)
+CACHE_REQUESTS = registry.counter('cache_requests_total', 'Cache lookups by result (hit, miss)', ('cache', 'result'))
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['query_start'].pop()
+    DB_QUERIES.inc()
+    DB_QUERY_SECONDS.inc(amount=elapsed)
+    if has_request_context():
+        g.db_queries = g.get('db_queries', 0) + 1
+        g.db_seconds = g.get('db_seconds', 0.0) + elapsed
+
+@event.listens_for(Engine, 'handle_error')
+def _handle_error(context):
+    if context.connection is not None and context.connection.info.get('query_start'):
+        context.connection.info['query_start'].pop()
+
+class RequestMetrics:
+    """Record latency and database work of every request, labelled by route rule"""
+
+    def __init__(self, app):
+        registry.configure(app)
+        if app.config.get('METRICS_ENABLED', True):
+            app.before_request(self.before_request)
+            app.after_request(self.after_request)
+
+    def before_request(self):
+        g.request_started = time.perf_counter()
+
+    def after_request(self, response):
+        started = g.get('request_started')
+        if started is None:
+            return response
+
+        # The rule, not the path, so ids do not create a label set each
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - started, request.method, route, str(response.status_code)
+        )
+        HTTP_REQUEST_DB_QUERIES.observe(g.get('db_queries', 0), route)
+        HTTP_REQUEST_DB_SECONDS.observe(g.get('db_seconds', 0.0), route)
+        return response
@@ -0,0 +1,258 @@
+import json
+import time
+import heapq
+import logging
+import threading
+from collections import OrderedDict, defaultdict
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+def _json_list(value):
+    try:
+        items = json.loads(value) if value else []
+    except (TypeError, ValueError):
+        return []
+    return items if isinstance(items, list) else []
+
+class PreferenceMatcher:
+    """A user's preferences compiled into sets for O(1) membership checks"""
+
+    def __init__(self, preferences, normalize_keyword):
+        self.updated_at = preferences.updated_at
+        self.preferred_keywords = {normalize_keyword(k) for k in _json_list(preferences.preferred_keywords) if k}
+        self.blocked_keywords = {normalize_keyword(k) for k in _json_list(preferences.blocked_keywords) if k}
+        self.preferred_sources = {str(s).lower() for s in _json_list(preferences.preferred_sources) if s}
+        self.blocked_sources = {str(s).lower() for s in _json_list(preferences.blocked_sources) if s}
+        self.preferred_categories = {str(c) for c in _json_list(preferences.preferred_categories) if c}
+        # min_hotness_score is the notification threshold and does not filter the feed
+
+    def is_blocked(self, entry):
+        return entry.source in self.blocked_sources or bool(entry.keywords & self.blocked_keywords)
+
+    def score(self, entry, weights):
+        """Hotness plus boosts for preferred keywords, source and category"""
+        score = entry.hotness
+        score += weights['keyword'] * len(entry.keywords & self.preferred_keywords)
+        if entry.source in self.preferred_sources:
+            score += weights['source']
+        if entry.category in self.preferred_categories:
+            score += weights['category']
+        return score
+
+class CandidateEntry:
+    __slots__ = ('id', 'hotness', 'source', 'category', 'keywords', 'published_at')
+
+    def __init__(self, article_id, hotness, source, category, keywords, published_at):
+        self.id = article_id
+        self.hotness = hotness or 0.0
+        self.source = (source or '').lower()
+        self.category = category
+        self.keywords = frozenset(keywords)
+        self.published_at = published_at
+
+class CandidateIndex:
+    """Recent articles indexed by keyword, source and category"""
+
+    def __init__(self):
+        self.entries = {}
+        self.by_keyword = defaultdict(set)
+        self.by_source = defaultdict(set)
+        self.by_category = defaultdict(set)
+        self._hottest = None
+
+    def add(self, entry):
+        self.entries[entry.id] = entry
+        self._hottest = None
+        for keyword in entry.keywords:
+            self.by_keyword[keyword].add(entry.id)
+        self.by_source[entry.source].add(entry.id)
+        self.by_category[entry.category].add(entry.id)
+
+    def remove(self, article_id):
+        entry = self.entries.pop(article_id, None)
+        if entry is None:
+            return
+        self._hottest = None
+        for keyword in entry.keywords:
+            self.by_keyword[keyword].discard(article_id)
+        self.by_source[entry.source].discard(article_id)
+        self.by_category[entry.category].discard(article_id)
+
+    def hottest(self, limit):
+        """Ids of the hottest entries, recomputed only after the index changes"""
+        if self._hottest is None or len(self._hottest) < min(limit, len(self.entries)):
+            top = heapq.nlargest(limit, self.entries.values(), key=lambda entry: entry.hotness)
+            self._hottest = [entry.id for entry in top]
+        return self._hottest[:limit]
+
+class PersonalizationService:
+    """Rank recent articles for a user from precomputed candidate sets.
+
+    Per request the work is proportional to the user's own candidate set, so it
+    does not depend on how many users exist.
+    """
+
+    def __init__(self, app, db, article_model, preferences_model, keyword_service):
+        config = app.config
+        self.db = db
+        self.Article = article_model
+        self.UserPreferences = preferences_model
+        self.keyword_service = keyword_service
+        self.window = timedelta(days=config.get('FEED_CANDIDATE_WINDOW_DAYS', 7))
+        self.max_candidates = config.get('FEED_MAX_CANDIDATES', 20000)
+        self.baseline_size = config.get('FEED_BASELINE_SIZE', 200)
+        self.rebuild_seconds = config.get('FEED_INDEX_REBUILD_SECONDS', 300)
+        self.matcher_cache_size = config.get('FEED_MATCHER_CACHE_SIZE', 10000)
+        self.weights = {
+            'keyword': config.get('FEED_KEYWORD_BOOST', 0.2),
+            'source': config.get('FEED_SOURCE_BOOST', 0.15),
+            'category': config.get('FEED_CATEGORY_BOOST', 0.1),
+        }
+
+        self._index = None
+        self._built_at = 0
+        self._matchers = OrderedDict()
+        self._lock = threading.Lock()
+
+    # Preference matchers
+
+    def matcher_for(self, user_id):
+        """Compiled preferences for a user (None when the user has none).
+
+        The cached matcher is reused while the row's updated_at is unchanged, so
+        an update handled by another worker is picked up on the next request.
+        """
+        UserPreferences = self.UserPreferences
+        with self._lock:
+            matcher = self._matchers.get(user_id)
+        if matcher is not None:
+            updated_at = self.db.session.query(UserPreferences.updated_at).filter_by(user_id=user_id).scalar()
+            if updated_at is not None and updated_at == matcher.updated_at:
+                with self._lock:
+                    if user_id in self._matchers:
+                        self._matchers.move_to_end(user_id)
+                return matcher
+
+        preferences = UserPreferences.query.filter_by(user_id=user_id).first()
+        if preferences is None:
+            self.invalidate(user_id)
+            return None
+
+        matcher = PreferenceMatcher(preferences, self.keyword_service.normalize)
+        with self._lock:
+            self._matchers[user_id] = matcher
+            if len(self._matchers) > self.matcher_cache_size:
+                self._matchers.popitem(last=False)
+        return matcher
+
+    def invalidate(self, user_id):
+        """Drop a user's compiled preferences after they change in this process"""
+        with self._lock:
+            self._matchers.pop(user_id, None)
+
+    # Candidate index
+
+    def add_articles(self, articles):
+        """Ingest listener: index newly stored articles"""
+        with self._lock:
+            index = self._index
+        if index is None:
+            return
+
+        entries = [
+            CandidateEntry(
+                article.id,
+                article.hotness_score,
+                article.source,
+                article.category,
+                self.keyword_service.parse_keywords(article.keywords, article.tags),
+                article.published_at
+            )
+            for article in articles
+        ]
+        with self._lock:
+            for entry in entries:
+                index.add(entry)
+
+    def remove_articles(self, articles):
+        """Retention listener: forget archived articles"""
+        with self._lock:
+            if self._index is None:
+                return
+            for article in articles:
+                self._index.remove(article.id)
+
+    def index(self):
+        with self._lock:
+            if self._index is not None and time.monotonic() - self._built_at < self.rebuild_seconds:
+                return self._index
+
+        index = self._build_index()
+        with self._lock:
+            self._index = index
+            self._built_at = time.monotonic()
+        return index
+
+    def _build_index(self):
+        Article = self.Article
+        ArticleKeyword = self.keyword_service.ArticleKeyword
+        Keyword = self.keyword_service.Keyword
+        since = datetime.utcnow() - self.window
+
+        rows = self.db.session.query(
+            Article.id, Article.hotness_score, Article.source, Article.category, Article.published_at
+        ).filter(
+            Article.published_at >= since
+        ).order_by(Article.published_at.desc()).limit(self.max_candidates).all()
+
+        keywords = defaultdict(list)
+        keyword_rows = self.db.session.query(ArticleKeyword.article_id, Keyword.name).join(
+            Keyword, Keyword.id == ArticleKeyword.keyword_id
+        ).filter(ArticleKeyword.published_at >= since).all()
+        for article_id, name in keyword_rows:
+            keywords[article_id].append(name)
+
+        index = CandidateIndex()
+        for article_id, hotness, source, category, published_at in rows:
+            index.add(CandidateEntry(
+                article_id, hotness, source, category, keywords.get(article_id, ()), published_at
+            ))
+        return index
+
+    # Ranking
+
+    def rank(self, user_id, limit=20, offset=0, min_hotness=0.0):
+        """Top article ids with scores for a user, or None if the user has no preferences"""
+        matcher = self.matcher_for(user_id)
+        if matcher is None:
+            return None
+
+        index = self.index()
+
+        # Ingest listeners add to the index from the writer thread; only collect under the lock
+        with self._lock:
+            candidate_ids = set()
+            for keyword in matcher.preferred_keywords:
+                candidate_ids |= index.by_keyword.get(keyword, set())
+            for source in matcher.preferred_sources:
+                candidate_ids |= index.by_source.get(source, set())
+            for category in matcher.preferred_categories:
+                candidate_ids |= index.by_category.get(category, set())
+            # Always mix in the globally hottest so sparse preferences still fill a page
+            candidate_ids.update(index.hottest(self.baseline_size))
+            entries = [index.entries.get(article_id) for article_id in candidate_ids]
+
+        scored = []
+        for entry in entries:
+            if entry is None or entry.hotness < min_hotness or matcher.is_blocked(entry):
+                continue
+            scored.append((matcher.score(entry, self.weights), entry.published_at or datetime.min, entry.id))
+
+        top = heapq.nlargest(offset + limit + 1, scored)
+        page = top[offset:offset + limit]
+        return {
+            'items': [(article_id, score) for score, _, article_id in page],
+            'has_next': len(top) > offset + limit,
+            'candidates': len(scored)
+        }
@@ -0,0 +1,218 @@
+import io
+import os
+import re
+import time
+import pstats
+import cProfile
+import logging
+import threading
+from datetime import datetime
+from contextlib import contextmanager
+from flask import g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+WHITESPACE_RE = re.compile(r'\s+')
+STRING_RE = re.compile(r"'(?:[^']|'')*'")
+NUMBER_RE = re.compile(r'(?<![\w.])-?\d+(?:\.\d+)?\b')
+IN_LIST_RE = re.compile(r'\(\s*(?:\?|%\(\w+\)s|%s)(?:\s*,\s*(?:\?|%\(\w+\)s|%s))+\s*\)')
+SAFE_NAME_RE = re.compile(r'[^A-Za-z0-9_-]+')
+
+def statement_shape(statement):
+    """A statement with literals and IN lists collapsed, so repeats of one query compare equal"""
+    shape = WHITESPACE_RE.sub(' ', statement).strip()
+    shape = STRING_RE.sub('?', shape)
+    shape = NUMBER_RE.sub('?', shape)
+    return IN_LIST_RE.sub('(?, ...)', shape)
+
+class QueryLog:
+    """Statements run by one request or background task, grouped into shapes on demand"""
+
+    def __init__(self):
+        self.statements = {}
+        self.count = 0
+        self.seconds = 0.0
+
+    def record(self, statement, elapsed):
+        # Keyed by the raw statement; SQLAlchemy reuses the string, so this is a cheap lookup
+        entry = self.statements.get(statement)
+        if entry is None:
+            entry = self.statements[statement] = [0, 0.0]
+        entry[0] += 1
+        entry[1] += elapsed
+        self.count += 1
+        self.seconds += elapsed
+
+    def shapes(self):
+        """(shape, count, seconds) per statement shape, most frequent first"""
+        shapes = {}
+        for statement, (count, seconds) in self.statements.items():
+            entry = shapes.setdefault(statement_shape(statement), [0, 0.0])
+            entry[0] += count
+            entry[1] += seconds
+        return sorted(
+            ((shape, count, seconds) for shape, (count, seconds) in shapes.items()),
+            key=lambda item: (item[1], item[2]), reverse=True
+        )
+
+_local = threading.local()
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if getattr(_local, 'log', None) is not None:
+        conn.info.setdefault('profile_start', []).append(time.perf_counter())
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    log = getattr(_local, 'log', None)
+    if log is not None and conn.info.get('profile_start'):
+        log.record(statement, time.perf_counter() - conn.info['profile_start'].pop())
+
+@event.listens_for(Engine, 'handle_error')
+def _handle_error(context):
+    if context.connection is not None and context.connection.info.get('profile_start'):
+        context.connection.info['profile_start'].pop()
+
+class RequestProfiler:
+    """Query tracking for every request and background task, plus opt-in cProfile runs.
+
+    Each request's statements are grouped by shape. Shapes repeated at least
+    N_PLUS_ONE_THRESHOLD times are logged as a likely N+1, and requests slower
+    than SLOW_REQUEST_SECONDS are logged with their top query shapes.
+
+    With PROFILING_ENABLED (the default in development), a request sent with
+    ``X-Profile: 1`` or ``?_profile=1`` runs under cProfile and the profile is
+    saved to PROFILE_DIR; ``text`` instead of ``1`` returns the stats as the
+    response. If PROFILING_TOKEN is set, X-Profile-Token must match it.
+    """
+
+    def __init__(self, app):
+        config = app.config
+        self.app = app
+        self.tracking = config.get('QUERY_TRACKING_ENABLED', True)
+        self.profiling = config.get('PROFILING_ENABLED', False)
+        self.token = config.get('PROFILING_TOKEN')
+        self.directory = config.get('PROFILE_DIR')
+        self.slow_seconds = config.get('SLOW_REQUEST_SECONDS', 1.0)
+        self.repeat_threshold = config.get('N_PLUS_ONE_THRESHOLD', 10)
+        self.top_shapes = 5
+        # cProfile hooks the interpreter, so profile one request at a time
+        self._profile_lock = threading.Lock()
+
+        if self.tracking or self.profiling:
+            app.before_request(self.before_request)
+            app.after_request(self.after_request)
+            app.teardown_request(self.teardown_request)
+        app.extensions['profiler'] = self
+
+    # Query tracking
+
+    @contextmanager
+    def track(self, name):
+        """Track the queries of a block and report repeated shapes and slowness"""
+        if not self.tracking:
+            yield None
+            return
+        previous = getattr(_local, 'log', None)
+        log = _local.log = QueryLog()
+        started = time.perf_counter()
+        try:
+            yield log
+        finally:
+            _local.log = previous
+            self.report(name, log, time.perf_counter() - started)
+
+    def report(self, name, log, elapsed):
+        shapes = None
+        if log.count >= self.repeat_threshold:
+            shapes = log.shapes()
+            for shape, count, seconds in shapes:
+                if count < self.repeat_threshold:
+                    break
+                if not shape.startswith('SELECT'):
+                    # Repeated INSERTs are how the ORM flushes new rows, not a lookup loop
+                    continue
+                logger.warning(f"Possible N+1 in {name}: {count} x {shape[:300]} ({seconds * 1000:.1f} ms)")
+
+        if self.slow_seconds and elapsed >= self.slow_seconds:
+            shapes = shapes if shapes is not None else log.shapes()
+            top = '; '.join(
+                f'{count} x {seconds * 1000:.1f} ms {shape[:200]}'
+                for shape, count, seconds in shapes[:self.top_shapes]
+            )
+            logger.warning(
+                f"Slow {name}: {elapsed:.2f}s, {log.count} queries in {log.seconds:.2f}s. Top: {top or 'none'}"
+            )
+
+    # Request hooks
+
+    def before_request(self):
+        if self.tracking:
+            g.query_log = QueryLog()
+            g.query_log_previous = getattr(_local, 'log', None)
+            g.query_log_started = time.perf_counter()
+            _local.log = g.query_log
+
+        mode = self._requested_mode()
+        if mode and self._profile_lock.acquire(blocking=False):
+            g.profile = cProfile.Profile()
+            g.profile_mode = mode
+            g.profile.enable()
+
+    def after_request(self, response):
+        profile = g.pop('profile', None)
+        if profile is not None:
+            profile.disable()
+            self._profile_lock.release()
+            response = self._profile_response(profile, g.profile_mode, response)
+        elif self._requested_mode():
+            response.headers['X-Profile'] = 'busy'
+
+        log = g.get('query_log')
+        if log is not None and self._requested_mode():
+            response.headers['X-Query-Count'] = str(log.count)
+        return response
+
+    def teardown_request(self, exc):
+        profile = g.pop('profile', None)
+        if profile is not None:
+            # after_request did not run
+            profile.disable()
+            self._profile_lock.release()
+
+        log = g.pop('query_log', None)
+        if log is None:
+            return
+        _local.log = g.pop('query_log_previous', None)
+        route = request.url_rule.rule if request.url_rule else request.path
+        self.report(f'{request.method} {route}', log, time.perf_counter() - g.query_log_started)
+
+    # Profiling
+
+    def _requested_mode(self):
+        if not self.profiling:
+            return None
+        mode = request.headers.get('X-Profile') or request.args.get('_profile')
+        if mode not in ('1', 'text'):
+            return None
+        if self.token and request.headers.get('X-Profile-Token') != self.token:
+            return None
+        return mode
+
+    def _profile_response(self, profile, mode, response):
+        if mode == 'text':
+            output = io.StringIO()
+            stats = pstats.Stats(profile, stream=output)
+            stats.sort_stats('cumulative').print_stats(40)
+            return self.app.response_class(output.getvalue(), mimetype='text/plain')
+
+        os.makedirs(self.directory, exist_ok=True)
+        route = request.url_rule.rule if request.url_rule else request.path
+        filename = f"{datetime.utcnow():%Y%m%dT%H%M%S%f}-{SAFE_NAME_RE.sub('_', route).strip('_')}.prof"
+        path = os.path.join(self.directory, filename)
+        profile.dump_stats(path)
+        logger.info(f"Saved profile of {request.method} {request.full_path} to {path}")
+        response.headers['X-Profile-File'] = path
+        return response
@@ -0,0 +1,262 @@
+import re
+import math
+import zlib
+import heapq
+import logging
+import threading
+import time
+from array import array
+from collections import Counter, defaultdict
+
+logger = logging.getLogger(__name__)
+
+DIMENSIONS = 1 << 20
+TOKEN_RE = re.compile(r'[a-z0-9][a-z0-9+#.-]*[a-z0-9+#]|[a-z0-9]')
+STOPWORDS = frozenset('''
+a about after all also an and any are as at be been but by can could did do does for from had has
+have he her his how i if in into is it its just more most new no not now of on one or our out over
+said says she so some than that the their them then there these they this those through to up us
+was we were what when which who will with would you your
+'''.split())
+
+# Relative weight of a term by the field it came from
+FIELD_WEIGHTS = (('title', 2.0), ('summary', 1.0))
+KEYWORD_WEIGHT = 3.0
+
+def _bucket(feature):
+    # crc32 rather than hash() so buckets are stable across processes
+    return zlib.crc32(feature.encode('utf-8')) & (DIMENSIONS - 1)
+
+def tokenize(text):
+    return [token for token in TOKEN_RE.findall((text or '').lower()) if len(token) > 2 and token not in STOPWORDS]
+
+class RelatedIndex:
+    """Hashed term-frequency vectors with an inverted index for cosine queries.
+
+    Postings are parallel arrays of article ids and term weights, so the
+    index stays compact. Removed articles are skipped at query time and
+    dropped on the next rebuild.
+    """
+
+    def __init__(self):
+        self.vectors = {}
+        self.norms = {}
+        self.post_ids = defaultdict(lambda: array('l'))
+        self.post_weights = defaultdict(lambda: array('f'))
+        self.order = []
+
+    def __len__(self):
+        return len(self.vectors)
+
+    def idf(self, bucket):
+        return math.log((len(self.vectors) + 1) / (len(self.post_ids.get(bucket, ())) + 1)) + 1
+
+    def norm(self, vector):
+        return math.sqrt(sum((weight * self.idf(bucket)) ** 2 for bucket, weight in vector.items())) or 1.0
+
+    def add(self, article_id, vector):
+        if article_id in self.vectors or not vector:
+            return
+        self.vectors[article_id] = vector
+        self.order.append(article_id)
+        for bucket, weight in vector.items():
+            self.post_ids[bucket].append(article_id)
+            self.post_weights[bucket].append(weight)
+        self.norms[article_id] = self.norm(vector)
+
+    def update(self, article_id, vector):
+        """Replace a stored article's vector, keeping its place in the eviction order"""
+        old = self.vectors.get(article_id)
+        if old is None:
+            self.add(article_id, vector)
+            return
+        for bucket in old:
+            ids = self.post_ids[bucket]
+            try:
+                position = ids.index(article_id)
+            except ValueError:
+                continue
+            del ids[position]
+            del self.post_weights[bucket][position]
+        if not vector:
+            self.remove(article_id)
+            return
+        self.vectors[article_id] = vector
+        for bucket, weight in vector.items():
+            self.post_ids[bucket].append(article_id)
+            self.post_weights[bucket].append(weight)
+        self.norms[article_id] = self.norm(vector)
+
+    def remove(self, article_id):
+        """Forget one article (its postings are skipped until rebuild)"""
+        if self.vectors.pop(article_id, None) is not None:
+            self.norms.pop(article_id, None)
+            self.order.remove(article_id)
+
+    def evict(self, keep):
+        """Forget the oldest articles beyond keep (their postings are skipped until rebuild)"""
+        excess = len(self.order) - keep
+        if excess <= 0:
+            return
+        for article_id in self.order[:excess]:
+            self.vectors.pop(article_id, None)
+            self.norms.pop(article_id, None)
+        del self.order[:excess]
+
+    def nearest(self, vector, k, exclude=None, max_df_ratio=0.2):
+        """Top-k (similarity, article_id) by cosine over idf-weighted vectors"""
+        total = len(self.vectors)
+        max_df = max(int(total * max_df_ratio), 50)
+        scores = defaultdict(float)
+
+        for bucket, weight in vector.items():
+            ids = self.post_ids.get(bucket)
+            if not ids or len(ids) > max_df:
+                # Terms in a large share of articles say little about similarity
+                continue
+            idf = self.idf(bucket)
+            query_weight = weight * idf * idf
+            for article_id, doc_weight in zip(ids, self.post_weights[bucket]):
+                scores[article_id] += query_weight * doc_weight
+
+        scores.pop(exclude, None)
+        query_norm = self.norm(vector)
+        norms = self.norms
+        return heapq.nlargest(k, (
+            (score / (query_norm * norms[article_id]), article_id)
+            for article_id, score in scores.items() if article_id in norms
+        ))
+
+class RelatedService:
+    """Related ("more like this") articles from TF-IDF over title, summary and keywords.
+
+    Vectors are added by an ingest listener. The whole index is rebuilt in the
+    background every RELATED_REBUILD_SECONDS, which refreshes idf-based norms
+    and picks up articles stored by other processes.
+    """
+
+    def __init__(self, app, db, article_model, keyword_service):
+        config = app.config
+        self.app = app
+        self.db = db
+        self.Article = article_model
+        self.keyword_service = keyword_service
+        self.max_articles = config.get('RELATED_MAX_ARTICLES', 20000)
+        self.max_features = config.get('RELATED_MAX_FEATURES', 32)
+        self.rebuild_seconds = config.get('RELATED_REBUILD_SECONDS', 3600)
+
+        self._index = None
+        self._built_at = 0
+        self._rebuilding = False
+        self._lock = threading.Lock()
+
+    def vectorize(self, title, summary, keywords, tags=None):
+        """Sparse {bucket: weight} vector with log-scaled term frequencies"""
+        counts = Counter()
+        for field, weight in FIELD_WEIGHTS:
+            for token in tokenize(title if field == 'title' else summary):
+                counts[_bucket(token)] += weight
+        for keyword in self.keyword_service.parse_keywords(keywords, tags):
+            counts[_bucket(f'k:{keyword}')] += KEYWORD_WEIGHT
+
+        top = heapq.nlargest(self.max_features, counts.items(), key=lambda item: item[1])
+        return {bucket: 1 + math.log(count) for bucket, count in top}
+
+    def add_articles(self, articles):
+        """Ingest listener: vectorize newly stored articles"""
+        with self._lock:
+            index = self._index
+        if index is None:
+            return
+
+        vectors = [
+            (article.id, self.vectorize(article.title, article.summary, article.keywords, article.tags))
+            for article in articles
+        ]
+        with self._lock:
+            for article_id, vector in vectors:
+                index.add(article_id, vector)
+            index.evict(self.max_articles)
+
+    def update_articles(self, articles):
+        """Full-text listener: re-vectorize articles whose summary changed"""
+        with self._lock:
+            index = self._index
+        if index is None:
+            return
+
+        vectors = [
+            (article.id, self.vectorize(article.title, article.summary, article.keywords, article.tags))
+            for article in articles
+        ]
+        with self._lock:
+            for article_id, vector in vectors:
+                index.update(article_id, vector)
+
+    def remove_articles(self, articles):
+        """Retention listener: forget archived articles"""
+        with self._lock:
+            if self._index is None:
+                return
+            for article in articles:
+                self._index.remove(article.id)
+
+    def related(self, article, k=10):
+        """Most similar stored articles as (similarity, article_id), best first"""
+        index = self.index()
+        with self._lock:
+            vector = index.vectors.get(article.id)
+        if vector is None:
+            vector = self.vectorize(article.title, article.summary, article.keywords, article.tags)
+
+        with self._lock:
+            return index.nearest(vector, k, exclude=article.id)
+
+    def index(self):
+        with self._lock:
+            index = self._index
+            stale = index is not None and time.monotonic() - self._built_at >= self.rebuild_seconds
+            if stale and not self._rebuilding:
+                self._rebuilding = True
+                threading.Thread(target=self._rebuild, name='related-rebuild', daemon=True).start()
+        if index is not None:
+            return index
+
+        index = self.build_index()
+        with self._lock:
+            if self._index is None:
+                self._index = index
+                self._built_at = time.monotonic()
+            return self._index
+
+    def build_index(self):
+        Article = self.Article
+        rows = self.db.session.query(
+            Article.id, Article.title, Article.summary, Article.keywords, Article.tags
+        ).order_by(Article.id.desc()).limit(self.max_articles).all()
+
+        index = RelatedIndex()
+        for article_id, title, summary, keywords, tags in reversed(rows):
+            index.add(article_id, self.vectorize(title, summary, keywords, tags))
+        # Norms were computed while document frequencies were still growing
+        index.norms = {article_id: index.norm(vector) for article_id, vector in index.vectors.items()}
+        logger.info(f"Built related-articles index over {len(index)} articles")
+        return index
+
+    def _rebuild(self):
+        try:
+            with self.app.app_context():
+                index = self.build_index()
+            with self._lock:
+                # Carry over articles ingested while the new index was being built
+                newest = index.order[-1] if index.order else 0
+                for article_id in self._index.order:
+                    if article_id > newest:
+                        index.add(article_id, self._index.vectors[article_id])
+                self._index = index
+                self._built_at = time.monotonic()
+        except Exception as e:
+            logger.error(f"Error rebuilding related-articles index: {e}")
+        finally:
+            with self._lock:
+                self._rebuilding = False
@@ -0,0 +1,178 @@
+import gzip
+import time
+import logging
+import threading
+from datetime import date, datetime
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+from services.metrics_service import CACHE_REQUESTS
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE_MIMETYPES = ('application/json', 'application/x-ndjson', 'text/html', 'text/plain')
+
+class FastJSONProvider(DefaultJSONProvider):
+    """JSON provider that uses orjson when it is installed"""
+
+    sort_keys = False
+
+    def dumps(self, obj, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+        kwargs.setdefault('default', _default)
+        kwargs.setdefault('sort_keys', self.sort_keys)
+        return super().dumps(obj, **kwargs)
+
+    def dumpb(self, obj):
+        """Serialize straight to bytes, skipping the str round-trip orjson would need"""
+        if orjson is not None:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+        return self.dumps(obj).encode('utf-8')
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumpb(obj), mimetype=self.mimetype)
+
+def _default(obj):
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    return DefaultJSONProvider.default(obj)
+
+def available_encodings():
+    """Content encodings this process can produce, preferred first"""
+    return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+def compress(body, encoding, level=6):
+    """Compress a response body with gzip or brotli"""
+    if encoding == 'br':
+        return brotli.compress(body, quality=level)
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+def negotiate_encoding():
+    """Pick the best encoding the current request accepts, or None"""
+    return request.accept_encodings.best_match(available_encodings())
+
+class ResponseCompressor:
+    """Compress JSON and text responses above a size threshold"""
+
+    def __init__(self, app):
+        self.min_size = app.config.get('COMPRESSION_MIN_SIZE', 1024)
+        self.level = app.config.get('COMPRESSION_LEVEL', 6)
+        if app.config.get('COMPRESSION_ENABLED', True):
+            app.after_request(self.after_request)
+
+    def after_request(self, response):
+        if (
+            response.direct_passthrough
+            or response.is_streamed
+            or response.status_code != 200
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+        ):
+            return response
+
+        response.vary.add('Accept-Encoding')
+
+        body = response.get_data()
+        if len(body) < self.min_size:
+            return response
+
+        encoding = negotiate_encoding()
+        if not encoding:
+            return response
+
+        response.set_data(compress(body, encoding, self.level))
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+class CachedBody:
+    """An encoded response body plus its compressed variants, built on first use"""
+
+    def __init__(self, body, expires_at):
+        self.body = body
+        self.expires_at = expires_at
+        self.variants = {}
+
+    def encoded(self, encoding, level):
+        if encoding not in self.variants:
+            self.variants[encoding] = compress(self.body, encoding, level)
+        return self.variants[encoding]
+
+class ResponseCache:
+    """Short-lived cache of serialized JSON responses keyed by path and query string.
+
+    Bodies are serialized once and each compressed variant is produced once, so
+    a hit costs only the dictionary lookup.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.ttl = app.config.get('RESPONSE_CACHE_TTL', 30)
+        self.min_size = app.config.get('COMPRESSION_MIN_SIZE', 1024)
+        self.level = app.config.get('COMPRESSION_LEVEL', 6)
+        self.compression_enabled = app.config.get('COMPRESSION_ENABLED', True)
+        self.max_entries = app.config.get('RESPONSE_CACHE_MAX_ENTRIES', 512)
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def key(self):
+        return (request.path, tuple(sorted(request.args.items(multi=True))))
+
+    def get(self):
+        """Get the cached response for the current request, or None"""
+        if not self.ttl:
+            return None
+        entry = self._entries.get(self.key())
+        if entry is None or entry.expires_at < time.monotonic():
+            CACHE_REQUESTS.inc('response', 'miss')
+            return None
+        CACHE_REQUESTS.inc('response', 'hit')
+        return self._respond(entry)
+
+    def store(self, payload):
+        """Serialize a payload, cache it for the current request and return the response"""
+        entry = CachedBody(self.app.json.dumpb(payload), time.monotonic() + self.ttl)
+        if self.ttl:
+            with self._lock:
+                if len(self._entries) >= self.max_entries:
+                    self._evict_expired()
+                self._entries[self.key()] = entry
+        return self._respond(entry)
+
+    def clear(self, *args):
+        """Drop every entry; usable directly as an ingest listener"""
+        with self._lock:
+            self._entries = {}
+
+    def _evict_expired(self):
+        now = time.monotonic()
+        self._entries = {
+            key: entry for key, entry in self._entries.items()
+            if entry.expires_at >= now
+        }
+        if len(self._entries) >= self.max_entries:
+            self._entries = {}
+
+    def _respond(self, entry):
+        response = self.app.response_class(mimetype='application/json')
+        body = entry.body
+
+        if self.compression_enabled and len(body) >= self.min_size:
+            encoding = negotiate_encoding()
+            if encoding:
+                body = entry.encoded(encoding, self.level)
+                response.headers['Content-Encoding'] = encoding
+
+        response.set_data(body)
+        response.vary.add('Accept-Encoding')
+        return response
@@ -0,0 +1,188 @@
+import time
+import logging
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy import select, insert
+
+logger = logging.getLogger(__name__)
+
+class RetentionService:
+    """Move old and cold articles out of the hot table into archived_article.
+
+    An article is archived once it is older than RETENTION_DAYS, or older than
+    RETENTION_GRACE_DAYS with a hotness below RETENTION_HOTNESS_FLOOR. The
+    oldest articles beyond RETENTION_MAX_ARTICLES are archived too, which
+    bounds the hot table. Archived rows keep their id, URL (so ingest still
+    treats them as duplicates) and compressed body.
+    """
+
+    def __init__(self, app, db, article_model, archive_model, body_store, dependent_models=()):
+        config = app.config
+        self.db = db
+        self.Article = article_model
+        self.ArchivedArticle = archive_model
+        self.body_store = body_store
+        self.dependent_models = dependent_models
+        self.max_age = timedelta(days=config.get('RETENTION_DAYS', 90))
+        self.grace = timedelta(days=config.get('RETENTION_GRACE_DAYS', 7))
+        self.hotness_floor = config.get('RETENTION_HOTNESS_FLOOR', 0.05)
+        self.max_articles = config.get('RETENTION_MAX_ARTICLES', 100000)
+        self.interval = config.get('RETENTION_INTERVAL_HOURS', 24) * 3600
+        self.batch_size = config.get('RETENTION_BATCH_SIZE', 500)
+        self.listeners = []
+
+        self._last_run = None
+        self._lock = threading.Lock()
+
+    def add_listener(self, callback):
+        """Register a callback invoked with the Article rows that were just archived"""
+        self.listeners.append(callback)
+
+    def known_urls(self, urls):
+        """The subset of urls that belong to archived articles"""
+        return {url for url, in self.db.session.query(
+            self.ArchivedArticle.url
+        ).filter(self.ArchivedArticle.url.in_(urls))}
+
+    def candidates(self, now=None, limit=None):
+        """Ids of articles due for archiving, oldest first"""
+        Article = self.Article
+        now = now or datetime.utcnow()
+        limit = limit or self.batch_size
+
+        conditions = []
+        if self.max_age:
+            conditions.append(Article.published_at < now - self.max_age)
+        if self.hotness_floor:
+            conditions.append(self.db.and_(
+                Article.published_at < now - self.grace,
+                Article.hotness_score < self.hotness_floor
+            ))
+
+        ids = []
+        if conditions:
+            ids = [row[0] for row in self.db.session.query(Article.id).filter(
+                self.db.or_(*conditions)
+            ).order_by(Article.published_at).limit(limit).all()]
+
+        if self.max_articles and len(ids) < limit:
+            # Whatever still exceeds the size cap goes, oldest first
+            excess = self.db.session.query(self.db.func.count(Article.id)).scalar() - len(ids) - self.max_articles
+            if excess > 0:
+                query = self.db.session.query(Article.id)
+                if ids:
+                    query = query.filter(~Article.id.in_(ids))
+                ids.extend(row[0] for row in query.order_by(
+                    Article.published_at
+                ).limit(min(excess, limit - len(ids))).all())
+
+        return ids
+
+    def archive_batch(self, ids):
+        """Copy articles (with bodies) to the archive and delete them from the hot tables"""
+        Article, ArchivedArticle = self.Article, self.ArchivedArticle
+        ArticleBody = self.body_store.ArticleBody
+        session = self.db.session()
+
+        articles = Article.query.filter(Article.id.in_(ids)).all()
+        if not articles:
+            return 0
+
+        columns = [column.name for column in Article.__table__.columns]
+        archive_columns = columns + ['body_codec', 'body_dictionary_id', 'body', 'archived_at']
+        source = select(
+            *[getattr(Article, name) for name in columns],
+            ArticleBody.codec, ArticleBody.dictionary_id, ArticleBody.data,
+            self.db.literal(datetime.utcnow())
+        ).outerjoin(ArticleBody, ArticleBody.article_id == Article.id)
+
+        # Tables created before article used AUTOINCREMENT may have handed out an archived id again
+        reused = {row[0] for row in session.query(ArchivedArticle.id).filter(ArchivedArticle.id.in_(ids))}
+        fresh = [article_id for article_id in ids if article_id not in reused]
+        if fresh:
+            session.execute(insert(ArchivedArticle).from_select(
+                archive_columns, source.where(Article.id.in_(fresh))
+            ))
+        if reused:
+            # Archive those under new ids past every id either table has used
+            next_id = max(
+                session.query(self.db.func.max(ArchivedArticle.id)).scalar() or 0,
+                session.query(self.db.func.max(Article.id)).scalar() or 0
+            ) + 1
+            rows = []
+            for offset, row in enumerate(session.execute(source.where(Article.id.in_(reused)).order_by(Article.id))):
+                values = dict(zip(archive_columns, row))
+                values['id'] = next_id + offset
+                rows.append(values)
+            session.execute(insert(ArchivedArticle), rows)
+            logger.warning(f"Archived {len(rows)} articles with reused ids under new ids")
+
+        # SQLite does not enforce ON DELETE CASCADE unless asked to, so delete dependents explicitly
+        for model in (ArticleBody, *self.dependent_models):
+            session.query(model).filter(model.article_id.in_(ids)).delete(synchronize_session=False)
+        session.query(Article).filter(Article.id.in_(ids)).delete(synchronize_session=False)
+
+        # Listeners read the archived rows after commit; keep them loaded
+        expire_on_commit = session.expire_on_commit
+        session.expire_on_commit = False
+        try:
+            session.commit()
+        finally:
+            session.expire_on_commit = expire_on_commit
+
+        for callback in self.listeners:
+            try:
+                callback(articles)
+            except Exception as e:
+                logger.error(f"Retention listener {getattr(callback, '__name__', callback)} failed: {e}")
+        return len(articles)
+
+    def run(self, now=None, dry_run=False):
+        """Archive everything that is due; returns how many articles were (or would be) moved"""
+        if dry_run:
+            return len(self.candidates(now, limit=10 ** 9))
+
+        archived = 0
+        while True:
+            ids = self.candidates(now)
+            if not ids:
+                break
+            archived += self.archive_batch(ids)
+        if archived:
+            logger.info(f"Archived {archived} articles")
+        return archived
+
+    def run_if_due(self):
+        """Scheduler task: run at most every RETENTION_INTERVAL_HOURS"""
+        with self._lock:
+            if self._last_run is not None and time.monotonic() - self._last_run < self.interval:
+                return 0
+            self._last_run = time.monotonic()
+        return self.run()
+
+    def search(self, query_text=None, source=None, category=None, since=None, until=None):
+        """Query over archived articles, newest first"""
+        ArchivedArticle = self.ArchivedArticle
+        query = ArchivedArticle.query
+
+        if query_text:
+            query = query.filter(self.db.or_(
+                ArchivedArticle.title.ilike(f'%{query_text}%'),
+                ArchivedArticle.summary.ilike(f'%{query_text}%'),
+                ArchivedArticle.keywords.ilike(f'%{query_text}%')
+            ))
+        if source:
+            query = query.filter(ArchivedArticle.source.ilike(f'%{source}%'))
+        if category:
+            query = query.filter(ArchivedArticle.category == category)
+        if since:
+            query = query.filter(ArchivedArticle.published_at >= since)
+        if until:
+            query = query.filter(ArchivedArticle.published_at < until)
+
+        return query.order_by(ArchivedArticle.published_at.desc())
+
+    def content(self, archived):
+        if archived.body is None:
+            return None
+        return self.body_store.decode(archived.body_codec, archived.body_dictionary_id, archived.body)
@@ -0,0 +1,280 @@
+import os
+import random
+import logging
+import threading
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+class SourceSchedule:
+    """Polling state of a single source"""
+
+    def __init__(self, name, interval):
+        self.name = name
+        self.interval = interval            # healthy polling interval (timedelta)
+        self.next_run_at = datetime.utcnow()
+        self.last_run_at = None
+        self.last_new = None
+        self.rate_per_hour = None           # smoothed estimate of new articles per hour
+        self.failures = 0
+        self.in_flight_since = None
+        self.job_id = None
+
+    def to_dict(self):
+        return {
+            'source': self.name,
+            'interval_minutes': round(self.interval.total_seconds() / 60, 1),
+            'next_run_at': self.next_run_at.isoformat() if self.next_run_at else None,
+            'last_run_at': self.last_run_at.isoformat() if self.last_run_at else None,
+            'last_new_articles': self.last_new,
+            'rate_per_hour': round(self.rate_per_hour, 3) if self.rate_per_hour is not None else None,
+            'consecutive_failures': self.failures,
+            'in_flight': self.in_flight_since is not None
+        }
+
+class SchedulerService:
+    """Poll every source on its own interval, adapted to how often it publishes"""
+
+    def __init__(self, app, scrape_jobs, sources):
+        config = app.config
+        self.app = app
+        self.scrape_jobs = scrape_jobs
+        self.base_interval = timedelta(hours=config.get('SCRAPE_INTERVAL_HOURS', 6))
+        self.min_interval = timedelta(minutes=config.get('SCHEDULER_MIN_INTERVAL_MINUTES', 15))
+        self.max_interval = timedelta(hours=config.get('SCHEDULER_MAX_INTERVAL_HOURS', 24))
+        self.target_per_poll = config.get('SCHEDULER_TARGET_ARTICLES_PER_POLL', 5)
+        self.quiet_backoff = config.get('SCHEDULER_QUIET_BACKOFF', 1.5)
+        self.jitter = config.get('SCHEDULER_JITTER', 0.1)
+        self.smoothing = 0.3
+        self.in_flight_timeout = timedelta(minutes=config.get('SCRAPE_JOB_TIMEOUT_MINUTES', 30))
+
+        self.sources = {
+            source.name: SourceSchedule(source.name, self.base_interval)
+            for source in sources
+        }
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._lock_file = None
+        self.tasks = []
+
+        scrape_jobs.add_source_listener(self.record_result)
+
+    def add_task(self, callback):
+        """Run callback() on every scheduler tick (at least every five minutes)"""
+        self.tasks.append(callback)
+
+    def seed(self, db, article_model):
+        """Derive first run times and publish rates from what is already stored"""
+        now = datetime.utcnow()
+        week_ago = now - timedelta(days=7)
+
+        rows = db.session.query(
+            article_model.source,
+            db.func.max(article_model.scraped_at),
+            db.func.count(article_model.id)
+        ).filter(
+            article_model.scraped_at >= week_ago
+        ).group_by(article_model.source).all()
+
+        with self._lock:
+            for name, last_scraped, count in rows:
+                state = self.sources.get(name)
+                if state is None:
+                    continue
+                state.rate_per_hour = count / (7 * 24)
+                state.interval = self._interval_for_rate(state.rate_per_hour, state.interval)
+                state.last_run_at = last_scraped
+                state.next_run_at = self._with_jitter(last_scraped, state.interval)
+
+            # Spread sources that have never been scraped over the first minute
+            for state in self.sources.values():
+                if state.last_run_at is None:
+                    state.next_run_at = now + timedelta(seconds=random.uniform(0, 60))
+
+    def start(self):
+        """Start the polling thread, unless another process already runs one"""
+        if self._thread is not None or not self._acquire_process_lock():
+            return False
+
+        self._thread = threading.Thread(target=self._loop, name='scrape-scheduler', daemon=True)
+        self._thread.start()
+        logger.info(f"Scheduler started for {len(self.sources)} sources")
+        return True
+
+    def stop(self):
+        self._stopped.set()
+        self._wakeup.set()
+
+    def get_schedule(self):
+        """Get per-source polling state, soonest first"""
+        with self._lock:
+            states = [state.to_dict() for state in self.sources.values()]
+        return sorted(states, key=lambda state: state['next_run_at'] or '')
+
+    def record_result(self, name, result, error):
+        """Adapt a source's interval after it was scraped (by us or a manual job)"""
+        now = datetime.utcnow()
+
+        with self._lock:
+            state = self.sources.get(name)
+            if state is None:
+                return
+
+            state.in_flight_since = None
+            state.job_id = None
+
+            if error is not None:
+                state.failures += 1
+                delay = min(state.interval * (2 ** state.failures), self.max_interval)
+                state.next_run_at = self._with_jitter(now, delay)
+                return
+
+            new_count = result['new']
+            if state.last_run_at is not None:
+                hours = max((now - state.last_run_at).total_seconds() / 3600, 1 / 60)
+                sample = new_count / hours
+                if state.rate_per_hour is None:
+                    state.rate_per_hour = sample
+                else:
+                    state.rate_per_hour = (
+                        self.smoothing * sample + (1 - self.smoothing) * state.rate_per_hour
+                    )
+
+            if new_count == 0:
+                # Quiet feed: back off gradually
+                state.interval = min(state.interval * self.quiet_backoff, self.max_interval)
+            else:
+                state.interval = self._interval_for_rate(state.rate_per_hour, state.interval)
+
+            state.failures = 0
+            state.last_new = new_count
+            state.last_run_at = now
+            state.next_run_at = self._with_jitter(now, state.interval)
+
+        self._wakeup.set()
+
+    def _interval_for_rate(self, rate_per_hour, current):
+        """Pick the interval that yields about target_per_poll new articles per poll"""
+        if not rate_per_hour:
+            return current
+        interval = timedelta(hours=self.target_per_poll / rate_per_hour)
+        return min(max(interval, self.min_interval), self.max_interval)
+
+    def _with_jitter(self, start, delay):
+        factor = 1 + random.uniform(-self.jitter, self.jitter)
+        return start + delay * factor
+
+    def _due_sources(self, now):
+        due = []
+        with self._lock:
+            for state in self.sources.values():
+                if state.in_flight_since is not None:
+                    if now - state.in_flight_since < self.in_flight_timeout:
+                        continue
+                    logger.warning(f"Scheduled scrape of {state.name} never reported back")
+                    state.in_flight_since = None
+                if state.next_run_at <= now:
+                    state.in_flight_since = now
+                    due.append(state.name)
+        return due
+
+    def _collect_results(self):
+        """Read per-source outcomes of in-flight jobs from the job table.
+
+        The source listener already covers in-process jobs; this also picks up
+        jobs that ran in a Celery worker.
+        """
+        with self._lock:
+            in_flight = [
+                (state.name, state.job_id) for state in self.sources.values()
+                if state.job_id is not None
+            ]
+
+        for name, job_id in in_flight:
+            job = self.scrape_jobs.get_job(job_id)
+            if job is None:
+                self.record_result(name, None, 'Scrape job disappeared')
+                continue
+
+            job_dict = job.to_dict()
+            errors = {error['source']: error['error'] for error in job_dict['errors']}
+            if name in job_dict['results']:
+                self.record_result(name, job_dict['results'][name], None)
+            elif name in errors:
+                self.record_result(name, None, errors[name])
+            elif job.status not in ('queued', 'running'):
+                self.record_result(name, None, f"Scrape job {job.status}")
+
+    def _seconds_until_next_run(self, now):
+        with self._lock:
+            pending = [
+                state.next_run_at for state in self.sources.values()
+                if state.in_flight_since is None
+            ]
+            waiting = any(state.job_id is not None for state in self.sources.values())
+        if not pending:
+            return 15 if waiting else 60
+        return min(max((min(pending) - now).total_seconds(), 1), 15 if waiting else 300)
+
+    def _loop(self):
+        while not self._stopped.is_set():
+            with self.app.app_context():
+                try:
+                    self._collect_results()
+                except Exception as e:
+                    logger.error(f"Error collecting scheduled scrape results: {e}")
+
+                due = self._due_sources(datetime.utcnow())
+                if due:
+                    self._submit(due)
+
+                for callback in self.tasks:
+                    try:
+                        callback()
+                    except Exception as e:
+                        logger.error(f"Scheduled task {getattr(callback, '__name__', callback)} failed: {e}")
+
+            self._wakeup.clear()
+            self._wakeup.wait(self._seconds_until_next_run(datetime.utcnow()))
+
+    def _submit(self, names):
+        """Queue due sources and remember which job will report on each"""
+        try:
+            job, coalesced = self.scrape_jobs.submit(names)
+            logger.info(f"Scheduled scrape of {', '.join(names)} (job {job.id})")
+        except Exception as e:
+            logger.error(f"Error submitting scheduled scrape: {e}")
+            for name in names:
+                self.record_result(name, None, e)
+            return
+
+        for name in names:
+            owner = job if name in job.source_list() else self.scrape_jobs.find_active_job(name)
+            with self._lock:
+                state = self.sources[name]
+                if state.in_flight_since is not None:
+                    state.job_id = owner.id if owner else None
+
+    def _acquire_process_lock(self):
+        """Make sure only one gunicorn worker runs the scheduler"""
+        path = self.app.config.get('SCHEDULER_LOCK_FILE')
+        if not path:
+            return True
+
+        try:
+            import fcntl
+        except ImportError:
+            return True
+
+        self._lock_file = open(path, 'a')
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            self._lock_file.close()
+            self._lock_file = None
+            logger.info(f"Scheduler lock held by another process, not starting in pid {os.getpid()}")
+            return False
@@ -0,0 +1,255 @@
+import json
+import logging
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ('queued', 'running')
+
+class ScrapeJobService:
+    """Run scrape jobs in the background and keep their history in the database"""
+
+    def __init__(self, app, db, job_model, ingest_service, scrapers, max_articles=20):
+        self.app = app
+        self.db = db
+        self.ScrapeJob = job_model
+        self.ingest_service = ingest_service
+        self.scrapers = {scraper.name: scraper for scraper in scrapers}
+        self.max_articles = max_articles
+        self.backend = app.config.get('SCRAPE_JOB_BACKEND', 'thread')
+        self.timeout = timedelta(minutes=app.config.get('SCRAPE_JOB_TIMEOUT_MINUTES', 30))
+        self.celery = None
+        self.source_listeners = []
+
+        self._lock = threading.Lock()
+        self._executor = None
+        self._celery_task = None
+
+        if self.backend == 'celery':
+            self._init_celery()
+
+    def _init_celery(self):
+        """Register the job runner as a Celery task"""
+        from celery import Celery
+
+        self.celery = Celery(
+            self.app.import_name,
+            broker=self.app.config['CELERY_BROKER_URL'],
+            backend=self.app.config['CELERY_RESULT_BACKEND']
+        )
+
+        @self.celery.task(name='scrape_jobs.run_job')
+        def run_scrape_job(job_id):
+            # Worker processes run tasks outside any request, so push a context as the thread backend does
+            self._run_in_context(job_id)
+
+        self._celery_task = run_scrape_job
+
+    def add_source_listener(self, callback):
+        """Register a callback invoked as ``callback(source, result, error)`` after each source"""
+        self.source_listeners.append(callback)
+
+    def submit(self, source_names):
+        """Queue a scrape of the given sources, coalescing with jobs already in flight.
+
+        Sources already covered by a queued or running job are not scraped twice:
+        if every requested source is covered the existing job is returned, missing
+        sources are merged into a job that has not started yet, and only when the
+        active jobs are all running does a new job get created for the remainder.
+
+        Returns a ``(job, coalesced)`` tuple.
+        """
+        with self._lock:
+            job_id, coalesced = self._write(self._submit, list(source_names))
+
+        if not coalesced:
+            self._dispatch(job_id)
+        return self.db.session.get(self.ScrapeJob, job_id, populate_existing=True), coalesced
+
+    def _submit(self, source_names):
+        active = self._active_jobs(fail_abandoned=True)
+
+        covered = set()
+        for job in active:
+            covered.update(job.source_list())
+        missing = [name for name in source_names if name not in covered]
+
+        if not missing:
+            overlapping = [
+                job for job in active
+                if set(job.source_list()) & set(source_names)
+            ]
+            return overlapping[0].id, True
+
+        for job in active:
+            if job.status == 'queued' and self._merge_sources(job, missing):
+                return job.id, True
+
+        job = self.ScrapeJob(
+            id=uuid.uuid4().hex,
+            status='queued',
+            sources=json.dumps(missing)
+        )
+        self.db.session.add(job)
+        self.db.session.commit()
+        return job.id, False
+
+    def _write(self, fn, *args):
+        """Run a job-row write on the ingest writer thread, like the article writes"""
+        writer = self.ingest_service.writer
+        if writer is not None:
+            return writer.run(fn, *args)
+        return fn(*args)
+
+    def get_job(self, job_id):
+        """Get a job by id, or None"""
+        return self.db.session.get(self.ScrapeJob, job_id)
+
+    def find_active_job(self, source_name):
+        """Get the queued or running job that covers a source, or None"""
+        for job in self._active_jobs():
+            if source_name in job.source_list():
+                return job
+        return None
+
+    def list_jobs(self, limit=20):
+        """Get the most recent jobs"""
+        return self.ScrapeJob.query.order_by(
+            self.ScrapeJob.created_at.desc()
+        ).limit(limit).all()
+
+    def _active_jobs(self, fail_abandoned=False):
+        """Get queued/running jobs, skipping (or, on the writer, failing) any that outlived the job timeout"""
+        jobs = self.ScrapeJob.query.filter(
+            self.ScrapeJob.status.in_(ACTIVE_STATUSES)
+        ).order_by(self.ScrapeJob.created_at.desc()).all()
+
+        cutoff = datetime.utcnow() - self.timeout
+        active = []
+        for job in jobs:
+            if (job.started_at or job.created_at) < cutoff:
+                if not fail_abandoned:
+                    continue
+                job.status = 'failed'
+                job.finished_at = datetime.utcnow()
+                job.errors = json.dumps([{'source': None, 'error': 'Job abandoned'}])
+                logger.warning(f"Scrape job {job.id} timed out and was marked as failed")
+            else:
+                active.append(job)
+
+        if fail_abandoned:
+            self.db.session.commit()
+        return active
+
+    def _merge_sources(self, job, sources):
+        """Add sources to a job that is still queued"""
+        merged = job.source_list() + sources
+        updated = self.ScrapeJob.query.filter_by(id=job.id, status='queued').update(
+            {'sources': json.dumps(merged)},
+            synchronize_session=False
+        )
+        self.db.session.commit()
+        self.db.session.refresh(job)
+        return updated == 1
+
+    def _notify_source(self, name, result, error):
+        for callback in self.source_listeners:
+            try:
+                callback(name, result, error)
+            except Exception as e:
+                logger.error(f"Scrape job listener failed for {name}: {e}")
+
+    def _dispatch(self, job_id):
+        """Hand a job to the configured executor"""
+        if self.backend == 'celery':
+            self._celery_task.delay(job_id)
+            return
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.app.config.get('SCRAPE_JOB_WORKERS', 1),
+                thread_name_prefix='scrape-job'
+            )
+        self._executor.submit(self._run_in_context, job_id)
+
+    def _run_in_context(self, job_id):
+        with self.app.app_context():
+            try:
+                self.run_job(job_id)
+            finally:
+                self.db.session.remove()
+
+    def run_job(self, job_id):
+        """Scrape every source of a queued job, recording progress after each source"""
+        # Claim the job; a concurrent runner or a merge may have raced us
+        if not self._write(self._claim, job_id):
+            return
+
+        sources = self.db.session.get(self.ScrapeJob, job_id).source_list()
+        results = {}
+        errors = []
+
+        try:
+            for name in sources:
+                scraper = self.scrapers.get(name)
+                result = error = None
+                try:
+                    if scraper is None:
+                        raise ValueError(f"Unknown source {name}")
+                    result = self.ingest_service.ingest_source(
+                        scraper,
+                        max_articles=self.max_articles
+                    )
+                    results[name] = result
+                except Exception as e:
+                    self.db.session.rollback()
+                    logger.error(f"Error scraping from {name}: {e}")
+                    errors.append({'source': name, 'error': str(e)})
+                    error = e
+
+                self._write(self._record_source, job_id, result, results, errors)
+
+                self._notify_source(name, result, error)
+
+            status = 'failed' if errors and not results else 'completed'
+
+        except Exception as e:
+            self.db.session.rollback()
+            logger.error(f"Scrape job {job_id} failed: {e}")
+            errors.append({'source': None, 'error': str(e)})
+            status = 'failed'
+
+        articles_new = self._write(self._finish, job_id, status, errors)
+        logger.info(f"Scrape job {job_id} {status}: {articles_new} new articles")
+
+    # Job-row writes, run on the writer thread
+
+    def _claim(self, job_id):
+        claimed = self.ScrapeJob.query.filter_by(id=job_id, status='queued').update(
+            {'status': 'running', 'started_at': datetime.utcnow()},
+            synchronize_session=False
+        )
+        self.db.session.commit()
+        return claimed == 1
+
+    def _record_source(self, job_id, result, results, errors):
+        job = self.db.session.get(self.ScrapeJob, job_id)
+        if result is not None:
+            job.articles_fetched += result['fetched']
+            job.articles_new += result['new']
+            job.articles_duplicate += result['duplicates']
+        job.sources_done += 1
+        job.results = json.dumps(results)
+        job.errors = json.dumps(errors)
+        self.db.session.commit()
+
+    def _finish(self, job_id, status, errors):
+        job = self.db.session.get(self.ScrapeJob, job_id)
+        job.status = status
+        job.errors = json.dumps(errors)
+        job.finished_at = datetime.utcnow()
+        self.db.session.commit()
+        return job.articles_new
@@ -0,0 +1,312 @@
+import os
+import json
+import gzip
+import mmap
+import hashlib
+import time
+import struct
+import logging
+import tempfile
+import threading
+from urllib.parse import urlencode
+from flask import request
+from sqlalchemy.engine import make_url
+from services.metrics_service import CACHE_REQUESTS, SNAPSHOT_BUILD_SECONDS
+from services.response_service import available_encodings, compress, negotiate_encoding
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'AINSNAP1'
+HEADER = struct.Struct('<8sI')  # magic, index length
+ARTICLE_ARGS = frozenset(('page', 'per_page', 'sort_by', 'source', 'category'))
+
+def snapshot_key(path, **params):
+    """Key of one pre-rendered response: the path plus its normalized parameters"""
+    params = {name: value for name, value in params.items() if value is not None}
+    return f'{path}?{urlencode(sorted(params.items()))}' if params else path
+
+def database_identity(uri):
+    """Stable name of the database behind uri, or None for in-memory SQLite"""
+    url = make_url(str(uri))
+    if url.get_backend_name() != 'sqlite':
+        return url.render_as_string(hide_password=False)
+    database = url.database or ''
+    if database in ('', ':memory:') or database.startswith('file::memory:') or url.query.get('mode') == 'memory':
+        return None
+    # Relative paths and symlinks name the same file from every working directory
+    return os.path.realpath(database)
+
+class Snapshot:
+    """One snapshot file, memory-mapped; blobs are sliced out of the map on demand"""
+
+    def __init__(self, path):
+        with open(path, 'rb') as handle:
+            stat = os.fstat(handle.fileno())
+            self.data = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, index_length = HEADER.unpack_from(self.data)
+        if magic != MAGIC:
+            raise ValueError(f'{path} is not a snapshot file')
+        index = json.loads(self.data[HEADER.size:HEADER.size + index_length])
+        self.identity = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        self.built_at = index['built_at']
+        self.entries = index['entries']
+        self.offset = HEADER.size + index_length
+
+    def blob(self, span):
+        start, length = span
+        return self.data[self.offset + start:self.offset + start + length]
+
+class SnapshotService:
+    """Pre-rendered, compressed responses for the default home feed.
+
+    After an ingest or archive run (debounced) and every
+    SNAPSHOT_REFRESH_SECONDS, the first SNAPSHOT_PAGES pages of
+    /api/articles sorted by hotness, unfiltered and for each category and
+    large source, plus /api/articles/trending, are serialized and compressed
+    into one file. The file replaces the previous one with a rename, and every
+    worker memory-maps the newest file, so requests matching a snapshot are
+    answered without a query or serialization.
+    """
+
+    def __init__(self, app, db, article_model):
+        config = app.config
+        self.app = app
+        self.db = db
+        self.Article = article_model
+        database = database_identity(config.get('SQLALCHEMY_DATABASE_URI'))
+        # An in-memory database is private to its process, so a shared file could only be wrong
+        self.enabled = config.get('SNAPSHOT_ENABLED', True) and database is not None
+        # One file per database, so apps on other databases never serve each other's snapshot
+        database = hashlib.sha1(str(database).encode('utf-8')).hexdigest()[:12]
+        self.path = os.path.join(
+            config.get('SNAPSHOT_DIR') or os.path.join(tempfile.gettempdir(), 'ai_news_snapshots'),
+            f'home_feed-{database}.snapshot'
+        )
+        self.pages = config.get('SNAPSHOT_PAGES', 3)
+        self.per_page = config.get('SNAPSHOT_PER_PAGE', 20)
+        self.max_sources = config.get('SNAPSHOT_MAX_SOURCES', 50)
+        self.trending_limits = tuple(config.get('SNAPSHOT_TRENDING_LIMITS', (20, 50)))
+        self.debounce = config.get('SNAPSHOT_DEBOUNCE_SECONDS', 2)
+        self.refresh_seconds = config.get('SNAPSHOT_REFRESH_SECONDS', 300)
+        self.max_age = config.get('SNAPSHOT_MAX_AGE_SECONDS', 900)
+        self.level = config.get('SNAPSHOT_COMPRESSION_LEVEL', 9)
+        self.compression_enabled = config.get('COMPRESSION_ENABLED', True)
+        self.check_interval = 1.0  # seconds between checks for a newer file
+
+        self._snapshot = None
+        self._checked_at = 0.0
+        self._load_lock = threading.Lock()
+        self._rebuild = threading.Event()
+        self._build_lock = threading.Lock()
+        self._thread = None
+
+    # Serving
+
+    def current(self):
+        """The newest snapshot on disk, or None when there is none or it is too old"""
+        if not self.enabled:
+            return None
+        now = time.monotonic()
+        if now - self._checked_at >= self.check_interval:
+            with self._load_lock:
+                if now - self._checked_at >= self.check_interval:
+                    self._reload()
+                    self._checked_at = now
+        snapshot = self._snapshot
+        if snapshot is None or time.time() - snapshot.built_at > self.max_age:
+            return None
+        return snapshot
+
+    def _reload(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            self._snapshot = None
+            return
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.identity == (stat.st_ino, stat.st_mtime_ns, stat.st_size):
+            return
+        try:
+            # The old map is closed once the last request using it lets go
+            self._snapshot = Snapshot(self.path)
+        except (OSError, ValueError, struct.error) as e:
+            logger.error(f"Error loading feed snapshot {self.path}: {e}")
+            self._snapshot = None
+
+    def match(self):
+        """Snapshot key of the current request, or None when it is not pre-rendered"""
+        args = request.args
+        if any(len(values) > 1 for values in args.listvalues()):
+            return None
+
+        if request.path == '/api/articles':
+            if not ARTICLE_ARGS.issuperset(args):
+                return None
+            page = args.get('page', 1, type=int)
+            source = args.get('source') or None
+            category = args.get('category') or None
+            if (
+                args.get('sort_by') == 'date'
+                or min(args.get('per_page', 20, type=int), 100) != self.per_page
+                or not 1 <= page <= self.pages
+                or (source and category)
+            ):
+                return None
+            return snapshot_key(request.path, page=page, source=source, category=category)
+
+        if request.path == '/api/articles/trending':
+            if not {'limit'}.issuperset(args):
+                return None
+            limit = min(args.get('limit', 20, type=int), 50)
+            return snapshot_key(request.path, limit=limit) if limit in self.trending_limits else None
+
+        return None
+
+    def respond(self):
+        """The pre-rendered response for the current request, or None (also when the snapshot cannot be read)"""
+        try:
+            return self._respond()
+        except Exception as e:
+            # A damaged file must not fail the request; the route falls back to its query
+            logger.error(f"Error serving feed snapshot {self.path}: {e}")
+            return None
+
+    def _respond(self):
+        snapshot = self.current()
+        if snapshot is None:
+            return None
+        key = self.match()
+        if key is None:
+            return None
+        entry = snapshot.entries.get(key)
+        if entry is None:
+            CACHE_REQUESTS.inc('snapshot', 'miss')
+            return None
+        CACHE_REQUESTS.inc('snapshot', 'hit')
+
+        response = self.app.response_class(mimetype='application/json')
+        encoding = negotiate_encoding() if self.compression_enabled else None
+        if encoding in entry:
+            response.set_data(snapshot.blob(entry[encoding]))
+            response.headers['Content-Encoding'] = encoding
+        else:
+            response.set_data(gzip.decompress(snapshot.blob(entry['gzip'])))
+        response.vary.add('Accept-Encoding')
+        return response
+
+    # Building
+
+    def request_rebuild(self, *args):
+        """Rebuild soon in the background; usable directly as an ingest or retention listener"""
+        if not self.enabled:
+            return
+        if self._thread is None:
+            with self._build_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._loop, name='feed-snapshots', daemon=True)
+                    self._thread.start()
+        self._rebuild.set()
+
+    def rebuild_if_stale(self):
+        """Scheduler task: rebuild when the snapshot is older than SNAPSHOT_REFRESH_SECONDS"""
+        try:
+            built_at = os.path.getmtime(self.path)
+        except OSError:
+            built_at = 0
+        if time.time() - built_at >= self.refresh_seconds:
+            self.request_rebuild()
+
+    def _loop(self):
+        while True:
+            self._rebuild.wait()
+            # Let the rest of a scrape job's sources land before rendering
+            time.sleep(self.debounce)
+            self._rebuild.clear()
+            try:
+                with self.app.app_context():
+                    self.build()
+            except Exception as e:
+                logger.error(f"Error building feed snapshot: {e}")
+
+    def _payloads(self):
+        """(key, payload) of every pre-rendered response, built like get_articles and get_trending_articles"""
+        Article = self.Article
+        filters = [(None, None)]
+        filters.extend((None, category) for category, in self.db.session.query(Article.category).distinct())
+        filters.extend((source, None) for source, in self.db.session.query(Article.source).group_by(
+            Article.source
+        ).order_by(self.db.func.count(Article.id).desc()).limit(self.max_sources))
+
+        for source, category in filters:
+            query = Article.query
+            if source:
+                query = query.filter(Article.source.ilike(f'%{source}%'))
+            if category:
+                query = query.filter(Article.category == category)
+            total = query.order_by(None).count()
+            rows = query.order_by(Article.hotness_score.desc()).limit(self.pages * self.per_page).all()
+            pages = -(-total // self.per_page)
+            for page in range(1, self.pages + 1):
+                items = rows[(page - 1) * self.per_page:page * self.per_page]
+                if not items and page > 1:
+                    break
+                yield snapshot_key('/api/articles', page=page, source=source, category=category), {
+                    'articles': [article.to_dict() for article in items],
+                    'pagination': {
+                        'page': page,
+                        'pages': pages,
+                        'per_page': self.per_page,
+                        'total': total,
+                        'has_next': page < pages,
+                        'has_prev': page > 1
+                    }
+                }
+
+        if self.trending_limits:
+            trending = Article.query.order_by(Article.hotness_score.desc()).limit(max(self.trending_limits)).all()
+            for limit in self.trending_limits:
+                yield snapshot_key('/api/articles/trending', limit=limit), {
+                    'articles': [article.to_dict() for article in trending[:limit]],
+                    'count': len(trending[:limit])
+                }
+
+    def build(self):
+        """Render every snapshot response and atomically replace the file; returns (responses, bytes)"""
+        started = time.perf_counter()
+        encodings = available_encodings()
+        entries = {}
+        blobs = []
+        offset = 0
+        try:
+            for key, payload in self._payloads():
+                body = self.app.json.dumpb(payload)
+                entry = {}
+                for encoding in encodings:
+                    blob = compress(body, encoding, self.level)
+                    entry[encoding] = [offset, len(blob)]
+                    blobs.append(blob)
+                    offset += len(blob)
+                entries[key] = entry
+        finally:
+            self.db.session.remove()
+
+        index = json.dumps({'built_at': time.time(), 'entries': entries}).encode('utf-8')
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as handle:
+                handle.write(HEADER.pack(MAGIC, len(index)))
+                handle.write(index)
+                for blob in blobs:
+                    handle.write(blob)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+        self._checked_at = 0.0  # pick the new file up on the next request
+        elapsed = time.perf_counter() - started
+        SNAPSHOT_BUILD_SECONDS.observe(elapsed)
+        logger.info(f"Built feed snapshot: {len(entries)} responses, {offset} bytes in {elapsed:.2f}s")
+        return len(entries), offset
@@ -0,0 +1,163 @@
+import time
+import logging
+import threading
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+def article_card(article):
+    """Compact representation of an article pushed to stream clients"""
+    summary = article.summary or ''
+    return {
+        'id': article.id,
+        'title': article.title,
+        'url': article.url,
+        'summary': summary[:300],
+        'source': article.source,
+        'category': article.category,
+        'published_at': article.published_at.isoformat() if article.published_at else None,
+        'image_url': article.image_url,
+        'hotness_score': article.hotness_score,
+        'sentiment': article.sentiment
+    }
+
+class Subscriber:
+    """One connected client: its filters and a bounded buffer of pending cards"""
+
+    def __init__(self, source=None, category=None, min_hotness=None, buffer_size=100):
+        self.source = source.lower() if source else None
+        self.category = category
+        self.min_hotness = min_hotness
+        self.buffer = deque(maxlen=buffer_size)
+        self.dropped = 0
+        self.ready = threading.Event()
+
+    def matches(self, card):
+        if self.source and self.source not in (card['source'] or '').lower():
+            return False
+        if self.category and card['category'] != self.category:
+            return False
+        if self.min_hotness and (card['hotness_score'] or 0) < self.min_hotness:
+            return False
+        return True
+
+    def push(self, card):
+        if len(self.buffer) == self.buffer.maxlen:
+            self.dropped += 1
+        self.buffer.append(card)
+        self.ready.set()
+
+    def drain(self):
+        self.ready.clear()
+        cards = []
+        while self.buffer:
+            cards.append(self.buffer.popleft())
+        return cards
+
+class ArticleBroadcaster:
+    """Fan newly ingested articles out to every connected stream client.
+
+    Cards arrive from the local ingest listener immediately and from a single
+    per-process poll of new ids (to pick up rows written by other workers),
+    so database load does not depend on the number of connected clients.
+    """
+
+    def __init__(self, app, db, article_model):
+        config = app.config
+        self.app = app
+        self.db = db
+        self.Article = article_model
+        self.buffer_size = config.get('SSE_CLIENT_BUFFER', 100)
+        self.poll_interval = config.get('SSE_POLL_SECONDS', 5)
+        self.backfill_limit = config.get('SSE_BACKFILL_LIMIT', 200)
+
+        self.history = deque(maxlen=config.get('SSE_HISTORY_SIZE', 1000))
+        self.subscribers = set()
+        self.last_id = None
+
+        self._lock = threading.Lock()
+        self._poller = None
+
+    def subscribe(self, **filters):
+        subscriber = Subscriber(buffer_size=self.buffer_size, **filters)
+        with self._lock:
+            self.subscribers.add(subscriber)
+        self._ensure_poller()
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self.subscribers.discard(subscriber)
+
+    def publish_articles(self, articles):
+        """Ingest listener: broadcast freshly committed articles"""
+        self.publish([article_card(article) for article in articles])
+
+    def publish(self, cards):
+        with self._lock:
+            cards = [
+                card for card in sorted(cards, key=lambda card: card['id'])
+                if self.last_id is None or card['id'] > self.last_id
+            ]
+            if not cards:
+                return
+            self.last_id = cards[-1]['id']
+            self.history.extend(cards)
+            subscribers = list(self.subscribers)
+
+        for subscriber in subscribers:
+            for card in cards:
+                if subscriber.matches(card):
+                    subscriber.push(card)
+
+    def replay(self, subscriber, last_event_id):
+        """Cards after last_event_id for a resuming client, from memory or the database"""
+        with self._lock:
+            oldest = self.history[0]['id'] if self.history else None
+            cards = [card for card in self.history if card['id'] > last_event_id]
+
+        if oldest is None or oldest > last_event_id + 1:
+            articles = self.Article.query.filter(
+                self.Article.id > last_event_id
+            ).order_by(self.Article.id).limit(self.backfill_limit).all()
+            cards = [article_card(article) for article in articles]
+
+        return [card for card in cards if subscriber.matches(card)]
+
+    def _ensure_poller(self):
+        with self._lock:
+            if self._poller is not None and self._poller.is_alive():
+                return
+            self._poller = threading.Thread(target=self._poll, name='sse-poller', daemon=True)
+            self._poller.start()
+
+    def _poll(self):
+        """Pick up articles committed by other processes while clients are connected"""
+        while True:
+            with self._lock:
+                if not self.subscribers:
+                    self._poller = None
+                    return
+                last_id = self.last_id
+
+            try:
+                with self.app.app_context():
+                    if last_id is None:
+                        max_id = self.db.session.query(self.db.func.max(self.Article.id)).scalar()
+                        with self._lock:
+                            if self.last_id is None:
+                                self.last_id = max_id or 0
+                    else:
+                        articles = self.Article.query.filter(
+                            self.Article.id > last_id
+                        ).order_by(self.Article.id).limit(self.backfill_limit).all()
+                        if articles:
+                            self.publish([article_card(article) for article in articles])
+            except Exception as e:
+                logger.error(f"Error polling for new articles: {e}")
+
+            time.sleep(self.poll_interval)
+
+def format_event(card, json_provider):
+    """Serialize a card as a Server-Sent Event"""
+    return f"id: {card['id']}\nevent: article\ndata: {json_provider.dumps(card)}\n\n"
@@ -0,0 +1,300 @@
+import io
+import os
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from services.metrics_service import CACHE_REQUESTS, THUMBNAIL_FETCH_SECONDS, THUMBNAIL_EVICTIONS
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # optional dependency
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+FAILED = 'failed'
+
+def _shard(root, name):
+    return os.path.join(root, name[:2], name)
+
+def _write_atomic(path, data):
+    # Concurrent workers may render the same file; whichever rename lands last wins
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as handle:
+            handle.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+class ThumbnailService:
+    """Article images resized to THUMBNAIL_WIDTHS and kept in a content-addressed disk cache.
+
+    Each image URL is downloaded once; every width is rendered from that one
+    download and stored under the SHA-256 of the image bytes, so an image
+    shared by several articles is stored once. A small file per URL points at
+    that digest. Hits bump the file's mtime, and when the cache grows past
+    THUMBNAIL_CACHE_MAX_MB the least recently used files are removed. Needs
+    Pillow; without it `available` is False and callers use the original image.
+    """
+
+    def __init__(self, app):
+        config = app.config
+        self.enabled = config.get('THUMBNAIL_ENABLED', True)
+        self.available = self.enabled and Image is not None
+        if self.enabled and Image is None:
+            logger.warning("THUMBNAIL_ENABLED is set but Pillow is not installed, serving original images")
+        self.root = config.get('THUMBNAIL_DIR') or os.path.join(tempfile.gettempdir(), 'ai_news_thumbnails')
+        self.widths = tuple(sorted(config.get('THUMBNAIL_WIDTHS', (160, 320, 640))))
+        self.quality = config.get('THUMBNAIL_QUALITY', 80)
+        self.max_bytes = config.get('THUMBNAIL_CACHE_MAX_MB', 512) * 1024 * 1024
+        self.max_source_bytes = config.get('THUMBNAIL_MAX_SOURCE_BYTES', 10 * 1024 * 1024)
+        self.timeout = config.get('THUMBNAIL_TIMEOUT', 10)
+        self.max_age = config.get('THUMBNAIL_MAX_AGE', 30 * 24 * 3600)
+        self.failure_ttl = config.get('THUMBNAIL_FAILURE_TTL', 3600)
+        self.prewarm_hotness = config.get('THUMBNAIL_PREWARM_HOTNESS', 0.3)
+        self.workers = config.get('THUMBNAIL_WORKERS', 4)
+        self.user_agent = config.get('FULLTEXT_USER_AGENT', 'AINewsHubBot/1.0')
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max(self.workers, 10), pool_maxsize=self.workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({'User-Agent': self.user_agent, 'Accept': 'image/*'})
+
+        self._executor = None
+        self._lock = threading.Lock()
+        self._url_locks = {}  # url -> [Lock, users], so concurrent misses download once
+        self._size = None  # bytes on disk, scanned on first write
+        self._evicting = False
+
+    # Lookup
+
+    def snap_width(self, width):
+        """The smallest configured width at least as wide as width"""
+        for candidate in self.widths:
+            if width <= candidate:
+                return candidate
+        return self.widths[-1]
+
+    def _url_path(self, url):
+        return _shard(os.path.join(self.root, 'urls'), hashlib.sha256(url.encode('utf-8')).hexdigest())
+
+    def _image_path(self, digest, width):
+        return _shard(os.path.join(self.root, 'images'), f'{digest}-{width}.jpg')
+
+    def _cached(self, url, width):
+        """(path, digest) of a stored thumbnail, FAILED for a recent failure, or None"""
+        url_path = self._url_path(url)
+        try:
+            with open(url_path, encoding='ascii') as handle:
+                digest = handle.read().strip()
+        except OSError:
+            return None
+        if digest == FAILED:
+            try:
+                recent = time.time() - os.path.getmtime(url_path) < self.failure_ttl
+            except OSError:
+                return None
+            return FAILED if recent else None
+
+        path = self._image_path(digest, width)
+        try:
+            os.utime(path)  # mtime is the LRU clock
+        except OSError:
+            return None
+        os.utime(url_path)
+        return path, digest
+
+    def get(self, url, width):
+        """(path, etag) of url's thumbnail at a configured width, rendering it on a miss; None when unavailable"""
+        if not self.available or urlsplit(url).scheme not in ('http', 'https'):
+            return None
+        width = self.snap_width(width)
+
+        cached = self._cached(url, width)
+        if cached is None:
+            CACHE_REQUESTS.inc('thumbnail', 'miss')
+            with self._locked(url):
+                cached = self._cached(url, width)
+                if cached is None:
+                    self.render(url)
+                    cached = self._cached(url, width)
+        else:
+            CACHE_REQUESTS.inc('thumbnail', 'hit')
+
+        if cached is None or cached == FAILED:
+            return None
+        path, digest = cached
+        return path, f'{digest[:32]}-{width}'
+
+    @contextmanager
+    def _locked(self, url):
+        with self._lock:
+            entry = self._url_locks.setdefault(url, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._url_locks[url]
+
+    # Rendering
+
+    def render(self, url):
+        """Download url once and write every width; returns the image digest or None"""
+        started = time.perf_counter()
+        outcome, data = self._download(url)
+        digest = None
+        if outcome == 'ok':
+            try:
+                digest = self._render_widths(data)
+                outcome = 'rendered'
+            except Image.DecompressionBombError:
+                outcome = 'too_large'
+            except Exception as e:
+                logger.warning(f"Could not render thumbnails of {url}: {e}")
+                outcome = 'not_image'
+
+        _write_atomic(self._url_path(url), (digest or FAILED).encode('ascii'))
+        self._grow(len(digest or FAILED))
+        THUMBNAIL_FETCH_SECONDS.observe(time.perf_counter() - started, outcome)
+        return digest
+
+    def _download(self, url):
+        try:
+            with self.session.get(url, timeout=self.timeout, stream=True) as response:
+                if response.status_code >= 400:
+                    return 'error', None
+                if int(response.headers.get('Content-Length') or 0) > self.max_source_bytes:
+                    return 'too_large', None
+                chunks = []
+                size = 0
+                for chunk in response.iter_content(64 * 1024):
+                    size += len(chunk)
+                    if size > self.max_source_bytes:
+                        return 'too_large', None
+                    chunks.append(chunk)
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"Image request for {url} failed: {e}")
+            return 'error', None
+        return 'ok', b''.join(chunks)
+
+    def _render_widths(self, data):
+        digest = hashlib.sha256(data).hexdigest()
+        missing = [width for width in self.widths if not os.path.exists(self._image_path(digest, width))]
+        if not missing:
+            return digest
+
+        image = Image.open(io.BytesIO(data))
+        # JPEG decoders can scale down by 2-8x while decoding, far cheaper than resizing afterwards
+        image.draft('RGB', (missing[-1], missing[-1] * image.height // max(image.width, 1)))
+        image = ImageOps.exif_transpose(image)
+        if image.mode in ('RGBA', 'LA', 'P'):
+            image = image.convert('RGBA')
+            background = Image.new('RGB', image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel('A'))
+            image = background
+        elif image.mode != 'RGB':
+            image = image.convert('RGB')
+
+        written = 0
+        # Largest first, each resized from the previous one
+        for width in reversed(missing):
+            if image.width > width:
+                image = image.resize((width, max(image.height * width // image.width, 1)), Image.LANCZOS)
+            output = io.BytesIO()
+            image.save(output, 'JPEG', quality=self.quality, optimize=True, progressive=True)
+            _write_atomic(self._image_path(digest, width), output.getvalue())
+            written += output.tell()
+        self._grow(written)
+        return digest
+
+    # Pre-warming
+
+    def prewarm_articles(self, articles):
+        """Ingest listener: render thumbnails of hot new articles in the background"""
+        if not self.available:
+            return 0
+        urls = {
+            article.image_url for article in articles
+            if article.image_url and (article.hotness_score or 0) >= self.prewarm_hotness
+        }
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='thumbnail')
+        for url in urls:
+            self._executor.submit(self._prewarm, url)
+        return len(urls)
+
+    def _prewarm(self, url):
+        try:
+            self.get(url, self.widths[0])
+        except Exception as e:
+            logger.error(f"Pre-warming thumbnails of {url} failed: {e}")
+
+    # Eviction
+
+    def _scan(self):
+        """(mtime, size, path) of every cached file"""
+        files = []
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+        return files
+
+    def _grow(self, amount):
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._scan())
+            else:
+                self._size += amount
+            if self._size <= self.max_bytes or self._evicting:
+                return
+            self._evicting = True
+        try:
+            self.evict()
+        finally:
+            with self._lock:
+                self._evicting = False
+
+    def evict(self, target=None):
+        """Remove least recently used files until the cache is under target bytes (90% of the cap)"""
+        target = int(self.max_bytes * 0.9) if target is None else target
+        files = sorted(self._scan())
+        total = sum(size for _, size, _ in files)
+        removed = 0
+        for _, size, path in files:
+            if total <= target:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        with self._lock:
+            # Other workers share the directory, so the scan is the truth
+            self._size = total
+        if removed:
+            THUMBNAIL_EVICTIONS.inc(amount=removed)
+            logger.info(f"Evicted {removed} thumbnail cache files, {total} bytes left")
+        return removed
@@ -0,0 +1,24 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# The config classes read the environment at import time, so set it before app is imported
+WORKDIR = tempfile.mkdtemp(prefix='ai-news-tests-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(WORKDIR, 'test.db')}"
+os.environ['SCHEDULER_ENABLED'] = 'false'
+os.environ['DIGEST_ENABLED'] = 'false'
+os.environ['RETENTION_ENABLED'] = 'false'
+os.environ['THUMBNAIL_ENABLED'] = 'false'
+os.environ['SNAPSHOT_ENABLED'] = 'false'
+os.environ['FULLTEXT_ENABLED'] = 'false'
+os.environ['RESPONSE_CACHE_TTL'] = '0'
+os.environ['SQLITE_WAL_ENABLED'] = 'true'
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.fixture(scope='session')
+def app():
+    from app import create_app
+    return create_app()
@@ -0,0 +1,122 @@
+"""Concurrent reads while the writer thread stores articles (WAL, read pool, single writer)"""
+import time
+import logging
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from benchmarks.bench_concurrency import percentile
+
+SEEDED = 200
+READERS = 8
+BATCHES = 30
+BATCH_SIZE = 10
+IDLE_SECONDS = 1.0
+# Reads may slow down while the writer commits, but not by more than this (CI machines are noisy)
+MAX_P95_SLOWDOWN = 5
+P95_FLOOR_MS = 20
+
+def article_data(prefix, i, published_at):
+    return {
+        'title': f'{prefix} article {i}',
+        'url': f'https://example.com/{prefix}/{i}',
+        'summary': 'model training and inference',
+        'content': 'model ' * 200,
+        'source': 'Test Source',
+        'published_at': published_at,
+        'keywords': '["model"]',
+    }
+
+@pytest.fixture(scope='module')
+def seeded(app):
+    """Number of stored articles after seeding"""
+    ingest = app.extensions['ingest']
+    now = datetime.utcnow()
+    stored = ingest.writer.run(ingest.store_articles, [
+        article_data('seed', i, now - timedelta(minutes=i)) for i in range(SEEDED)
+    ])
+    assert stored == SEEDED
+    with app.app_context():
+        return ingest.Article.query.count()
+
+def run_readers(app, during):
+    """Run READERS reader threads while during() runs; returns (latencies in ms, errors, totals per reader)"""
+    running = threading.Event()
+    lock = threading.Lock()
+    latencies = []
+    errors = []
+    totals = {}
+
+    def get(client, path):
+        started = time.perf_counter()
+        response = client.get(path)
+        elapsed = (time.perf_counter() - started) * 1000
+        if response.status_code != 200:
+            errors.append(f'{path}: {response.status_code} {response.get_data(as_text=True)}')
+            return None, elapsed
+        return response, elapsed
+
+    def reader(index):
+        client = app.test_client()
+        seen = totals[index] = []
+        timings = []
+        try:
+            while running.is_set():
+                response, elapsed = get(client, f'/api/articles?sort_by=date&page={index % 5 + 1}&per_page=20')
+                timings.append(elapsed)
+                if response is not None:
+                    seen.append(response.get_json()['pagination']['total'])
+                timings.append(get(client, f'/api/articles/{index * 7 % SEEDED + 1}')[1])
+        except Exception as e:
+            errors.append(repr(e))
+        with lock:
+            latencies.extend(timings)
+
+    running.set()
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(READERS)]
+    for thread in threads:
+        thread.start()
+    try:
+        during()
+    finally:
+        running.clear()
+        for thread in threads:
+            thread.join()
+    return latencies, errors, totals
+
+def test_readers_and_writer_run_concurrently(app, seeded, caplog):
+    ingest = app.extensions['ingest']
+    written = []
+
+    def write():
+        for batch in range(BATCHES):
+            now = datetime.utcnow()
+            written.append(ingest.writer.run(ingest.store_articles, [
+                article_data(f'live-{batch}', i, now) for i in range(BATCH_SIZE)
+            ]))
+
+    caplog.set_level(logging.WARNING)
+    idle, idle_errors, _ = run_readers(app, lambda: time.sleep(IDLE_SECONDS))
+    busy, errors, totals = run_readers(app, write)
+
+    assert idle_errors == []
+    assert errors == []
+    assert 'database is locked' not in caplog.text
+    assert sum(written) == BATCHES * BATCH_SIZE
+
+    expected = seeded + sum(written)
+    with app.app_context():
+        assert ingest.Article.query.count() == expected
+    assert app.test_client().get('/api/articles').get_json()['pagination']['total'] == expected
+
+    # Every reader saw committed states only, and never went back in time
+    for seen in totals.values():
+        assert seen
+        assert all(seeded <= total <= expected for total in seen)
+        assert seen == sorted(seen)
+
+    # Writes go through one writer connection and WAL, so readers are not blocked behind them
+    idle_p95, busy_p95 = percentile(idle, 95), percentile(busy, 95)
+    assert busy_p95 <= max(idle_p95 * MAX_P95_SLOWDOWN, P95_FLOOR_MS), \
+        f'p95 read latency {busy_p95:.1f} ms during writes vs {idle_p95:.1f} ms idle'
@@ -0,0 +1,20 @@
+"""Facet counts agree with the article list for the same filters"""
+import uuid
+from datetime import datetime
+
+def test_source_filter_matches_like_the_article_list(app):
+    ingest = app.extensions['ingest']
+    tag = uuid.uuid4().hex[:8]
+    ingest.writer.run(ingest.store_articles, [{
+        'title': f'Facet article {i}',
+        'url': f'https://example.com/facets/{tag}/{i}',
+        'source': source,
+        'category': 'Facets',
+        'published_at': datetime.utcnow(),
+    } for i, source in enumerate([f'Feed {tag}', f'Feed {tag} Daily', 'Other Feed'])])
+
+    client = app.test_client()
+    listed = client.get(f'/api/articles?source=feed {tag}&category=Facets').get_json()['pagination']['total']
+    facets = client.get(f'/api/facets?source=feed {tag}&category=Facets').get_json()['facets']
+    assert listed == 2
+    assert sum(item['count'] for item in facets['category'] if item['value'] == 'Facets') == listed
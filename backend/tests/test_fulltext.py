@@ -0,0 +1,36 @@
+"""Storing fetched full text refreshes what was derived from the old summary"""
+import uuid
+from datetime import datetime
+
+def test_store_updates_related_index_and_notifies(app):
+    ingest = app.extensions['ingest']
+    fulltext = app.extensions['fulltext']
+    related = app.extensions['related']
+    url = f'https://example.com/fulltext/{uuid.uuid4().hex}'
+    ingest.writer.run(ingest.store_articles, [{
+        'title': 'Full text article',
+        'url': url,
+        'summary': 'short snippet',
+        'content': 'short snippet',
+        'source': 'Test Source',
+        'published_at': datetime.utcnow(),
+    }])
+    with app.app_context():
+        article_id = ingest.Article.query.filter_by(url=url).one().id
+        old_vector = related.index().vectors[article_id]
+
+    received = []
+    fulltext.add_listener(received.extend)
+    try:
+        summary = 'Quantum photonics accelerator benchmarks'
+        assert ingest.writer.run(fulltext.store, article_id, 'quantum photonics ' * 100, summary)
+    finally:
+        fulltext.listeners.remove(received.extend)
+
+    assert [article.summary for article in received] == [summary]
+    new_vector = related.index().vectors[article_id]
+    assert new_vector != old_vector
+    # The old postings are gone, so the article is not counted twice
+    postings = [ids.tolist().count(article_id) for ids in related.index().post_ids.values()]
+    assert max(postings) == 1
+    assert app.test_client().get(f'/api/articles/{article_id}').get_json()['summary'] == summary
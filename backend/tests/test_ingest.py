@@ -0,0 +1,37 @@
+"""Ingest listeners run in order on the writer's session"""
+import uuid
+from datetime import datetime
+
+from models import ArticleKeyword
+
+def test_failing_listener_does_not_break_the_next_ones(app):
+    ingest = app.extensions['ingest']
+    db, Article = ingest.db, ingest.Article
+    received = []
+
+    def failing_listener(articles):
+        # A failed flush leaves the session needing a rollback
+        db.session.add(Article(title=None, url=f'https://example.com/{uuid.uuid4().hex}'))
+        db.session.flush()
+
+    listeners = ingest.listeners
+    ingest.listeners = [failing_listener, *listeners, received.extend]
+    try:
+        url = f'https://example.com/listeners/{uuid.uuid4().hex}'
+        stored = ingest.writer.run(ingest.store_articles, [{
+            'title': 'Listener article',
+            'url': url,
+            'summary': 'model training',
+            'content': 'model ' * 50,
+            'source': 'Test Source',
+            'published_at': datetime.utcnow(),
+            'keywords': '["model", "training"]',
+        }])
+    finally:
+        ingest.listeners = listeners
+
+    assert stored == 1
+    assert [article.url for article in received] == [url]
+    with app.app_context():
+        article_id = Article.query.filter_by(url=url).one().id
+        assert ArticleKeyword.query.filter_by(article_id=article_id).count() == 2
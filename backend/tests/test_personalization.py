@@ -0,0 +1,23 @@
+"""Compiled preference matchers follow updates made by other workers"""
+import json
+import uuid
+
+from models import UserPreferences
+
+def test_matcher_follows_preferences_updated_elsewhere(app):
+    client = app.test_client()
+    name = uuid.uuid4().hex[:12]
+    user_id = client.post('/api/users', json={'username': name, 'email': f'{name}@example.com'}).get_json()['id']
+    response = client.put(f'/api/users/{user_id}/preferences', json={'blocked_sources': ['Old Source']})
+    assert response.status_code == 200
+
+    personalization = app.extensions['personalization']
+    with app.app_context():
+        assert personalization.matcher_for(user_id).blocked_sources == {'old source'}
+
+        # Another worker handles the next update, so this process's invalidate() never runs
+        preferences = UserPreferences.query.filter_by(user_id=user_id).one()
+        preferences.blocked_sources = json.dumps(['New Source'])
+        personalization.db.session.commit()
+
+        assert personalization.matcher_for(user_id).blocked_sources == {'new source'}
@@ -0,0 +1,75 @@
+"""Scrape jobs on the thread and Celery backends"""
+import json
+import uuid
+from datetime import datetime
+
+import pytest
+
+from services.scrape_job_service import ScrapeJobService
+
+class StaticScraper:
+    def __init__(self, name, articles):
+        self.name = name
+        self.articles = articles
+
+    def scrape_articles(self, max_articles=50):
+        return self.articles[:max_articles]
+
+def static_scraper():
+    return StaticScraper('Static Feed', [{
+        'title': 'Scraped article',
+        'url': f'https://example.com/jobs/{uuid.uuid4().hex}',
+        'summary': 'model training and inference',
+        'content': 'model ' * 50,
+        'author': 'Staff',
+        'source': 'Static Feed',
+        'published_at': datetime.utcnow(),
+        'keywords': [],
+        'image_url': '',
+    }])
+
+def test_thread_job_records_progress_through_the_writer(app):
+    ingest = app.extensions['ingest']
+    ScrapeJob = app.extensions['scrape_jobs'].ScrapeJob
+    scraper = static_scraper()
+    service = ScrapeJobService(app, ingest.db, ScrapeJob, ingest, [scraper])
+
+    with app.app_context():
+        job, coalesced = service.submit([scraper.name, 'Missing Feed'])
+        assert not coalesced
+        assert job.status == 'queued'
+    service._executor.shutdown(wait=True)
+
+    with app.app_context():
+        job = ingest.db.session.get(ScrapeJob, job.id)
+        assert job.status == 'completed'
+        assert job.sources_done == 2
+        assert job.articles_new == 1
+        assert [error['source'] for error in json.loads(job.errors)] == ['Missing Feed']
+
+def test_celery_task_runs_job_in_its_own_app_context(app):
+    pytest.importorskip('celery')
+    ingest = app.extensions['ingest']
+    ScrapeJob = app.extensions['scrape_jobs'].ScrapeJob
+    scraper = static_scraper()
+
+    app.config['SCRAPE_JOB_BACKEND'] = 'celery'
+    try:
+        service = ScrapeJobService(app, ingest.db, ScrapeJob, ingest, [scraper])
+    finally:
+        app.config['SCRAPE_JOB_BACKEND'] = 'thread'
+
+    job_id = uuid.uuid4().hex
+    with app.app_context():
+        ingest.db.session.add(ScrapeJob(id=job_id, status='queued', sources=json.dumps([scraper.name])))
+        ingest.db.session.commit()
+
+    # What a worker does with a delivered message; no app context is pushed here
+    service._celery_task(job_id)
+
+    with app.app_context():
+        job = ingest.db.session.get(ScrapeJob, job_id)
+        assert job.status == 'completed'
+        assert job.sources_done == 1
+        assert job.articles_new == 1
+        assert json.loads(job.errors) == []
@@ -0,0 +1,45 @@
+"""Feed snapshots fall back to the query path when they cannot be read"""
+import os
+import uuid
+from datetime import datetime
+
+import pytest
+
+from services.snapshot_service import SnapshotService
+
+@pytest.fixture
+def snapshots(app, tmp_path):
+    ingest = app.extensions['ingest']
+    ingest.writer.run(ingest.store_articles, [{
+        'title': 'Snapshot article',
+        'url': f'https://example.com/snapshots/{uuid.uuid4().hex}',
+        'source': 'Test Source',
+        'published_at': datetime.utcnow(),
+    }])
+    app.config.update(SNAPSHOT_ENABLED=True, SNAPSHOT_DIR=str(tmp_path))
+    try:
+        service = SnapshotService(app, ingest.db, ingest.Article)
+    finally:
+        app.config.update(SNAPSHOT_ENABLED=False, SNAPSHOT_DIR=None)
+    with app.app_context():
+        service.build()
+    return service
+
+def test_damaged_snapshot_is_not_served(app, snapshots):
+    with app.test_request_context('/api/articles', headers={'Accept-Encoding': 'identity'}):
+        assert snapshots.respond() is not None
+
+    # Overwrite the compressed page with garbage of the same length
+    entry = snapshots.current().entries['/api/articles?page=1']
+    start, length = entry['gzip']
+    with open(snapshots.path, 'rb') as handle:
+        data = bytearray(handle.read())
+    offset = snapshots.current().offset + start
+    data[offset:offset + length] = b'\0' * length
+    with open(snapshots.path + '.tmp', 'wb') as handle:
+        handle.write(data)
+    os.replace(snapshots.path + '.tmp', snapshots.path)
+    snapshots._checked_at = 0.0
+
+    with app.test_request_context('/api/articles', headers={'Accept-Encoding': 'identity'}):
+        assert snapshots.respond() is None
@@ -0,0 +1,9 @@
+"""WSGI entry point for production servers: gunicorn wsgi:app
+
+Builds the app and starts the source scheduler (in one worker; the others
+see the process lock and skip it).
+"""
+from app import create_app, start_scheduler
+
+app = create_app()
+start_scheduler(app)
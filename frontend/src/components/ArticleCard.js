@@ -14,6 +14,7 @@ import {
   BookmarkIcon as BookmarkIconSolid 
 } from '@heroicons/react/24/solid';
 import { useFilter } from '../contexts/FilterContext';
+import { articlesAPI } from '../services/api';
 
 function ArticleCard({ article, showSummary = true, showImage = true }) {
   const [isBookmarked, setIsBookmarked] = useState(false);
@@ -167,11 +168,20 @@ function ArticleCard({ article, showSummary = true, showImage = true }) {
         {shouldShowImage && (
           <div className="flex-shrink-0 w-32 h-24 lg:w-40 lg:h-28">
             <img
-              src={article.image_url}
+              src={articlesAPI.thumbnailUrl(article.id, 160)}
+              srcSet={`${articlesAPI.thumbnailUrl(article.id, 160)} 160w, ${articlesAPI.thumbnailUrl(article.id, 320)} 320w`}
+              sizes="(min-width: 1024px) 160px, 128px"
               alt={article.title}
+              loading="lazy"
               className="w-full h-full object-cover rounded-lg"
               onError={(e) => {
-                e.target.style.display = 'none';
+                // Fall back to the publisher's image once, then hide
+                if (e.target.src !== article.image_url) {
+                  e.target.removeAttribute('srcset');
+                  e.target.src = article.image_url;
+                } else {
+                  e.target.style.display = 'none';
+                }
               }}
             />
           </div>
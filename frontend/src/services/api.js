@@ -82,10 +82,43 @@ export const articlesAPI = {
     return api.get('/search', { params: { q: query, ...params } });
   },
 
-  // Trigger manual scraping
+  // Trigger manual scraping (queues a background job)
   triggerScrape: () => {
     return api.post('/scrape');
   },
+
+  // Subscribe to newly ingested articles (Server-Sent Events); returns an unsubscribe function
+  subscribe: (params = {}, onArticle) => {
+    const query = new URLSearchParams(params).toString();
+    const source = new EventSource(`${api.defaults.baseURL}/articles/stream${query ? `?${query}` : ''}`);
+    source.addEventListener('article', (event) => onArticle(JSON.parse(event.data)));
+    return () => source.close();
+  },
+
+  // URL of an article's image resized on the server to the nearest thumbnail width
+  thumbnailUrl: (id, width) => {
+    return `${api.defaults.baseURL}/articles/${id}/thumbnail?w=${width}`;
+  },
+
+  // Get articles similar to one article
+  getRelated: (id, limit = 10) => {
+    return api.get(`/articles/${id}/related`, { params: { limit } });
+  },
+
+  // Search archived articles
+  searchArchive: (query, params = {}) => {
+    return api.get('/archive', { params: { q: query, ...params } });
+  },
+
+  // Get an archived article by its original id
+  getArchived: (id) => {
+    return api.get(`/archive/${id}`);
+  },
+
+  // Get scrape job progress
+  getScrapeJob: (jobId) => {
+    return api.get(`/scrape/${jobId}`);
+  },
 };
 
 // Statistics API
@@ -99,6 +132,11 @@ export const statsAPI = {
   getTrendingKeywords: (limit = 20) => {
     return api.get('/keywords/trending', { params: { limit } });
   },
+
+  // Get sidebar facet counts for the current filters
+  getFacets: (params = {}) => {
+    return api.get('/facets', { params });
+  },
 };
 
 // Users API (for future implementation)
@@ -117,6 +155,11 @@ export const usersAPI = {
   getPreferences: (id) => {
     return api.get(`/users/${id}/preferences`);
   },
+
+  // Get recent articles ranked by the user's preferences
+  getFeed: (id, params = {}) => {
+    return api.get(`/users/${id}/feed`, { params });
+  },
 };
 
 // Helper functions for building query parameters
@@ -153,9 +196,11 @@ export const queryKeys = {
   article: (id) => ['article', id],
   search: (query, filters, page = 1) => ['search', query, filters, page],
   stats: () => ['stats'],
+  facets: (filters) => ['facets', filters],
   trendingKeywords: (limit) => ['trending-keywords', limit],
   userProfile: (id) => ['user-profile', id],
   userPreferences: (id) => ['user-preferences', id],
+  userFeed: (id, params) => ['user-feed', id, params],
 };
 
 // Error handling utilities